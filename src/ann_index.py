@@ -0,0 +1,320 @@
+import json
+import math
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Resolved next to this module, not against the working directory
+INDEX_DIR = str(Path(__file__).resolve().parent / "data" / "matcher" / "ivf")
+
+# k-means is trained on at most this many vectors per list
+TRAIN_SAMPLES_PER_LIST = 64
+KMEANS_ITERATIONS = 10
+# Assignment and training score vectors against the centroids in chunks of this many rows
+CHUNK_ROWS = 65_536
+# A list is rewritten without its deleted slots once they make up this share of it
+COMPACT_RATIO = 0.25
+INITIAL_LIST_CAPACITY = 64
+# Without a fixed nlist, the index retrains once it holds this many times the vectors it was trained on
+RETRAIN_GROWTH = 4
+
+
+def spherical_kmeans(vectors: np.ndarray, k: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0) -> np.ndarray:
+    """
+    Clusters unit vectors by cosine similarity and returns `k` unit centroids.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        assign = _nearest(vectors, centroids)
+        # Per-dimension bincounts sum each cluster's members far faster than np.add.at
+        sums = np.stack([np.bincount(assign, weights=vectors[:, d], minlength=k) for d in range(vectors.shape[1])], axis=1)
+        norms = np.linalg.norm(sums, axis=1)
+        empty = norms == 0
+        # Re-seed empty clusters with random vectors so every list stays in use
+        sums[empty] = vectors[rng.choice(len(vectors), int(empty.sum()))]
+        norms[empty] = np.linalg.norm(sums[empty], axis=1)
+        centroids = (sums / np.maximum(norms, 1e-12)[:, None]).astype(np.float32)
+    return centroids
+
+
+def _nearest(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    return np.concatenate([
+        np.argmax(vectors[start:start + CHUNK_ROWS] @ centroids.T, axis=1)
+        for start in range(0, len(vectors), CHUNK_ROWS)
+    ]) if len(vectors) else np.zeros(0, dtype=np.int64)
+
+
+class _InvertedList:
+    """
+    One IVF cell: the vectors assigned to a centroid and their ids, as memory-mapped .npy files.
+    Deleted slots keep the id -1 until the list is compacted.
+    """
+
+    def __init__(self, directory: Path, number: int, dim: int):
+        self._vectors_path = directory / f"{number:05d}.vectors.npy"
+        self._ids_path = directory / f"{number:05d}.ids.npy"
+        self.dim = dim
+        self.size = 0
+        self.deleted = 0
+        self.vectors = self.ids = None
+
+    def open(self, size: int, deleted: int) -> None:
+        self.size, self.deleted = size, deleted
+        if self._ids_path.exists():
+            self.vectors = np.load(self._vectors_path, mmap_mode="r+")
+            self.ids = np.load(self._ids_path, mmap_mode="r+")
+
+    def append(self, ids: np.ndarray, vectors: np.ndarray) -> int:
+        """
+        Appends rows and returns the slot of the first one.
+        """
+        start = self.size
+        self._reserve(start + len(ids))
+        self.vectors[start:start + len(ids)] = vectors
+        self.ids[start:start + len(ids)] = ids
+        self.size += len(ids)
+        return start
+
+    def compact(self) -> np.ndarray:
+        """
+        Drops deleted slots and returns the ids that remain, in their new slot order.
+        """
+        live = np.flatnonzero(self.ids[:self.size] >= 0)
+        vectors, ids = np.array(self.vectors[live]), np.array(self.ids[live])
+        self.size = self.deleted = 0
+        self.vectors = self.ids = None
+        self._vectors_path.unlink(missing_ok=True)
+        self._ids_path.unlink(missing_ok=True)
+        if len(ids):
+            self.append(ids, vectors)
+        return ids
+
+    def flush(self) -> None:
+        if self.ids is not None:
+            self.vectors.flush()
+            self.ids.flush()
+
+    def _reserve(self, size: int) -> None:
+        capacity = 0 if self.ids is None else len(self.ids)
+        if size <= capacity:
+            return
+        capacity = max(INITIAL_LIST_CAPACITY, capacity * 2, size)
+        vectors = np.lib.format.open_memmap(f"{self._vectors_path}.tmp", mode="w+", dtype=np.float32, shape=(capacity, self.dim))
+        ids = np.lib.format.open_memmap(f"{self._ids_path}.tmp", mode="w+", dtype=np.int64, shape=(capacity,))
+        ids[:] = -1
+        if self.size:
+            vectors[:self.size] = self.vectors[:self.size]
+            ids[:self.size] = self.ids[:self.size]
+        for array, path in ((vectors, self._vectors_path), (ids, self._ids_path)):
+            array.flush()
+            os.replace(array.filename, path)
+        self.vectors = np.load(self._vectors_path, mmap_mode="r+")
+        self.ids = np.load(self._ids_path, mmap_mode="r+")
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index over unit vectors, stored on disk.
+
+    Vectors are assigned to the closest of `nlist` k-means centroids and kept in one
+    memory-mapped list per centroid. A query scores the centroids, then only the vectors
+    in the `nprobe` best lists: raising `nprobe` trades latency for recall. Inserts append
+    to a list; deletes mark the slot and lists are compacted once enough of them is dead.
+    The centroids are trained from the first vectors added; call `train` to retrain on a
+    representative sample, which reassigns everything. `generation` is stored with the index
+    for the owner to tell whether it missed updates (see JobMatcher).
+    """
+
+    def __init__(self, directory: str = INDEX_DIR, dim: Optional[int] = None, nlist: Optional[int] = None, nprobe: int = 16):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.nprobe = nprobe
+        self._lock = threading.Lock()
+        meta_path = self.directory / "meta.json"
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() else {"dim": dim, "nlist": nlist, "lists": []}
+        self.dim = meta["dim"]
+        self.nlist = meta["nlist"]
+        self._nlist = nlist  # fixed by the caller, or None to size it from the data
+        self._trained_on = meta.get("trained_on", 0)
+        self.generation = meta.get("generation")
+        self._centroids = np.load(self.directory / "centroids.npy") if meta["lists"] else None
+        self._lists: List[_InvertedList] = []
+        self._slots: Dict[int, Tuple[int, int]] = {}  # job id -> (list, slot)
+        for number, (size, deleted) in enumerate(meta["lists"]):
+            inverted = _InvertedList(self.directory, number, self.dim)
+            inverted.open(size, deleted)
+            self._lists.append(inverted)
+            if inverted.ids is not None:
+                for slot in np.flatnonzero(inverted.ids[:size] >= 0):
+                    self._slots[int(inverted.ids[slot])] = (number, int(slot))
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @property
+    def trained(self) -> bool:
+        return self._centroids is not None
+
+    def train(self, vectors: Optional[np.ndarray] = None) -> None:
+        """
+        Learns the centroids from a sample (by default the indexed vectors) and reassigns
+        every indexed vector to them.
+        """
+        with self._lock:
+            ids, existing = self._export()
+            vectors = existing if vectors is None else np.asarray(vectors, dtype=np.float32)
+            self.dim = vectors.shape[1]
+            # Without a fixed nlist, about sqrt(n) lists keep both the centroid and the list scans short
+            total = max(len(ids), len(vectors))
+            nlist = self._nlist or max(1, int(math.sqrt(total)))
+            nlist = min(nlist, len(vectors))
+            rng = np.random.default_rng(0)
+            sample = vectors[rng.choice(len(vectors), min(len(vectors), nlist * TRAIN_SAMPLES_PER_LIST), replace=False)]
+            self._centroids = spherical_kmeans(sample, nlist)
+            self.nlist = nlist
+            self._trained_on = total
+            np.save(self.directory / "centroids.npy", self._centroids)
+
+            for path in self.directory.glob("*.npy"):
+                if path.name != "centroids.npy":
+                    path.unlink()
+            self._lists = [_InvertedList(self.directory, number, self.dim) for number in range(nlist)]
+            self._slots = {}
+            self._insert(ids, existing)
+            self._save()
+
+    def clear(self) -> None:
+        """
+        Deletes every vector and the centroids; the next `add` trains the index afresh.
+        """
+        with self._lock:
+            for path in self.directory.glob("*.npy"):
+                path.unlink()
+            self._centroids = None
+            self.nlist = self._nlist
+            self._trained_on = 0
+            self._lists = []
+            self._slots = {}
+            self._save()
+
+    def add(self, ids: Sequence[int], vectors: np.ndarray) -> None:
+        """
+        Inserts vectors, replacing any already stored under the same ids.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if not len(ids):
+            return
+        # An id listed twice keeps its last vector
+        _, last = np.unique(ids[::-1], return_index=True)
+        keep = np.sort(len(ids) - 1 - last)
+        ids, vectors = ids[keep], vectors[keep]
+        if not self.trained:
+            self.train(vectors)
+        with self._lock:
+            self._delete(ids)
+            self._insert(ids, vectors)
+            self._save()
+        # Centroids trained on the first few vectors stop fitting once the index has grown a lot
+        if self._nlist is None and len(self._slots) >= RETRAIN_GROWTH * max(self._trained_on, 64):
+            self.train()
+
+    def remove(self, ids: Sequence[int]) -> int:
+        """
+        Deletes vectors by id; returns how many were stored.
+        """
+        with self._lock:
+            removed = self._delete(np.asarray(ids, dtype=np.int64))
+            self._save()
+        return removed
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: Optional[int] = None) -> List[Tuple[int, float]]:
+        """
+        Returns up to `k` (id, score) pairs with the highest dot product, best first.
+        """
+        query = np.asarray(query, dtype=np.float32)
+        # Probes are chosen under the lock too: a concurrent train() replaces the centroids and lists together
+        with self._lock:
+            if not self.trained or not self._slots:
+                return []
+            nprobe = min(nprobe or self.nprobe, self.nlist)
+            centroid_scores = self._centroids @ query
+            probe = np.argpartition(centroid_scores, -nprobe)[-nprobe:]
+            scores, ids = [], []
+            for number in probe:
+                inverted = self._lists[number]
+                if not inverted.size:
+                    continue
+                list_ids = inverted.ids[:inverted.size]
+                list_scores = inverted.vectors[:inverted.size] @ query
+                if inverted.deleted:
+                    list_scores = np.where(list_ids >= 0, list_scores, -np.inf)
+                scores.append(list_scores)
+                ids.append(np.array(list_ids))
+        if not scores:
+            return []
+        scores, ids = np.concatenate(scores), np.concatenate(ids)
+        k = min(k, len(scores))
+        best = np.argpartition(scores, -k)[-k:]
+        best = best[np.argsort(-scores[best])]
+        return [(int(ids[i]), float(scores[i])) for i in best if scores[i] > -np.inf]
+
+    def _insert(self, ids: np.ndarray, vectors: np.ndarray) -> None:
+        if not len(ids):
+            return
+        assign = _nearest(vectors, self._centroids)
+        order = np.argsort(assign, kind="stable")
+        bounds = np.flatnonzero(np.diff(assign[order])) + 1
+        for group in np.split(order, bounds):
+            number = int(assign[group[0]])
+            start = self._lists[number].append(ids[group], vectors[group])
+            for offset, job_id in enumerate(ids[group]):
+                self._slots[int(job_id)] = (number, start + offset)
+
+    def _delete(self, ids: np.ndarray) -> int:
+        removed = 0
+        touched = set()
+        for job_id in ids:
+            location = self._slots.pop(int(job_id), None)
+            if location is None:
+                continue
+            number, slot = location
+            inverted = self._lists[number]
+            inverted.ids[slot] = -1
+            inverted.deleted += 1
+            touched.add(number)
+            removed += 1
+        for number in touched:
+            inverted = self._lists[number]
+            if inverted.deleted > COMPACT_RATIO * inverted.size:
+                for slot, job_id in enumerate(inverted.compact()):
+                    self._slots[int(job_id)] = (number, slot)
+        return removed
+
+    def _export(self) -> Tuple[np.ndarray, np.ndarray]:
+        # All live (ids, vectors), read into memory before the lists are rebuilt
+        ids = [np.array(inv.ids[:inv.size]) for inv in self._lists if inv.size]
+        vectors = [np.array(inv.vectors[:inv.size]) for inv in self._lists if inv.size]
+        if not ids:
+            return np.zeros(0, dtype=np.int64), np.zeros((0, self.dim or 0), dtype=np.float32)
+        ids, vectors = np.concatenate(ids), np.concatenate(vectors)
+        live = ids >= 0
+        return ids[live], vectors[live]
+
+    def _save(self) -> None:
+        for inverted in self._lists:
+            inverted.flush()
+        meta = {
+            "dim": self.dim,
+            "nlist": self.nlist,
+            "trained_on": self._trained_on,
+            "generation": self.generation,
+            "lists": [[inv.size, inv.deleted] for inv in self._lists],
+        }
+        meta_tmp = self.directory / "meta.json.tmp"
+        meta_tmp.write_text(json.dumps(meta))
+        os.replace(meta_tmp, self.directory / "meta.json")
@@ -0,0 +1,245 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import List, Optional
+
+from fastapi import FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+
+from job_matcher import MATCHER_DIR, JobMatcher, profile_text
+from main import build_tool
+from tools.extraction_cache import file_digest
+from tools.metrics import METRICS
+from tools.text_extractors import supported_suffixes
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+# Concurrent LLM calls over the tool's pooled HTTP client
+LLM_CONCURRENCY = int(os.getenv("API_LLM_CONCURRENCY", "32"))
+# Extractions admitted at once across all requests; /extract past this is rejected with 503
+MAX_PENDING = int(os.getenv("API_MAX_PENDING", "128"))
+# Documents of one /extract/batch request in flight at once
+BATCH_WINDOW = int(os.getenv("API_BATCH_WINDOW", "8"))
+# Files and total bytes accepted by one /extract/batch request
+MAX_BATCH_FILES = int(os.getenv("API_MAX_BATCH_FILES", "100"))
+MAX_BATCH_BYTES = int(os.getenv("API_MAX_BATCH_BYTES", str(200 * 1024 * 1024)))
+
+
+class MatchRequest(BaseModel):
+    cv: Optional[dict] = None
+    text: Optional[str] = None
+    k: int = 10
+
+
+class Service:
+    """
+    Long-lived state shared by all requests: one FileReadTool (and so one pooled LLM client),
+    a thread pool for PDF parsing and cache lookups, the job matcher and the admission limit.
+    """
+
+    def __init__(self, matcher_dir: str = MATCHER_DIR, max_pending: int = MAX_PENDING):
+        self.executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4), thread_name_prefix="parse")
+        self.tool = build_tool(max_concurrency=LLM_CONCURRENCY, parse_executor=self.executor)
+        self.matcher_dir = Path(matcher_dir)
+        self._matcher = self._matcher_version = None
+        self._matcher_lock = threading.Lock()
+        self.max_pending = max_pending
+        self.pending = 0
+        self._slots = asyncio.Semaphore(max_pending)
+
+    def matcher(self) -> JobMatcher:
+        """
+        The job matcher, reopened when another process (e.g. the backend's /add_job) changed its index.
+        Reopening loads the whole index, so this blocks: call it from a worker thread, never the event loop.
+        """
+        # meta.json is rewritten last on every change, so its mtime versions the whole index
+        try:
+            version = (self.matcher_dir / "meta.json").stat().st_mtime_ns
+        except FileNotFoundError:
+            version = None
+        # Concurrent requests after a change wait for one reopen instead of each loading the index
+        with self._matcher_lock:
+            if self._matcher is None or version != self._matcher_version:
+                self._matcher, self._matcher_version = JobMatcher(str(self.matcher_dir)), version
+            return self._matcher
+
+    def top_k(self, text: str, k: int) -> list:
+        # Blocking: refreshes the matcher if needed and scores every job
+        return self.matcher().top_k(text, k)
+
+    def job_count(self) -> int:
+        return len(self.matcher())
+
+    async def try_admit(self) -> bool:
+        """
+        Takes an extraction slot without waiting; False when the service is saturated.
+        """
+        if self._slots.locked():
+            return False
+        # A free slot is taken without suspending, so nothing can claim it in between
+        await self._slots.acquire()
+        self.pending += 1
+        return True
+
+    async def admit(self) -> None:
+        # Batches wait for a slot instead of being rejected: their stream just slows down
+        await self._slots.acquire()
+        self.pending += 1
+
+    def release(self) -> None:
+        self.pending -= 1
+        self._slots.release()
+
+    async def extract(self, data: bytes, filename: str) -> dict:
+        """
+        Extracts key information from an uploaded CV; the caller holds an admission slot.
+        """
+        suffix = Path(filename).suffix.lower()
+        if suffix not in supported_suffixes():
+            raise ValueError(f"Unsupported file format: {suffix}")
+        loop = asyncio.get_running_loop()
+        digest, cached, text = await loop.run_in_executor(self.executor, self._read, data, suffix)
+        if cached is not None:
+            return cached
+        return await self.tool.aextract_from_text(text, digest=digest)
+
+    def _read(self, data: bytes, suffix: str) -> tuple:
+        # Hashing, the SQLite cache lookup and text extraction all block, so they run off the event loop
+        digest = file_digest(data)
+        cached = self.tool.lookup_cached(digest)
+        if cached is not None:
+            return digest, cached, None
+        return digest, None, self.tool.read_text(data, suffix).text
+
+    def close(self) -> None:
+        self.executor.shutdown(wait=False)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.service = Service(os.getenv("JOB_MATCHER_DIR", MATCHER_DIR))
+    yield
+    app.state.service.close()
+
+
+app = FastAPI(title="CV Info Extractor", lifespan=lifespan)
+
+
+async def _read_upload(upload: UploadFile) -> bytes:
+    data = await upload.read(MAX_UPLOAD_BYTES + 1)
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise HTTPException(413, f"{upload.filename} is larger than {MAX_UPLOAD_BYTES} bytes")
+    return data
+
+
+@app.post("/extract")
+async def extract(request: Request, file: UploadFile = File(...)):
+    service = request.app.state.service
+    data = await _read_upload(file)
+    if not await service.try_admit():
+        return JSONResponse({"error": "Too many extractions in progress"}, status_code=503, headers={"Retry-After": "1"})
+    try:
+        return await service.extract(data, file.filename)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+    finally:
+        service.release()
+
+
+@app.post("/extract/batch")
+async def extract_batch(request: Request, files: List[UploadFile] = File(...)):
+    """
+    Streams one result per file as soon as it is ready, as NDJSON or, with
+    `Accept: text/event-stream`, as server-sent events. At most BATCH_WINDOW files are
+    extracted at a time and the next one only starts once a result has been sent, so
+    a slow reader holds back the extraction instead of buffering results. Files stay in the
+    upload's temporary files until their turn, so at most BATCH_WINDOW are held in memory.
+    """
+    service = request.app.state.service
+    if len(files) > MAX_BATCH_FILES:
+        raise HTTPException(413, f"At most {MAX_BATCH_FILES} files per batch")
+    for upload in files:
+        if (upload.size or 0) > MAX_UPLOAD_BYTES:
+            raise HTTPException(413, f"{upload.filename} is larger than {MAX_UPLOAD_BYTES} bytes")
+    if sum(upload.size or 0 for upload in files) > MAX_BATCH_BYTES:
+        raise HTTPException(413, f"A batch may hold at most {MAX_BATCH_BYTES} bytes")
+    uploads = list(enumerate(files))
+    sse = "text/event-stream" in request.headers.get("accept", "")
+
+    async def run(index, upload):
+        await service.admit()
+        try:
+            data = await _read_upload(upload)
+            return {"index": index, "file": upload.filename, "result": await service.extract(data, upload.filename)}
+        except HTTPException as e:
+            return {"index": index, "file": upload.filename, "error": e.detail}
+        except Exception as e:
+            return {"index": index, "file": upload.filename, "error": str(e)}
+        finally:
+            service.release()
+
+    async def results():
+        queued = iter(uploads)
+        running = set()
+        try:
+            while True:
+                while len(running) < BATCH_WINDOW:
+                    upload = next(queued, None)
+                    if upload is None:
+                        break
+                    running.add(asyncio.ensure_future(run(*upload)))
+                if not running:
+                    break
+                done, running = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    line = json.dumps(task.result(), ensure_ascii=False)
+                    yield f"data: {line}\n\n" if sse else line + "\n"
+        finally:
+            # The client went away: stop the extractions it will never read
+            for task in running:
+                task.cancel()
+
+    return StreamingResponse(results(), media_type="text/event-stream" if sse else "application/x-ndjson")
+
+
+@app.post("/match")
+async def match(request: Request, body: MatchRequest):
+    service = request.app.state.service
+    text = profile_text(body.cv) if body.cv else body.text
+    if not text:
+        raise HTTPException(400, "Provide extracted CV fields (cv) or a query text")
+    # Reopening a changed index and scoring (a NumPy pass over the job matrix) both stay off the event loop
+    matches = await run_in_threadpool(service.top_k, text, max(1, min(body.k, 100)))
+    return {"matches": [{"job_id": job_id, "score": round(score, 4)} for job_id, score in matches]}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Per-stage timings and counters of this worker process, in the Prometheus text format
+    return PlainTextResponse(METRICS.prometheus_text(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/health")
+async def health(request: Request):
+    service = request.app.state.service
+    jobs = await run_in_threadpool(service.job_count)
+    return {"pending": service.pending, "max_pending": service.max_pending, "jobs": jobs}
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve CV extraction and job matching over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=1, help="server processes")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run("api:app", host=args.host, port=args.port, workers=args.workers)
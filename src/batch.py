@@ -0,0 +1,220 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, TextIO
+
+from tools.batched_extraction import BatchSizer
+from tools.extraction_cache import file_digest
+from tools.llm_output import PARSE_STATS
+from tools.metrics import METRICS, JsonLogHook, increment, serve
+from tools.mapped_file import map_file
+from tools.text_extractors import extract_text, supported_suffixes
+
+if TYPE_CHECKING:
+    # Imported for annotations only: the parse workers never need langchain
+    from tools.file_reader_tool import FileReadTool
+
+logger = logging.getLogger(__name__)
+
+
+def _digest_cv(path: str) -> str:
+    """
+    Hashes the raw bytes of a CV, which is all the extraction cache needs to look it up.
+    """
+    with map_file(Path(path)) as file_bytes:
+        return file_digest(file_bytes)
+
+
+def _parse_cv(path: str, max_chars: Optional[int], max_tokens: Optional[int]) -> tuple:
+    """
+    Reads a CV and extracts its text within the budget. Runs inside the parser process pool;
+    the parse time is returned so the parent process can record it.
+    """
+    start = time.perf_counter()
+    file = Path(path)
+    with map_file(file) as file_bytes:
+        extracted = extract_text(file_bytes, file.suffix, max_chars=max_chars, max_tokens=max_tokens)
+        return extracted, time.perf_counter() - start
+
+
+def process_cvs(
+    paths: Iterable[str],
+    workers: Optional[int] = None,
+    llm_concurrency: int = 8,
+    max_buffered: Optional[int] = None,
+    tool: Optional["FileReadTool"] = None,
+    output: Optional[TextIO] = None,
+    batch_size: int = 1,
+    batch_tokens: int = 12000,
+) -> Iterator[dict]:
+    """
+    Extracts key information from many CVs and yields one record per file in completion order.
+
+    Text extraction runs in a pool of `workers` processes and LLM calls in a pool of
+    `llm_concurrency` threads. At most `max_buffered` files are parsed ahead of the
+    LLM stage, so a slow LLM holds back parsing instead of piling up extracted text.
+    Files already in the extraction cache are answered from it without being parsed.
+    A failing file yields an error record and does not stop the batch.
+    If `output` is given, every record is also written to it as a JSON line.
+    With `batch_size` above one, up to that many CVs (and `batch_tokens` prompt tokens)
+    share one LLM request; the batch size adapts to the observed latency and errors.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_buffered = max_buffered or 2 * (workers + llm_concurrency)
+    if tool is None:
+        from main import build_tool
+        tool = build_tool()
+    sizer = BatchSizer(max_size=batch_size, token_budget=batch_tokens) if batch_size > 1 else None
+
+    pending_paths = iter(str(path) for path in paths)
+    parsing = {}  # parse future -> (path, digest)
+    extracting = {}  # LLM future -> (paths, per-CV stats: pages skipped, prompt tokens)
+    parsed = deque()  # (path, digest, extracted text) waiting for an LLM slot
+
+    def emit(record: dict) -> dict:
+        if output is not None:
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+            output.flush()
+        return record
+
+    with ProcessPoolExecutor(max_workers=workers) as parser_pool, \
+            ThreadPoolExecutor(max_workers=llm_concurrency) as llm_pool:
+        exhausted = False
+        while True:
+            # Keep the parser busy only while the downstream buffer has room
+            while not exhausted and len(parsing) + len(parsed) < max_buffered:
+                path = next(pending_paths, None)
+                if path is None:
+                    exhausted = True
+                    break
+                # Hashing is much cheaper than parsing, so cache hits skip the parser pool
+                try:
+                    digest = _digest_cv(path)
+                except Exception as e:
+                    yield emit({"path": path, "ok": False, "error": f"{type(e).__name__}: {e}"})
+                    continue
+                cached = tool.lookup_cached(digest)
+                if cached is not None:
+                    yield emit({"path": path, "ok": True, "cached": True, "result": cached})
+                    continue
+                parsing[parser_pool.submit(_parse_cv, path, *tool.text_budget)] = (path, digest)
+
+            while parsed and len(extracting) < llm_concurrency:
+                if sizer is None:
+                    path, digest, extracted = parsed.popleft()
+                    stats = {"pages_skipped": extracted.pages_skipped}
+                    future = llm_pool.submit(tool.extract_from_text, extracted.text, digest, stats)
+                    extracting[future] = ([path], [stats])
+                    continue
+
+                # Wait for a full batch while more CVs are still being parsed
+                if len(parsed) < sizer.size and parsing:
+                    break
+                group = [parsed.popleft() for _ in range(min(sizer.size, len(parsed)))]
+                stats = [{"pages_skipped": extracted.pages_skipped} for _, _, extracted in group]
+                future = llm_pool.submit(
+                    tool.extract_batch,
+                    [extracted.text for _, _, extracted in group],
+                    [digest for _, digest, _ in group],
+                    stats,
+                    sizer,
+                )
+                extracting[future] = ([path for path, _, _ in group], stats)
+
+            if not parsing and not extracting:
+                break
+
+            done, _ = wait(list(parsing) + list(extracting), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in parsing:
+                    path, digest = parsing.pop(future)
+                    try:
+                        extracted, seconds = future.result()
+                    except Exception as e:
+                        yield emit({"path": path, "ok": False, "error": f"{type(e).__name__}: {e}"})
+                        continue
+                    METRICS.observe("parse", seconds)
+                    increment("pages", extracted.pages_read)
+                    increment("characters", len(extracted.text))
+                    parsed.append((path, digest, extracted))
+                else:
+                    paths, stats = extracting.pop(future)
+                    try:
+                        results = future.result()
+                    except Exception as e:
+                        results = e
+                    if sizer is None or isinstance(results, Exception):
+                        results = [results] * len(paths)
+                    for path, cv_stats, result in zip(paths, stats, results):
+                        if isinstance(result, Exception):
+                            yield emit({"path": path, "ok": False, "error": f"{type(result).__name__}: {result}"})
+                        else:
+                            yield emit({"path": path, "ok": True, "cached": False, **cv_stats, "result": result})
+
+    if sizer is not None:
+        logger.info("Batched extraction: %s", sizer.summary())
+    logger.info("LLM output parsing: %s", PARSE_STATS.summary())
+
+
+def _expand_paths(inputs: Iterable[str]) -> Iterator[str]:
+    """
+    Expands directories into the CV files they contain.
+    """
+    suffixes = set(supported_suffixes())
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            yield from (str(p) for p in sorted(path.iterdir()) if p.suffix.lower() in suffixes)
+        else:
+            yield str(path)
+
+
+def main(argv=None):
+    from main import build_tool
+
+    parser = argparse.ArgumentParser(description="Extract key information from many CVs as JSON lines.")
+    parser.add_argument("inputs", nargs="+", help="CV files or directories containing them")
+    parser.add_argument("-o", "--output", help="JSONL file to write (defaults to stdout)")
+    parser.add_argument("-w", "--workers", type=int, default=None, help="text extraction processes")
+    parser.add_argument("-c", "--llm-concurrency", type=int, default=8, help="concurrent LLM requests")
+    parser.add_argument("--no-llm", action="store_true", help="return only the rule-based fields")
+    parser.add_argument("-b", "--batch-size", type=int, default=1, help="max CVs per LLM request (1 disables batching)")
+    parser.add_argument("--batch-tokens", type=int, default=12000, help="prompt token budget of one batched request")
+    parser.add_argument("--metrics-log", help="append per-stage timing events to this JSON lines file")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this port while running")
+    args = parser.parse_args(argv)
+
+    # Progress and summaries go to stderr; stdout may carry the JSON lines
+    logging.basicConfig(level=logging.INFO)
+    if args.metrics_log:
+        METRICS.add_hook(JsonLogHook(args.metrics_log))
+    if args.metrics_port:
+        serve(args.metrics_port)
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    failures = 0
+    try:
+        for record in process_cvs(
+            _expand_paths(args.inputs),
+            workers=args.workers,
+            llm_concurrency=args.llm_concurrency,
+            tool=build_tool(use_llm=not args.no_llm),
+            output=output,
+            batch_size=args.batch_size,
+            batch_tokens=args.batch_tokens,
+        ):
+            failures += not record["ok"]
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,3 @@
+"""
+Benchmarks for the CV extraction pipeline. Run from `src/`, e.g. `python -m benchmarks.async_throughput`.
+"""
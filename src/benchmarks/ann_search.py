@@ -0,0 +1,69 @@
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from ann_index import IVFIndex
+from benchmarks.synthetic_cv import cv_lines
+from benchmarks.synthetic_jobs import job_vectors
+from job_matcher import DEFAULT_DIM, JobMatcher
+
+
+def timed(func, queries):
+    """
+    Runs `func` on every query and returns (results, latencies in ms).
+    """
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(func(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, latencies
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare IVF job search with brute-force scoring.")
+    parser.add_argument("--jobs", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM)
+    parser.add_argument("--nlist", type=int, default=None, help="IVF lists (default: about sqrt(jobs))")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        matcher = JobMatcher(f"{directory}/flat", dim=args.dim)
+        index = IVFIndex(f"{directory}/ivf", dim=args.dim, nlist=args.nlist)
+        start = time.perf_counter()
+        for ids, vectors in job_vectors(matcher.vectorize, args.jobs):
+            matcher.add_vectors(ids, vectors)
+        flat_build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        ids, vectors = next(job_vectors(matcher.vectorize, min(args.jobs, 100_000), seed=1))
+        index.train(vectors)
+        for ids, vectors in job_vectors(matcher.vectorize, args.jobs):
+            index.add(ids, vectors)
+        ivf_build = time.perf_counter() - start
+        print(f"{args.jobs} jobs, dim {args.dim}, {index.nlist} lists; "
+              f"build: flat {flat_build:.1f} s, IVF {ivf_build:.1f} s")
+
+        queries = [matcher.query_vector("\n".join(cv_lines(seed=i)[2:6])) for i in range(args.queries)]
+        exact, latencies = timed(lambda q: matcher.search(q, args.k, exact=True), queries)
+        exact_ids = [{job_id for job_id, _ in result} for result in exact]
+
+        print(f"{'method':>14}{'recall@' + str(args.k):>11}{'p50 ms':>9}{'p99 ms':>9}")
+        print(f"{'brute force':>14}{1.0:>11.3f}{np.percentile(latencies, 50):>9.2f}{np.percentile(latencies, 99):>9.2f}")
+        for nprobe in args.nprobe:
+            results, latencies = timed(lambda q: index.search(q, args.k, nprobe=nprobe), queries)
+            recall = np.mean([
+                len(truth & {job_id for job_id, _ in result}) / max(len(truth), 1)
+                for truth, result in zip(exact_ids, results)
+            ])
+            label = f"IVF nprobe={nprobe}"
+            print(f"{label:>14}{recall:>11.3f}{np.percentile(latencies, 50):>9.2f}{np.percentile(latencies, 99):>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
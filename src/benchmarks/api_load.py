@@ -0,0 +1,145 @@
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.synthetic_cv import cv_lines, render_pdf
+from benchmarks.synthetic_jobs import job_posting
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def start_service(llm_url: str, directory: str, jobs: int, workers: int) -> tuple:
+    """
+    Runs src/api.py under uvicorn in a separate process, configured for the fake LLM.
+    Returns the process and the service URL.
+    """
+    from job_matcher import JobMatcher
+
+    src = str(Path(__file__).resolve().parents[1])
+    JobMatcher(f"{directory}/matcher").add_many((i, job_posting(i)) for i in range(jobs))
+    env = dict(
+        os.environ,
+        PYTHONPATH=src,
+        OPENAI_API_KEY="sk-fake",
+        OPENAI_MODEL_NAME="fake-model",
+        OPENAI_BASE_URL=llm_url,
+        JOB_MATCHER_DIR=f"{directory}/matcher",
+    )
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    # main.py keeps its caches and indexes under ./data, so the service runs in the temp directory
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api:app", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=directory,
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(600):
+        try:
+            httpx.get(f"{url}/health").raise_for_status()
+            return process, url
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("The service did not start")
+
+
+async def load(client: httpx.AsyncClient, make_request, count: int, concurrency: int) -> dict:
+    """
+    Sends `count` requests from `concurrency` concurrent callers; returns throughput and latencies.
+    """
+    latencies, statuses = [], {}
+    next_index = iter(range(count))
+
+    async def caller():
+        for index in next_index:
+            start = time.perf_counter()
+            response = await make_request(client, index)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(concurrency)))
+    seconds = time.perf_counter() - start
+    return {"rps": count / seconds, "latencies": latencies, "statuses": statuses}
+
+
+def report(label: str, result: dict) -> None:
+    ms = [latency * 1000 for latency in result["latencies"]]
+    statuses = ",".join(f"{status}x{count}" for status, count in sorted(result["statuses"].items()))
+    print(f"{label:<30}{result['rps']:>9.1f}{statistics.median(ms):>9.0f}{percentile(ms, 0.95):>9.0f}"
+          f"{percentile(ms, 0.99):>9.0f}  {statuses}")
+
+
+async def run(url: str, args) -> None:
+    cvs = [render_pdf(cv_lines(seed)) for seed in range(args.requests)]
+
+    def extract(client, index):
+        return client.post("/extract", files={"file": (f"cv_{index}.pdf", cvs[index], "application/pdf")})
+
+    def match(client, index):
+        return client.post("/match", json={"text": job_posting(index), "k": 10})
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=120) as client:
+        print(f"{'endpoint':<30}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}  statuses")
+        report("/extract, new CVs", await load(client, extract, args.requests, args.concurrency))
+        report("/extract, cached CVs", await load(client, extract, args.requests, args.concurrency))
+        report(f"/match, {args.jobs} jobs", await load(client, match, args.requests, args.concurrency))
+
+        # One batch of new CVs: results stream back as they finish
+        batch = [("files", (f"batch_{i}.pdf", render_pdf(cv_lines(100_000 + i)), "application/pdf")) for i in range(args.batch)]
+        start, first, lines = time.perf_counter(), None, 0
+        async with client.stream("POST", "/extract/batch", files=batch) as response:
+            async for line in response.aiter_lines():
+                if line:
+                    first = first or time.perf_counter() - start
+                    lines += 1
+        total = time.perf_counter() - start
+        print(f"/extract/batch, {args.batch} CVs: first result after {first * 1000:.0f} ms, "
+              f"all {lines} after {total * 1000:.0f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the ASGI service (src/api.py) against a fake LLM.")
+    parser.add_argument("--url", help="an already running service (default: start one in a subprocess)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency in seconds")
+    parser.add_argument("--jobs", type=int, default=10_000, help="jobs indexed for /match")
+    parser.add_argument("--batch", type=int, default=32, help="CVs in the /extract/batch request")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    args = parser.parse_args(argv)
+
+    llm = FakeLLMServer(latency=args.latency).start()
+    process = None
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            url = args.url
+            if url is None:
+                process, url = start_service(llm.base_url, directory, args.jobs, args.workers)
+            print(f"{args.requests} requests from {args.concurrency} clients, fake LLM latency {args.latency * 1000:.0f} ms")
+            asyncio.run(run(url, args))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        llm.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import asyncio
+import tempfile
+import time
+
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.synthetic_cv import write_corpus
+from tools.file_reader_tool import FileReadTool
+
+
+def run_sync(tool: FileReadTool, paths) -> float:
+    start = time.perf_counter()
+    for path in paths:
+        tool.run(str(path))
+    return time.perf_counter() - start
+
+
+async def run_async(tool: FileReadTool, paths) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*(tool.arun(str(path)) for path in paths))
+    return time.perf_counter() - start
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare sync and async FileReadTool throughput against a fake LLM.")
+    parser.add_argument("--cvs", type=int, default=50, help="number of synthetic CVs")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=100, help="async in-flight limit")
+    args = parser.parse_args(argv)
+
+    server = FakeLLMServer(latency=args.latency).start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = write_corpus(tmp, args.cvs)
+            tool = FileReadTool(
+                api_key="sk-fake",
+                model_name="fake-model",
+                base_url=server.base_url,
+                max_concurrency=args.concurrency,
+            )
+            sync_seconds = run_sync(tool, paths)
+            async_seconds = asyncio.run(run_async(tool, paths))
+    finally:
+        server.stop()
+
+    print(f"{args.cvs} CVs, fake LLM latency {args.latency * 1000:.0f} ms, async concurrency {args.concurrency}")
+    print(f"{'mode':<8}{'seconds':>10}{'CVs/sec':>10}")
+    print(f"{'sync':<8}{sync_seconds:>10.2f}{args.cvs / sync_seconds:>10.1f}")
+    print(f"{'async':<8}{async_seconds:>10.2f}{args.cvs / async_seconds:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
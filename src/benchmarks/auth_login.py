@@ -0,0 +1,95 @@
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "undeveloped_parts" / "backend"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark a burst of logins against the Flask backend on SQLite.")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[12, 10], help="bcrypt cost factors to compare")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="hashing processes")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp()
+    # The backend reads its configuration at import time; keep every file it writes in the temp directory
+    os.environ["DATABASE_URL"] = f"sqlite:///{directory}/users.sqlite3"
+    os.environ["JOB_MATCHER_DIR"] = f"{directory}/matcher"
+    os.environ["CV_QUEUE_PATH"] = f"{directory}/queue.sqlite3"
+    os.environ["AUTH_HASH_WORKERS"] = "0"
+    os.chdir(directory)
+    sys.path.append(str(BACKEND_DIR))
+    import job_matching_auth as backend  # noqa: E402
+    from auth_helpers import PasswordHasher, TTLCache  # noqa: E402
+    from werkzeug.serving import make_server  # noqa: E402
+
+    # (label, hasher, user cache); the first is the old path: bcrypt on the request thread, a query per login
+    modes = [(f"inline, cost {args.rounds[0]}, no cache", PasswordHasher(args.rounds[0], workers=0), TTLCache(ttl=0))]
+    for rounds in args.rounds:
+        modes.append((f"{args.workers} workers, cost {rounds}, cache", PasswordHasher(rounds, workers=args.workers), TTLCache()))
+    # Worker processes are forked before the server starts its threads
+    for _, hasher, _ in modes:
+        hasher.start()
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    server = make_server("127.0.0.1", 0, backend.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    local = threading.local()
+
+    def probe(stop, latencies):
+        # A cheap request issued alongside the burst: how responsive the server stays
+        session = requests.Session()
+        while not stop.is_set():
+            start = time.perf_counter()
+            session.get(base_url + "/")
+            latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(0.05)
+
+    def post(path, payload):
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        start = time.perf_counter()
+        response = local.session.post(base_url + path, json=payload)
+        return response.status_code, time.perf_counter() - start
+
+    print(f"{args.logins} logins from {args.concurrency} clients")
+    print(f"{'mode':<34}{'logins/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'GET / p50 ms':>14}")
+    for index, (label, hasher, cache) in enumerate(modes):
+        backend.password_hasher, backend.user_cache = hasher, cache
+        credentials = {"email": f"user{index}@example.com", "password": "correct horse battery staple", "name": "User"}
+        assert post("/register", credentials)[0] == 201
+        login = {"email": credentials["email"], "password": credentials["password"]}
+
+        stop, probes = threading.Event(), []
+        prober = threading.Thread(target=probe, args=(stop, probes))
+        prober.start()
+        start = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as pool:
+            results = list(pool.map(lambda _: post("/login", login), range(args.logins)))
+        seconds = time.perf_counter() - start
+        stop.set()
+        prober.join()
+        assert all(status == 200 for status, _ in results), {status for status, _ in results}
+        latencies = sorted(latency * 1000 for _, latency in results)
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        print(f"{label:<34}{args.logins / seconds:>10.1f}{statistics.median(latencies):>9.0f}{p95:>9.0f}{statistics.median(probes):>14.1f}")
+
+    server.shutdown()
+    for _, hasher, _ in modes:
+        hasher.shutdown()
+
+
+if __name__ == "__main__":
+    main()
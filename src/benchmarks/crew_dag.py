@@ -0,0 +1,126 @@
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+
+from benchmarks.job_scraping import FixtureServer, fixture_page
+
+# The crew helpers live with the crewAI experiments
+sys.path.append(str(Path(__file__).resolve().parents[2] / "undeveloped_parts" / "additional_files" / "crewai_parts"))
+from dag import TaskGraph  # noqa: E402
+from job_scraper import scrape_jobs_from_web  # noqa: E402
+
+CV_DATA = {"desired_position": "Backend Developer", "preferred_location": "Almaty"}
+
+
+def build_graph(steps, prefetch=None) -> TaskGraph:
+    """
+    The MatchToProposalCrew.run graph over stand-in steps; `prefetch` is the (query, location) guessed up front.
+    """
+    read_cv, scrape, match_cv = steps
+    graph = TaskGraph()
+    prefetched, cancel = Future(), threading.Event()
+
+    def read():
+        try:
+            return read_cv()
+        except Exception:
+            cancel.set()
+            raise
+
+    graph.add("read_cv", read)
+    if prefetch:
+        def prefetch_jobs():
+            if not prefetched.set_running_or_notify_cancel():
+                return
+            try:
+                prefetched.set_result(scrape(*prefetch, stop_event=cancel))
+            except Exception as e:
+                prefetched.set_exception(e)
+
+        graph.add("prefetch_jobs", prefetch_jobs)
+
+    def scrape_jobs(read_cv):
+        search = (read_cv["desired_position"], read_cv["preferred_location"])
+        if search == prefetch:
+            return prefetched.result()
+        cancel.set()
+        return scrape(*search)
+
+    graph.add("scrape_jobs", scrape_jobs, after=["read_cv"])
+    graph.add("match_cv", lambda scrape_jobs: match_cv(scrape_jobs), after=["scrape_jobs"])
+    return graph
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare sequential and DAG execution of the match-to-proposal crew.")
+    parser.add_argument("--read-latency", type=float, default=1.5, help="seconds the CV reader agent takes")
+    parser.add_argument("--match-latency", type=float, default=1.0, help="seconds the matcher agent takes")
+    parser.add_argument("--pages", type=int, default=5, help="result pages scraped per search")
+    parser.add_argument("--latency", type=float, default=0.3, help="seconds per job board response")
+    args = parser.parse_args(argv)
+
+    server = FixtureServer([fixture_page(seed) for seed in range(10)], latency=args.latency).start()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            def read_cv():
+                time.sleep(args.read_latency)  # LLM extraction stand-in
+                return CV_DATA
+
+            def failing_read_cv():
+                time.sleep(args.read_latency)
+                raise ValueError("unreadable CV")
+
+            def scrape(query, location, **options):
+                output = f"{directory}/jobs_{query}_{location}.csv".replace(" ", "_")
+                # One request in flight, like a polite scrape of one host
+                return scrape_jobs_from_web(
+                    query, location, output_file=output, pages=args.pages,
+                    per_host=1, interval=0, base_url=server.base_url, **options,
+                )
+
+            def match_cv(jobs_csv):
+                time.sleep(args.match_latency)  # LLM matching stand-in
+                return jobs_csv
+
+            steps = (read_cv, scrape, match_cv)
+            runs = {
+                "sequential": None,
+                "dag, prefetch hit": (CV_DATA["desired_position"], CV_DATA["preferred_location"]),
+                "dag, prefetch miss": ("general job", CV_DATA["preferred_location"]),
+            }
+            totals = {}
+            for label, prefetch in runs.items():
+                graph = build_graph(steps, prefetch)
+                if prefetch is None:
+                    graph.max_workers = 1
+                start = time.perf_counter()
+                graph.run()
+                totals[label] = time.perf_counter() - start
+                print(f"\n{label}")
+                print(graph.report())
+
+            # A failed CV read stops the prefetch instead of waiting for its remaining pages
+            graph = build_graph((failing_read_cv, scrape, match_cv), runs["dag, prefetch hit"])
+            start = time.perf_counter()
+            try:
+                graph.run()
+            except ValueError:
+                pass
+            failed = time.perf_counter() - start
+            print("\ndag, CV read fails")
+            print(graph.report())
+    finally:
+        server.stop()
+
+    print()
+    for label, seconds in totals.items():
+        print(f"{label:<22}{seconds:>7.2f}s{totals['sequential'] / seconds:>7.2f}x")
+    print(f"{'dag, CV read fails':<22}{failed:>7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from cv_store import CVStore, normalize_skill, parse_query, parse_years, skill_keys
+from tools.rule_extractor import SKILLS
+
+QUERIES = [
+    "Python AND Kubernetes, >=5 years",
+    "Python AND Docker AND PostgreSQL",
+    "Rust AND Kafka, 10+ years",
+    "Java",
+    ">= 20 years",
+]
+
+
+def synthetic_cvs(count: int, seed: int = 0, chunk: int = 50_000):
+    """
+    Yields lists of extracted-CV dicts. Skill popularity follows a Zipf-like curve, so the
+    first skills (Python, Java, ...) are on many CVs and the tail on few.
+    """
+    rng = np.random.default_rng(seed)
+    log_weights = -0.8 * np.log(np.arange(1, len(SKILLS) + 1))
+    for start in range(0, count, chunk):
+        size = min(chunk, count - start)
+        skill_counts = rng.integers(3, 12, size)
+        years = np.round(rng.gamma(2.0, 3.5, size), 1)
+        # Weighted sampling without replacement for the whole chunk at once (Gumbel top-k)
+        picks = np.argsort(-(log_weights + rng.gumbel(size=(size, len(SKILLS)))), axis=1)[:, :skill_counts.max()]
+        yield [
+            {
+                "Name": f"Candidate {start + i}",
+                "Email": f"candidate{start + i}@example.com",
+                "Skills": [SKILLS[j] for j in picks[i, :skill_counts[i]]],
+                "Years of Experience": float(years[i]),
+            }
+            for i in range(size)
+        ]
+
+
+def sql_search(store: CVStore, text: str) -> list:
+    """
+    The same query answered by SQLite alone: a join per skill on the posting table plus the years index.
+    """
+    parsed = parse_query(text)
+    joins, where, params = [], ["1 = 1"], []
+    for index, skill in enumerate(parsed.skills):
+        joins.append(
+            f"JOIN candidate_skills cs{index} ON cs{index}.candidate_id = c.id"
+            f" AND cs{index}.skill_id = (SELECT id FROM skills WHERE name = ?)"
+        )
+        params.append(normalize_skill(skill))
+    if parsed.min_years is not None:
+        where.append("c.years >= ?")
+        params.append(parsed.min_years)
+    if parsed.max_years is not None:
+        where.append("c.years <= ?")
+        params.append(parsed.max_years)
+    sql = f"SELECT c.id FROM candidates c {' '.join(joins)} WHERE {' AND '.join(where)} ORDER BY c.id DESC"
+    return [row[0] for row in store._conn.execute(sql, params)]
+
+
+def json_scan(store: CVStore, text: str) -> list:
+    """
+    The unindexed way: decode every stored JSON document and test it.
+    """
+    parsed = parse_query(text)
+    wanted = {normalize_skill(skill) for skill in parsed.skills}
+    ids = []
+    for candidate_id, data in store._conn.execute("SELECT id, data FROM candidates ORDER BY id DESC"):
+        cv = json.loads(data)
+        years = parse_years(cv.get("Years of Experience"))
+        if not wanted <= set(skill_keys(cv.get("Skills"))):
+            continue
+        if parsed.min_years is not None and (years is None or years < parsed.min_years):
+            continue
+        if parsed.max_years is not None and (years is None or years > parsed.max_years):
+            continue
+        ids.append(candidate_id)
+    return ids
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark skill and experience queries over the CV store.")
+    parser.add_argument("--count", type=int, default=1_000_000, help="synthetic CVs")
+    parser.add_argument("--runs", type=int, default=20, help="warm runs per query")
+    parser.add_argument("--scan", action="store_true", help="also time the JSON rescan (slow)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = CVStore(f"{directory}/cvs.sqlite3")
+        start = time.perf_counter()
+        for cvs in synthetic_cvs(args.count):
+            store.add_many(cvs)
+        seconds = time.perf_counter() - start
+        size_mb = os.path.getsize(store.path) / 2**20
+        print(f"stored {args.count} CVs in {seconds:.1f}s ({args.count / seconds:,.0f}/s), {size_mb:.0f} MB")
+
+        # A fresh store, so the first query pays for loading the index
+        store = CVStore(str(store.path))
+        print(f"\n{'query':<36}{'matches':>9}{'cold ms':>9}{'p50 ms':>8}{'p99 ms':>8}{'sql ms':>9}" + ("   scan ms" if args.scan else ""))
+        for text in QUERIES:
+            parsed = parse_query(text)
+            start = time.perf_counter()
+            ids = store.search(parsed.skills, parsed.min_years, parsed.max_years)
+            cold = (time.perf_counter() - start) * 1000
+            latencies = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                store.search(parsed.skills, parsed.min_years, parsed.max_years)
+                latencies.append((time.perf_counter() - start) * 1000)
+            p50, p99 = np.percentile(latencies, [50, 99])
+
+            start = time.perf_counter()
+            expected = sql_search(store, text)
+            sql_ms = (time.perf_counter() - start) * 1000
+            assert ids == expected, f"{text}: index and SQL disagree"
+            line = f"{text:<36}{len(ids):>9}{cold:>9.1f}{p50:>8.2f}{p99:>8.2f}{sql_ms:>9.0f}"
+            if args.scan:
+                start = time.perf_counter()
+                assert json_scan(store, text) == ids
+                line += f"{(time.perf_counter() - start) * 1000:>10.0f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_cv import write_corpus
+from tools.text_extractors import BACKENDS, extract_text, select_backends, text_quality
+
+
+def benchmark_backend(name: str, files: list) -> dict:
+    """
+    Runs one backend over every file it supports and collects speed and text yield.
+    """
+    backend = BACKENDS[name]
+    row = {"backend": name, "files": 0, "pages": 0, "chars": 0, "empty": 0, "errors": 0, "seconds": 0.0, "quality": 0.0}
+    for path, file_bytes in files:
+        if path.suffix.lower() not in backend.suffixes:
+            continue
+        row["files"] += 1
+        start = time.perf_counter()
+        try:
+            extracted = extract_text(file_bytes, path.suffix, backend=name)
+        except Exception:
+            row["errors"] += 1
+            continue
+        row["seconds"] += time.perf_counter() - start
+        row["pages"] += extracted.pages_read
+        row["chars"] += len(extracted.text)
+        row["empty"] += not extracted.text.strip()
+        row["quality"] += text_quality(extracted.text)
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report pages/sec and text yield for each text extraction backend.")
+    parser.add_argument("--corpus", help="directory of sample CVs (defaults to a synthetic PDF/DOCX corpus)")
+    parser.add_argument("--count", type=int, default=20, help="synthetic CVs per file type and page count")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.corpus:
+            paths = sorted(p for p in Path(args.corpus).iterdir() if p.is_file())
+        else:
+            paths = []
+            for suffix in (".pdf", ".docx", ".txt"):
+                for pages in (1, 3, 10):
+                    paths += write_corpus(tmp, args.count, pages=pages, suffix=suffix)
+        files = [(path, path.read_bytes()) for path in paths]
+
+    available = [b.name for b in BACKENDS.values() if b.available()]
+    missing = [b.name for b in BACKENDS.values() if not b.available()]
+    print(f"{len(files)} files; backends not installed: {', '.join(missing) or 'none'}")
+    print(f"{'backend':<14}{'files':>7}{'errors':>8}{'empty':>7}{'pages/sec':>11}{'chars/page':>12}{'quality':>9}")
+    for name in available:
+        row = benchmark_backend(name, files)
+        if not row["files"]:
+            continue
+        ok = row["files"] - row["errors"]
+        pages_per_sec = row["pages"] / row["seconds"] if row["seconds"] else 0.0
+        chars_per_page = row["chars"] / row["pages"] if row["pages"] else 0.0
+        quality = row["quality"] / ok if ok else 0.0
+        print(
+            f"{name:<14}{row['files']:>7}{row['errors']:>8}{row['empty']:>7}"
+            f"{pages_per_sec:>11.1f}{chars_per_page:>12.0f}{quality:>9.2f}"
+        )
+
+    for suffix in sorted({path.suffix.lower() for path, _ in files}):
+        order = [b.name for b in select_backends(suffix)]
+        if order:
+            print(f"auto-selection order for {suffix}: {' > '.join(order)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic_cv import POSITIONS, SKILLS
+
+CITIES = ["Москва", "Санкт-Петербург", "Алматы", "Астана", "Новосибирск"]
+EXPERIENCE = ["Нет опыта", "От 1 года до 3 лет", "От 3 до 6 лет", "Более 6 лет"]
+
+
+def synthetic_vacancies(count: int, seed: int = 0, newest: datetime = datetime(2024, 6, 1, 12, 0), first_id: int = 100_000_000) -> list:
+    """
+    Vacancy items shaped like the hh.ru /vacancies response, newest first.
+    """
+    rng = random.Random(seed)
+    return [
+        {
+            "id": str(first_id + i),
+            "name": rng.choice(POSITIONS),
+            "employer": {"name": f"Company {rng.randint(1, 500)}"},
+            "area": {"name": rng.choice(CITIES)},
+            "published_at": (newest - timedelta(minutes=i)).strftime("%Y-%m-%dT%H:%M:%S+0300"),
+            "snippet": {"responsibility": f"Work with {', '.join(rng.sample(SKILLS, 3))}."},
+            "experience": {"name": rng.choice(EXPERIENCE)},
+        }
+        for i in range(count)
+    ]
+
+
+def _parse_time(value: str) -> datetime:
+    # ISO 8601 with a UTC offset, as hh.ru uses for published_at and accepts for date_from/date_to
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+
+
+class FakeHHServer(ThreadingHTTPServer):
+    """
+    Local replay of the hh.ru vacancy search: pages through a fixture list of vacancy items
+    with the API's paging, `date_from`/`date_to` filters and 2000-result depth limit, after a fixed latency.
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, vacancies: list, host: str = "127.0.0.1", port: int = 0, latency: float = 0.05):
+        super().__init__((host, port), _Handler)
+        self.vacancies = vacancies
+        self.latency = latency
+        self.requests_served = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/vacancies"
+
+    def start(self) -> "FakeHHServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def process_request_thread(self, request, client_address):
+        with self._lock:
+            self.connections += 1
+        super().process_request_thread(request, client_address)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        query = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        time.sleep(self.server.latency)
+        with self.server._lock:
+            self.server.requests_served += 1
+
+        per_page = min(int(query.get("per_page", 20)), 100)
+        page = int(query.get("page", 0))
+        items = self.server.vacancies
+        # Bounds and published_at are compared as timezone-aware times, both inclusive
+        if "date_from" in query:
+            date_from = _parse_time(query["date_from"])
+            items = [item for item in items if _parse_time(item["published_at"]) >= date_from]
+        if "date_to" in query:
+            date_to = _parse_time(query["date_to"])
+            items = [item for item in items if _parse_time(item["published_at"]) <= date_to]
+        visible = items[:2000]
+        body = json.dumps({
+            "items": visible[page * per_page:(page + 1) * per_page],
+            "found": len(items),
+            "pages": math.ceil(len(visible) / per_page),
+            "page": page,
+            "per_page": per_page,
+        }, ensure_ascii=False).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve hh.ru vacancy search results from a fixture.")
+    parser.add_argument("--fixture", help="JSON list of recorded vacancy items (default: synthetic)")
+    parser.add_argument("--count", type=int, default=2000, help="synthetic vacancies when no fixture is given")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+    vacancies = json.load(open(args.fixture, encoding="utf-8")) if args.fixture else synthetic_vacancies(args.count)
+    server = FakeHHServer(vacancies, port=args.port, latency=args.latency)
+    print(f"Fake hh.ru listening on {server.base_url}")
+    server.serve_forever()
@@ -0,0 +1,156 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CANNED_RESPONSE = {
+    "Name": "Jane Doe",
+    "Email": "jane.doe@example.com",
+    "Desired Position": "Backend Developer",
+    "Skills": ["Python", "SQL", "Docker"],
+    "Years of Experience": 5,
+    "Education Background": "BSc Computer Science",
+}
+
+# Document markers of a batched prompt (see tools/batched_extraction.py)
+BATCH_DOC_RE = re.compile(r"^=== CV (\S+) ===$", re.MULTILINE)
+
+
+class FakeLLMServer(ThreadingHTTPServer):
+    """
+    Local OpenAI-compatible chat completions endpoint that answers after a fixed latency.
+    Batched prompts get the canned response once per document id unless `content` is fixed.
+
+    `jitter` adds up to that many seconds to each response, and a fraction `error_rate` of
+    requests fail with `error_status`. Both draw from a generator seeded with `seed`, so a
+    run with the same settings and request order sees the same delays and failures.
+    `response` replaces the canned JSON object.
+    """
+
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.2,
+        content: str = None,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 500,
+        response: dict = None,
+        seed: int = 0,
+    ):
+        super().__init__((host, port), _Handler)
+        self.latency = latency
+        self.content = content
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.response = response if response is not None else CANNED_RESPONSE
+        self.requests_served = 0
+        self.errors_served = 0
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def draw(self) -> tuple:
+        # (delay, fail) for the next request
+        with self._rng_lock:
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            fail = bool(self.error_rate) and self._rng.random() < self.error_rate
+        return delay, fail
+
+    def start(self) -> "FakeLLMServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        delay, fail = self.server.draw()
+        time.sleep(delay)
+        if fail:
+            self.server.errors_served += 1
+            self._send(self.server.error_status, {
+                "error": {"message": "Injected failure", "type": "server_error", "code": None},
+            })
+            return
+        self.server.requests_served += 1
+
+        prompt = "\n".join(str(message.get("content", "")) for message in request.get("messages", []))
+        content = self.server.content
+        if content is None:
+            doc_ids = BATCH_DOC_RE.findall(prompt)
+            response = self.server.response
+            content = json.dumps({doc_id: response for doc_id in doc_ids} if doc_ids else response)
+
+        # Rough token counts (4 characters each), so usage metrics have something to add up
+        prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+        self._send(200, {
+            "id": f"chatcmpl-fake-{self.server.requests_served}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "fake"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _send(self, status: int, payload: dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI-compatible LLM server.")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds per response")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=500, help="HTTP status of failed requests")
+    parser.add_argument("--response", help="JSON file with the object to answer with")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    response = None
+    if args.response:
+        with open(args.response, encoding="utf-8") as file:
+            response = json.load(file)
+    server = FakeLLMServer(
+        port=args.port, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        error_status=args.error_status, response=response, seed=args.seed,
+    )
+    print(f"Fake LLM listening on {server.base_url}")
+    server.serve_forever()
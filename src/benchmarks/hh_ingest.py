@@ -0,0 +1,102 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import requests
+
+from benchmarks.fake_hh import FakeHHServer, synthetic_vacancies
+
+# The hh.ru parser lives with the other job-board scripts
+sys.path.append(str(Path(__file__).resolve().parents[2] / "undeveloped_parts" / "additional_files"))
+from job_parser_from_hh import HEADERS, Checkpoint, VacancyStore, parse_time, ingest_vacancies, make_session  # noqa: E402
+
+
+class _FailingSession:
+    # Delegates to a real session but fails on one page, to simulate a crash mid-run
+    def __init__(self, session, fail_page):
+        self._session = session
+        self._fail_page = fail_page
+
+    def get(self, url, params=None, **kwargs):
+        if params and params.get("page") == self._fail_page:
+            raise requests.ConnectionError(f"simulated failure on page {self._fail_page}")
+        return self._session.get(url, params=params, **kwargs)
+
+
+def sequential_fetch(base_url: str, per_page: int = 10) -> int:
+    """
+    The original approach: one page at a time, each with a fresh requests.get (new connection).
+    """
+    page, fetched = 0, 0
+    while True:
+        response = requests.get(base_url, headers=HEADERS, params={"area": 113, "per_page": per_page, "page": page})
+        payload = response.json()
+        fetched += len(payload["items"])
+        page += 1
+        if page >= payload["pages"]:
+            return fetched
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark hh.ru vacancy ingestion against a local fixture server.")
+    parser.add_argument("--fixture", help="JSON list of recorded vacancy items (default: synthetic)")
+    parser.add_argument("--count", type=int, default=5000, help="synthetic vacancies; above 2000 the search is split into windows")
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds per response")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=50.0)
+    args = parser.parse_args(argv)
+
+    vacancies = json.load(open(args.fixture, encoding="utf-8")) if args.fixture else synthetic_vacancies(args.count)
+    server = FakeHHServer(vacancies, latency=args.latency).start()
+
+    def measure(label, func):
+        requests_before, connections_before = server.requests_served, server.connections
+        start = time.perf_counter()
+        result = func()
+        seconds = time.perf_counter() - start
+        print(f"{label:<34}{seconds:>8.2f}{server.requests_served - requests_before:>10}"
+              f"{server.connections - connections_before:>13}  {result}")
+
+    published = sorted(parse_time(vacancy["published_at"]) for vacancy in vacancies)
+    since, until = published[0], published[-1]
+
+    with tempfile.TemporaryDirectory() as directory:
+        def run(name, session=None):
+            return ingest_vacancies(
+                113,
+                since=since,
+                until=until,
+                store=VacancyStore(f"{directory}/{name}.sqlite3"),
+                checkpoint=Checkpoint(f"{directory}/{name}.json"),
+                session=session or make_session(pool_size=args.concurrency),
+                base_url=server.base_url,
+                concurrency=args.concurrency,
+                rate=args.rate,
+            )
+
+        print(f"{len(vacancies)} vacancies, {args.latency * 1000:.0f} ms per response")
+        print(f"{'run':<34}{'seconds':>8}{'requests':>10}{'connections':>13}  result")
+        measure("sequential, 10/page, no session", lambda: f"{sequential_fetch(server.base_url)} fetched")
+        measure("pipeline, first run", lambda: run("main"))
+
+        # New postings appear at the top of the feed; the next run only asks for what is newer
+        until += timedelta(hours=1)
+        server.vacancies = synthetic_vacancies(50, seed=1, newest=until, first_id=900_000_000) + vacancies
+        measure("pipeline, incremental run", lambda: run("main"))
+
+        def crash_and_resume():
+            try:
+                run("resume", session=_FailingSession(make_session(pool_size=args.concurrency), fail_page=12))
+            except requests.ConnectionError:
+                pass
+            return run("resume")
+        measure("pipeline, crash on page 12 + resume", crash_and_resume)
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic_jobs import CITIES, job_posting
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "undeveloped_parts" / "backend"
+
+
+def job_payload(seed: int) -> dict:
+    title, description = job_posting(seed).split("\n", 1)
+    return {
+        "title": title,
+        "description": description,
+        "company": f"Company {seed % 500}",
+        "location": CITIES[seed % len(CITIES)],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark single vs bulk job inserts in the Flask backend on SQLite.")
+    parser.add_argument("--single", type=int, default=500, help="jobs posted one by one to /add_job")
+    parser.add_argument("--bulk", type=int, default=20_000, help="jobs posted at once to /add_jobs")
+    parser.add_argument("--no-matcher", action="store_true", help="measure the database alone, without job vector indexing")
+    args = parser.parse_args(argv)
+
+    directory = tempfile.mkdtemp()
+    # The backend reads its configuration at import time; keep every file it writes in the temp directory
+    os.environ["DATABASE_URL"] = f"sqlite:///{directory}/jobs.sqlite3"
+    os.environ["JOB_MATCHER_DIR"] = f"{directory}/matcher"
+    os.environ["CV_QUEUE_PATH"] = f"{directory}/queue.sqlite3"
+    os.chdir(directory)
+    sys.path.append(str(BACKEND_DIR))
+    import job_matching_auth as backend  # noqa: E402
+
+    if args.no_matcher:
+        backend.job_matcher = None
+    with backend.app.app_context():
+        token = backend.create_access_token(identity="1")
+    client = backend.app.test_client()
+    headers = {"Authorization": f"Bearer {token}"}
+
+    def measure(label, count, func):
+        start = time.perf_counter()
+        func()
+        seconds = time.perf_counter() - start
+        print(f"{label:<28}{count:>8}{seconds:>10.2f}{count / seconds:>12.0f}")
+
+    def post_single():
+        for seed in range(args.single):
+            assert client.post("/add_job", json=job_payload(seed), headers=headers).status_code == 201
+
+    def post_array():
+        jobs = [job_payload(seed) for seed in range(args.bulk)]
+        response = client.post("/add_jobs", json=jobs, headers=headers)
+        assert response.json["inserted"] == args.bulk, response.json
+
+    def post_ndjson():
+        body = "".join(json.dumps(job_payload(seed)) + "\n" for seed in range(args.bulk))
+        response = client.post("/add_jobs", data=body, content_type="application/x-ndjson", headers=headers)
+        assert response.json["inserted"] == args.bulk, response.json
+
+    print(f"{'insert':<28}{'rows':>8}{'seconds':>10}{'rows/sec':>12}")
+    measure("/add_job, one per request", args.single, post_single)
+    measure("/add_jobs, JSON array", args.bulk, post_array)
+    measure("/add_jobs, NDJSON stream", args.bulk, post_ndjson)
+
+    # Keyset pages cost the same at any depth; walk the whole listing for one city
+    start = time.perf_counter()
+    pages, listed, before_id = 0, 0, None
+    while True:
+        query = {"location": CITIES[0], "limit": 100}
+        if before_id:
+            query["before_id"] = before_id
+        page = client.get("/jobs", query_string=query, headers=headers).json
+        pages, listed, before_id = pages + 1, listed + len(page["jobs"]), page["next_before_id"]
+        if before_id is None:
+            break
+    seconds = time.perf_counter() - start
+    print(f"/jobs?location={CITIES[0]}: {listed} jobs in {pages} pages, {seconds / pages * 1000:.1f} ms per page")
+
+
+if __name__ == "__main__":
+    main()
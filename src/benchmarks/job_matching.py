@@ -0,0 +1,44 @@
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.synthetic_cv import cv_lines
+from benchmarks.synthetic_jobs import job_vectors
+from job_matcher import DEFAULT_DIM, JobMatcher
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure brute-force top-k job matching latency.")
+    parser.add_argument("--jobs", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("-k", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    # The CV header lines (desired position, skills) are what a CV is matched with
+    queries = ["\n".join(cv_lines(seed=i)[2:6]) for i in range(args.queries)]
+
+    print(f"{'jobs':>10}{'dim':>6}{'build s':>10}{'matrix MB':>11}{'p50 ms':>9}{'p99 ms':>9}")
+    for count in args.jobs:
+        with tempfile.TemporaryDirectory() as directory:
+            matcher = JobMatcher(directory, dim=args.dim)
+            start = time.perf_counter()
+            for ids, vectors in job_vectors(matcher.vectorize, count):
+                matcher.add_vectors(ids, vectors)
+            build = time.perf_counter() - start
+
+            matcher.top_k(queries[0], args.k)  # warm the page cache
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                matcher.top_k(query, args.k)
+                latencies.append((time.perf_counter() - start) * 1000)
+            p50, p99 = np.percentile(latencies, [50, 99])
+            size_mb = count * args.dim * 4 / 2**20
+            print(f"{count:>10}{args.dim:>6}{build:>10.1f}{size_mb:>11.0f}{p50:>9.1f}{p99:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import argparse
+import random
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+from benchmarks.synthetic_cv import POSITIONS
+from benchmarks.synthetic_jobs import CITIES
+
+# The scraper lives with the crewAI experiments
+sys.path.append(str(Path(__file__).resolve().parents[2] / "undeveloped_parts" / "additional_files" / "crewai_parts"))
+from job_scraper import parse_job_cards, scrape_jobs  # noqa: E402
+
+COMPANIES = ["Kaspi", "Halyk", "Kolesa", "Chocofamily", "Beeline", "Yandex", "EPAM", "Jusan"]
+DATES = ["Just posted", "Today", "1 day ago", "3 days ago", "6 days ago", "30+ days ago"]
+
+
+def fixture_page(seed: int, cards: int = 15, shared: int = 3) -> str:
+    """
+    A synthetic results page shaped like Indeed's: job cards buried in layout markup and
+    inline scripts. The first `shared` cards repeat on every page, like sponsored postings.
+    """
+    rng = random.Random(seed)
+    parts = ["<!DOCTYPE html><html><head><title>Jobs</title>"]
+    parts.append("<script>" + "var tracking = {};" * 2000 + "</script></head><body>")
+    parts.append("<nav>" + "".join(f'<a class="nav-link" href="/l{i}">Link {i}</a>' for i in range(200)) + "</nav>")
+    parts.append('<div id="mosaic-provider-jobcards"><ul>')
+    for index in range(cards):
+        key_seed = index if index < shared else seed * 1000 + index
+        card_rng = random.Random(key_seed)
+        parts.append(
+            f'<li><div class="cardOutline"><div class="job_seen_beacon"><table><tr><td>'
+            f'<h2 class="jobTitle"><a class="jcs-JobTitle" data-jk="{key_seed:016x}" href="/viewjob?jk={key_seed:016x}">'
+            f"<span>{card_rng.choice(POSITIONS)}</span></a></h2>"
+            f'<div class="company_location"><span class="companyName">{card_rng.choice(COMPANIES)}</span>'
+            f'<div class="companyLocation">{card_rng.choice(CITIES)}</div></div>'
+            f'<div class="metadata">{"<span class=salary>150 000 ₸</span>" * rng.randint(0, 1)}</div>'
+            f'<div class="job-snippet"><ul>{"<li>Build and run services</li>" * 3}</ul></div>'
+            f'<span class="date">{card_rng.choice(DATES)}</span>'
+            f"</td></tr></table></div></div></li>"
+        )
+    parts.append("</ul></div>")
+    parts.append("<footer>" + "<p>Footer text</p>" * 300 + "</footer></body></html>")
+    return "".join(parts)
+
+
+def legacy_parse(page_html: str) -> list:
+    """
+    The previous parser: BeautifulSoup with the pure-Python html.parser.
+    """
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page_html, "html.parser")
+    jobs = []
+    for job_card in soup.find_all("div", class_="job_seen_beacon"):
+        title_tag = job_card.find("h2", {"class": "jobTitle"})
+        company_tag = job_card.find("span", {"class": "companyName"})
+        location_tag = job_card.find("div", {"class": "companyLocation"})
+        date_tag = job_card.find("span", {"class": "date"})
+        jobs.append({
+            "title": title_tag.text.strip() if title_tag else "N/A",
+            "company": company_tag.text.strip() if company_tag else "N/A",
+            "location": location_tag.text.strip() if location_tag else "N/A",
+            "date_posted": date_tag.text.strip() if date_tag else "N/A",
+        })
+    return jobs
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """
+    Serves the fixture pages as search results, picked by the q/l/start parameters, after a fixed latency.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, pages, latency=0.1):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.pages = [page.encode() for page in pages]
+        self.latency = latency
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/jobs"
+
+    def start(self) -> "FixtureServer":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        query = parse_qs(urlsplit(self.path).query)
+        key = f"{query.get('q', [''])[0]}|{query.get('l', [''])[0]}|{query.get('start', ['0'])[0]}"
+        body = self.server.pages[zlib.crc32(key.encode()) % len(self.server.pages)]
+        time.sleep(self.server.latency)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the job scraper on HTML fixtures served locally.")
+    parser.add_argument("--fixtures", help="directory of saved results pages (*.html); default: synthetic pages")
+    parser.add_argument("--pages", type=int, default=40, help="synthetic fixture pages")
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds per response")
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    if args.fixtures:
+        pages = [path.read_text(encoding="utf-8", errors="replace") for path in sorted(Path(args.fixtures).glob("*.html"))]
+    else:
+        pages = [fixture_page(seed) for seed in range(args.pages)]
+    megabytes = sum(len(page.encode()) for page in pages) / 1e6
+
+    print(f"parsing {len(pages)} pages, {megabytes:.1f} MB")
+    print(f"{'parser':<24}{'seconds':>9}{'pages/s':>9}{'MB/s':>8}{'jobs':>7}")
+    for label, parse in (("bs4 html.parser (old)", legacy_parse), ("lxml css selectors", lambda page: list(parse_job_cards(page)))):
+        start = time.perf_counter()
+        jobs = sum(len(parse(page)) for page in pages)
+        seconds = time.perf_counter() - start
+        print(f"{label:<24}{seconds:>9.2f}{len(pages) / seconds:>9.1f}{megabytes / seconds:>8.1f}{jobs:>7}")
+
+    server = FixtureServer(pages, latency=args.latency).start()
+    queries, locations, page_count = POSITIONS[:4], CITIES[:3], 3
+    combinations = [(q, l, p) for q in queries for l in locations for p in range(page_count)]
+    print(f"\nscraping {len(combinations)} result pages, {args.latency * 1000:.0f} ms per response")
+
+    start = time.perf_counter()
+    buffered = []
+    for query, location, page in combinations:
+        # The old loop: one page at a time, a new connection each, every job held until the end
+        response = requests.get(server.base_url, params={"q": query, "l": location, "fromage": 7, "start": page * 10})
+        buffered.extend(legacy_parse(response.text))
+    print(f"{'sequential + bs4 (old)':<28}{time.perf_counter() - start:>7.2f}s  {len(buffered)} jobs, duplicates kept")
+
+    with tempfile.TemporaryDirectory() as directory:
+        start = time.perf_counter()
+        stats = scrape_jobs(
+            queries, locations, output_file=f"{directory}/jobs.jsonl", pages=page_count,
+            concurrency=args.concurrency, per_host=args.concurrency, interval=0, base_url=server.base_url,
+        )
+        print(f"{'concurrent + lxml':<28}{time.perf_counter() - start:>7.2f}s  {stats['jobs']} jobs, "
+              f"{stats['duplicates']} duplicates dropped")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import argparse
+import io
+import time
+import tracemalloc
+
+from PyPDF2 import PdfReader
+
+from benchmarks.synthetic_cv import cv_lines, render_pdf
+from tools.text_extractors import extract_text
+
+
+def eager_extract(file_bytes: bytes) -> str:
+    """
+    The original extraction loop: every page parsed twice, whole document joined.
+    """
+    reader = PdfReader(io.BytesIO(file_bytes))
+    return "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
+
+
+def lazy_extract(file_bytes: bytes, max_tokens: int = None):
+    return extract_text(file_bytes, ".pdf", max_tokens=max_tokens, backend="pypdf2")
+
+
+def measure(func, *args, repeat: int = 3) -> tuple:
+    """
+    Returns the best wall time and the peak traced memory of `func(*args)`.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare eager and budgeted PDF text extraction.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[2, 50, 200])
+    parser.add_argument("--max-tokens", type=int, default=4000, help="token budget for the lazy extractor")
+    args = parser.parse_args(argv)
+
+    print(f"{'pages':>6}{'variant':>22}{'ms':>10}{'peak KiB':>10}{'pages read':>12}")
+    for pages in args.pages:
+        file_bytes = render_pdf(cv_lines(seed=pages, pages=pages))
+        variants = [
+            ("eager (double parse)", lambda: eager_extract(file_bytes), pages),
+            ("lazy, no budget", lambda: lazy_extract(file_bytes), pages),
+            (f"lazy, {args.max_tokens} tokens", lambda: lazy_extract(file_bytes, max_tokens=args.max_tokens),
+             lazy_extract(file_bytes, max_tokens=args.max_tokens).pages_read),
+        ]
+        for label, func, pages_read in variants:
+            seconds, peak = measure(func)
+            print(f"{pages:>6}{label:>22}{seconds * 1000:>10.1f}{peak / 1024:>10.0f}{pages_read:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.synthetic_cv import write_corpus
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+
+# Run in a fresh interpreter, so every import is cold
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for module in sys.argv[3:]:
+    __import__(module)
+import main
+imported = time.perf_counter()
+tool = main.build_tool(bypass_cache=True)
+built = time.perf_counter()
+tool.run(sys.argv[1])
+first = time.perf_counter()
+main.build_tool(bypass_cache=True).run(sys.argv[2])
+second = time.perf_counter()
+print(json.dumps({"import": imported - start, "build": built - imported, "first": first - built, "second": second - first}))
+"""
+
+
+def probe(cvs, preload, env, cwd) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE, str(cvs[0]), str(cvs[1]), *preload],
+        env=env, cwd=cwd, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(module: str, env, cwd, count: int) -> list:
+    """
+    The direct imports of `module` with the largest cumulative import time, from `python -X importtime`.
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], env=env, cwd=cwd, capture_output=True, text=True,
+    ).stderr
+    timings = []
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            # Each level of nesting indents the module name by two more spaces
+            if cumulative.strip().isdigit() and len(name) - len(name.lstrip()) == 3:
+                timings.append((int(cumulative) / 1000, name.strip()))
+    return sorted(timings, reverse=True)[:count]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start import time and time to the first extraction.")
+    parser.add_argument("--runs", type=int, default=3, help="fresh interpreters per mode (medians are reported)")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LLM latency in seconds")
+    args = parser.parse_args(argv)
+
+    server = FakeLLMServer(latency=args.latency).start()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cvs = write_corpus(f"{directory}/cvs", 2)
+            env = dict(
+                os.environ,
+                PYTHONPATH=str(SRC_DIR),
+                OPENAI_API_KEY="sk-fake",
+                OPENAI_MODEL_NAME="fake-model",
+                OPENAI_BASE_URL=server.base_url,
+            )
+            # "eager" pre-imports what main.py used to load at import time
+            modes = {"lazy imports": [], "eager imports": ["langchain.tools", "langchain_openai"]}
+            print(f"median of {args.runs} cold starts, fake LLM latency {args.latency * 1000:.0f} ms")
+            print(f"{'mode':<16}{'import main':>13}{'build tool':>12}{'1st extract':>13}{'2nd extract':>13}{'total':>9}")
+            for label, preload in modes.items():
+                runs = [probe(cvs, preload, env, directory) for _ in range(args.runs)]
+                medians = {key: statistics.median(run[key] for run in runs) * 1000 for key in runs[0]}
+                print(f"{label:<16}{medians['import']:>11.0f}ms{medians['build']:>10.0f}ms{medians['first']:>11.0f}ms"
+                      f"{medians['second']:>11.0f}ms{sum(medians.values()):>7.0f}ms")
+
+            # What the first extraction still has to load
+            print("\nslowest imports of tools.file_reader_tool (cumulative):")
+            for milliseconds, name in slowest_imports("tools.file_reader_tool", env, directory, 5):
+                print(f"  {milliseconds:>8.1f} ms  {name}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
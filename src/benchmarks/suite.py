@@ -0,0 +1,407 @@
+import argparse
+import io
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from benchmarks.fake_llm import FakeLLMServer
+from benchmarks.synthetic_cv import cv_lines, write_corpus
+
+SRC_DIR = Path(__file__).resolve().parents[1]
+BACKEND_DIR = SRC_DIR.parent / "undeveloped_parts" / "backend"
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+# A median this much slower than the baseline counts as a regression
+DEFAULT_THRESHOLD = 0.10
+
+
+class Skip(Exception):
+    """
+    Raised by a benchmark's setup when it cannot run here, e.g. an optional dependency is missing.
+    """
+
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable[["Environment"], Callable[[], object]]
+    repeat: int
+    number: int
+
+
+CASES: Dict[str, Case] = {}
+
+
+def case(name: str, repeat: int = 5, number: int = 1):
+    """
+    Registers a benchmark. The decorated setup receives the Environment and returns the
+    callable to time; it is called `number` times per repeat, after one untimed warm-up call.
+    """
+    def register(setup):
+        CASES[name] = Case(name, setup, repeat, number)
+        return setup
+    return register
+
+
+class Environment:
+    """
+    Shared fixtures of one suite run: a scratch directory, synthetic CVs and the fake LLM server.
+    Everything is seeded, so two runs with the same settings do the same work.
+    """
+
+    def __init__(self, directory: str, latency: float = 0.05, jitter: float = 0.0, error_rate: float = 0.0, seed: int = 0):
+        self.directory = Path(directory)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        self._corpus = {}
+        self._llm = None
+
+    def cv(self, pages: int = 1, layout: str = "single", suffix: str = ".pdf") -> Path:
+        key = (pages, layout, suffix)
+        if key not in self._corpus:
+            self._corpus[key] = write_corpus(
+                self.directory / "cvs", 1, pages=pages, seed=self.seed, suffix=suffix, layout=layout,
+            )[0]
+        return self._corpus[key]
+
+    def cv_text(self, pages: int = 1) -> str:
+        return "\n".join(cv_lines(self.seed, pages))
+
+    @property
+    def llm(self) -> FakeLLMServer:
+        if self._llm is None:
+            self._llm = FakeLLMServer(
+                latency=self.latency, jitter=self.jitter, error_rate=self.error_rate, seed=self.seed,
+            ).start()
+            os.environ["OPENAI_BASE_URL"] = self._llm.base_url
+        return self._llm
+
+    def tool(self, **options):
+        from tools.file_reader_tool import FileReadTool
+
+        return FileReadTool(api_key="sk-fake", model_name="fake-model", base_url=self.llm.base_url, **options)
+
+    def close(self) -> None:
+        if self._llm is not None:
+            self._llm.stop()
+
+
+# Parsing: text extraction from the CV file
+
+def _parse(env: Environment, pages: int, layout: str = "single", suffix: str = ".pdf"):
+    from tools.text_extractors import extract_text
+
+    data = env.cv(pages, layout, suffix).read_bytes()
+    return lambda: extract_text(data, suffix)
+
+
+@case("parse.pdf.1p", number=20)
+def parse_pdf_1p(env):
+    return _parse(env, 1)
+
+
+@case("parse.pdf.10p", number=5)
+def parse_pdf_10p(env):
+    return _parse(env, 10)
+
+
+@case("parse.pdf.10p.two-column", number=5)
+def parse_pdf_10p_two_column(env):
+    return _parse(env, 10, layout="two-column")
+
+
+@case("parse.docx.3p", number=20)
+def parse_docx_3p(env):
+    return _parse(env, 3, suffix=".docx")
+
+
+# Prompt building: rule pass, compaction and the prompt itself
+
+@case("prompt.rules.3p", number=20)
+def prompt_rules(env):
+    from tools.rule_extractor import extract_rule_fields
+
+    text = env.cv_text(3)
+    return lambda: extract_rule_fields(text)
+
+
+@case("prompt.compact.3p", number=10)
+def prompt_compact_3p(env):
+    from tools.prompt_compaction import compact_text
+
+    text = env.cv_text(3)
+    return lambda: compact_text(text, max_tokens=4000)
+
+
+@case("prompt.compact.20p", number=3)
+def prompt_compact_20p(env):
+    from tools.prompt_compaction import compact_text
+
+    text = env.cv_text(20)
+    return lambda: compact_text(text, max_tokens=4000)
+
+
+@case("prompt.build.3p", number=10)
+def prompt_build(env):
+    from tools.file_reader_tool import FileReadTool
+    from tools.prompt_compaction import compact_text
+    from tools.rule_extractor import extract_rule_fields, missing_fields
+
+    text = env.cv_text(3)
+
+    def build():
+        fields = missing_fields(extract_rule_fields(text))
+        compacted, _ = compact_text(text, max_tokens=4000)
+        return FileReadTool._build_prompt(compacted, fields)
+    return build
+
+
+# Extraction: the whole FileReadTool path against the fake LLM
+
+@case("extract.llm.1p")
+def extract_llm(env):
+    tool = env.tool()
+    path = str(env.cv(1))
+    return lambda: tool.run(path)
+
+
+@case("extract.cached.1p", number=20)
+def extract_cached(env):
+    from tools.extraction_cache import ExtractionCache
+
+    tool = env.tool(cache=ExtractionCache(str(env.directory / "cache.sqlite3")))
+    path = str(env.cv(1))
+    tool.run(path)
+    return lambda: tool.run(path)
+
+
+@case("extract.process_last_cv")
+def extract_process_last_cv(env):
+    # main.py opens its stores relative to the working directory, which is the scratch directory
+    env.llm
+    import main
+
+    main.UPLOAD_INDEX.record(str(env.cv(1)), original_name="cv.pdf")
+    return lambda: main.process_last_cv(bypass_cache=True)
+
+
+# Upload: content-addressed storage and the backend endpoint
+
+@case("upload.store.1mb", number=10)
+def upload_store(env):
+    from upload_storage import UploadStore
+
+    store = UploadStore(str(env.directory / "store"))
+    payload = os.urandom(1024 * 1024)
+    counter = iter(range(10 ** 9))
+    # A new prefix per call, so every save writes a new file instead of hitting deduplication
+    return lambda: store.save(io.BytesIO(next(counter).to_bytes(8, "big") + payload), "cv.pdf")
+
+
+@case("upload.backend")
+def upload_backend(env):
+    # The backend reads its configuration at import time; keep every file it writes in the scratch directory
+    os.environ["DATABASE_URL"] = f"sqlite:///{env.directory}/backend.sqlite3"
+    os.environ["JOB_MATCHER_DIR"] = str(env.directory / "backend_matcher")
+    os.environ["CV_QUEUE_PATH"] = str(env.directory / "queue.sqlite3")
+    os.environ["AUTH_HASH_WORKERS"] = "0"
+    os.environ["BCRYPT_LOG_ROUNDS"] = "4"
+    sys.path.append(str(BACKEND_DIR))
+    try:
+        import job_matching_auth as backend
+    except ImportError as e:
+        raise Skip(f"backend dependencies missing: {e}")
+
+    # Tokens carry a dict identity, which flask-jwt-extended 4.7+ only accepts with subject checks off
+    backend.app.config["JWT_VERIFY_SUB"] = False
+    client = backend.app.test_client()
+    credentials = {"name": "Bench", "email": "bench@example.com", "password": "bench-password"}
+    client.post("/register", json=credentials)
+    token = client.post("/login", json=credentials).get_json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    data = env.cv(3).read_bytes()
+
+    def upload():
+        response = client.post(
+            "/upload_cv", headers=headers, content_type="multipart/form-data",
+            data={"file": (io.BytesIO(data), "cv.pdf")},
+        )
+        assert response.status_code == 200, response.get_data(as_text=True)
+    return upload
+
+
+# Matching: top-k search over the job index
+
+@case("match.top_k.100k", number=10)
+def match_top_k(env):
+    from benchmarks.synthetic_jobs import job_vectors
+    from job_matcher import JobMatcher
+
+    matcher = JobMatcher(str(env.directory / "matcher"))
+    for ids, vectors in job_vectors(matcher.vectorize, 100_000, seed=env.seed):
+        matcher.add_vectors(ids, vectors)
+    query = "\n".join(cv_lines(env.seed)[2:6])
+    return lambda: matcher.top_k(query, 10)
+
+
+def measure(target: Callable[[], object], repeat: int, number: int) -> dict:
+    """
+    Seconds per call over `repeat` rounds of `number` calls, after one warm-up call.
+    """
+    target()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            target()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "median": statistics.median(samples),
+        "min": min(samples),
+        "mean": statistics.fmean(samples),
+        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "repeat": repeat,
+        "number": number,
+        "samples": samples,
+    }
+
+
+def git_revision() -> tuple:
+    # (short commit, whether the work tree has changes); ("unknown", False) outside a git checkout
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        dirty = bool(subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=SRC_DIR, capture_output=True, text=True,
+        ).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def run_suite(pattern: Optional[str] = None, repeat: Optional[int] = None, **settings) -> dict:
+    """
+    Runs the registered benchmarks whose name matches `pattern` and returns the results document.
+    """
+    selected = [c for c in CASES.values() if not pattern or re.search(pattern, c.name)]
+    commit, dirty = git_revision()
+    document = {
+        "meta": {
+            "commit": commit,
+            "dirty": dirty,
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "settings": settings,
+        },
+        "results": {},
+    }
+
+    start_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        os.environ.setdefault("OPENAI_API_KEY", "sk-fake")
+        os.environ.setdefault("OPENAI_MODEL_NAME", "fake-model")
+        env = Environment(directory, **settings)
+        try:
+            for c in selected:
+                try:
+                    result = measure(c.setup(env), repeat or c.repeat, c.number)
+                except Skip as e:
+                    result = {"skipped": str(e)}
+                document["results"][c.name] = result
+                if "skipped" in result:
+                    print(f"{c.name:<30}skipped: {result['skipped']}")
+                else:
+                    print(f"{c.name:<30}{result['median'] * 1000:>11.3f} ms  ± {result['stdev'] * 1000:.3f}")
+        finally:
+            env.close()
+            os.chdir(start_dir)
+    return document
+
+
+def compare(base: dict, head: dict, threshold: float = DEFAULT_THRESHOLD) -> list:
+    """
+    Benchmarks in both documents whose median got slower by more than `threshold`, as (name, ratio).
+    Prints a table of every shared benchmark.
+    """
+    regressions = []
+    print(f"base {base['meta']['commit']}  head {head['meta']['commit']}{' (dirty)' if head['meta'].get('dirty') else ''}")
+    print(f"{'benchmark':<30}{'base ms':>11}{'head ms':>11}{'ratio':>8}")
+    for name, after in head["results"].items():
+        before = base["results"].get(name)
+        if not before or "skipped" in before or "skipped" in after:
+            continue
+        ratio = after["median"] / before["median"]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  slower"
+            regressions.append((name, ratio))
+        elif ratio < 1 / (1 + threshold):
+            flag = "  faster"
+        print(f"{name:<30}{before['median'] * 1000:>11.3f}{after['median'] * 1000:>11.3f}{ratio:>8.2f}{flag}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Reproducible benchmark suite on synthetic CVs and a fake LLM.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run benchmarks and save the results as JSON")
+    run.add_argument("-k", dest="pattern", help="only benchmarks whose name matches this regex")
+    run.add_argument("--repeat", type=int, help="rounds per benchmark (default: per benchmark)")
+    run.add_argument("--output", help=f"results file (default: {RESULTS_DIR.name}/<commit>.json)")
+    run.add_argument("--latency", type=float, default=0.05, help="fake LLM seconds per response")
+    run.add_argument("--jitter", type=float, default=0.0, help="fake LLM extra seconds, drawn per response")
+    run.add_argument("--error-rate", type=float, default=0.0, help="fraction of fake LLM requests that fail")
+    run.add_argument("--seed", type=int, default=0)
+
+    commands.add_parser("list", help="list the benchmarks")
+
+    diff = commands.add_parser("compare", help="compare two results files; exits 1 on a regression")
+    diff.add_argument("base")
+    diff.add_argument("head")
+    diff.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed slowdown of the median")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for name in CASES:
+            print(name)
+        return 0
+
+    if args.command == "compare":
+        with open(args.base, encoding="utf-8") as base, open(args.head, encoding="utf-8") as head:
+            regressions = compare(json.load(base), json.load(head), args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+        return 0
+
+    document = run_suite(
+        args.pattern, args.repeat,
+        latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed,
+    )
+    meta = document["meta"]
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{meta['commit']}{'-dirty' if meta['dirty'] else ''}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    print(f"\nsaved {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+import io
+import random
+import textwrap
+import zipfile
+from pathlib import Path
+from typing import List
+from xml.sax.saxutils import escape
+
+FIRST_NAMES = ["Aigerim", "Daniyar", "Maria", "John", "Elena", "Arman", "Sofia", "Timur", "Anna", "Marat"]
+LAST_NAMES = ["Nurlanova", "Sadykov", "Ivanova", "Smith", "Petrova", "Bekov", "Garcia", "Akhmetov", "Kim", "Lee"]
+POSITIONS = ["Data Scientist", "Backend Developer", "DevOps Engineer", "Product Manager", "ML Engineer"]
+SKILLS = [
+    "Python", "SQL", "Docker", "Kubernetes", "PostgreSQL", "Flask", "Django", "Pandas", "NumPy",
+    "PyTorch", "TensorFlow", "Git", "Linux", "AWS", "React", "Java", "Go", "Airflow", "Spark", "Redis",
+]
+UNIVERSITIES = ["Nazarbayev University", "KBTU", "Moscow State University", "MIT", "Satbayev University"]
+FILLER = (
+    "Worked on distributed systems and data pipelines, collaborating with cross-functional teams "
+    "to deliver reliable services, improve performance and mentor junior engineers."
+)
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+LINES_PER_PAGE = 48
+# Page layouts of the generated PDFs; "two-column" wraps lines to half width and fills two columns per page
+LAYOUTS = ("single", "two-column")
+COLUMN_CHARS = 48
+
+
+def cv_lines(seed: int = 0, pages: int = 1) -> List[str]:
+    """
+    Generates the text lines of a synthetic CV that spans roughly `pages` pages.
+    """
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    lines = [
+        name,
+        f"{name.split()[0].lower()}.{name.split()[1].lower()}{seed}@example.com | +7 701 {rng.randint(100, 999)} {rng.randint(1000, 9999)}",
+        f"Desired position: {rng.choice(POSITIONS)}",
+        "",
+        "Skills",
+        ", ".join(rng.sample(SKILLS, 6)),
+        "",
+        "Experience",
+    ]
+    start = rng.randint(2005, 2018)
+    for i in range(rng.randint(2, 4)):
+        lines.append(f"{rng.choice(POSITIONS)} at Company {rng.randint(1, 99)}, {start + 2 * i} - {start + 2 * i + 2}")
+        lines.append(FILLER)
+    lines += ["", "Education", f"BSc Computer Science, {rng.choice(UNIVERSITIES)}, {start - 4} - {start}"]
+
+    # Pad with publication-style entries to reach the requested page count
+    index = 1
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(f"[{index}] {name}. A study of topic {rng.randint(1, 10_000)}. Journal {rng.randint(1, 50)}, {rng.randint(2000, 2024)}.")
+        index += 1
+    return lines
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def render_pdf(lines: List[str], layout: str = "single") -> bytes:
+    """
+    Renders text lines into a minimal multi-page PDF using the built-in Helvetica font.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"Unknown layout {layout!r}; expected one of {', '.join(LAYOUTS)}")
+    columns = 2 if layout == "two-column" else 1
+    if columns > 1:
+        lines = [part for line in lines for part in (textwrap.wrap(line, COLUMN_CHARS) or [""])]
+    per_page = LINES_PER_PAGE * columns
+    pages = [lines[i:i + per_page] for i in range(0, len(lines), per_page)] or [[]]
+    font_id = 3
+    objects = {1: "<< /Type /Catalog /Pages 2 0 R >>", font_id: "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"}
+    kids = []
+    next_id = 4
+    for page_lines in pages:
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        body = " ".join(
+            f"BT /F1 10 Tf 14 TL {50 + column * PAGE_WIDTH // 2} 750 Td "
+            + " ".join(f"({_escape(line)}) '" for line in page_lines[column * LINES_PER_PAGE:(column + 1) * LINES_PER_PAGE])
+            + " ET"
+            for column in range(columns)
+        )
+        stream = body.encode("latin-1", "replace")
+        objects[content_id] = (f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {content_id} 0 R >>"
+        )
+        kids.append(f"{page_id} 0 R")
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        body = objects[obj_id]
+        out += f"{obj_id} 0 obj\n".encode() + (body if isinstance(body, bytes) else body.encode()) + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for obj_id in sorted(objects):
+        out += f"{offsets[obj_id]:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def render_docx(lines: List[str]) -> bytes:
+    """
+    Renders text lines into a minimal DOCX document, one paragraph per line.
+    """
+    paragraphs = "".join(f"<w:p><w:r><w:t xml:space=\"preserve\">{escape(line)}</w:t></w:r></w:p>" for line in lines)
+    parts = {
+        "[Content_Types].xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            '</Types>'
+        ),
+        "_rels/.rels": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="word/document.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+            '</Relationships>'
+        ),
+        "word/document.xml": (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{paragraphs}</w:body></w:document>'
+        ),
+    }
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in parts.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+RENDERERS = {".pdf": render_pdf, ".docx": render_docx, ".txt": lambda lines: "\n".join(lines).encode()}
+
+
+def write_corpus(
+    directory: str, count: int, pages: int = 1, seed: int = 0, suffix: str = ".pdf", layout: str = "single",
+) -> List[Path]:
+    """
+    Writes `count` synthetic CVs of the given file type into `directory` and returns their paths.
+    `layout` applies to PDFs (see LAYOUTS).
+    """
+    target = Path(directory)
+    target.mkdir(parents=True, exist_ok=True)
+    tag = "" if layout == "single" else f"_{layout}"
+    paths = []
+    for i in range(count):
+        path = target / f"cv_{seed + i:05d}_{pages}p{tag}{suffix}"
+        lines = cv_lines(seed + i, pages)
+        path.write_bytes(render_pdf(lines, layout) if suffix == ".pdf" else RENDERERS[suffix](lines))
+        paths.append(path)
+    return paths
@@ -0,0 +1,39 @@
+import random
+
+import numpy as np
+
+from benchmarks.synthetic_cv import POSITIONS, SKILLS
+
+SENIORITY = ["Junior", "Middle", "Senior", "Lead", "Principal"]
+CITIES = ["Almaty", "Astana", "Moscow", "Remote", "Berlin", "Tashkent"]
+DUTIES = [
+    "build and maintain services", "design data pipelines", "own the deployment process",
+    "work closely with product managers", "mentor junior colleagues", "improve monitoring and alerting",
+    "train and evaluate models", "review code and write documentation",
+]
+
+
+def job_posting(seed: int) -> str:
+    """
+    Generates the title and description of a synthetic job posting.
+    """
+    rng = random.Random(seed)
+    return "\n".join([
+        f"{rng.choice(SENIORITY)} {rng.choice(POSITIONS)} ({rng.choice(CITIES)})",
+        f"Required skills: {', '.join(rng.sample(SKILLS, rng.randint(3, 7)))}.",
+        f"You will {rng.choice(DUTIES)} and {rng.choice(DUTIES)}.",
+    ])
+
+
+def job_vectors(vectorize, count: int, pool: int = 20_000, seed: int = 0, chunk: int = 100_000):
+    """
+    Yields (job ids, vectors) chunks for `count` jobs. Only `pool` postings are vectorized;
+    the rest are noisy copies of them, which keeps building a million-job index fast.
+    """
+    rng = np.random.default_rng(seed)
+    base = np.stack([vectorize(job_posting(i)) for i in range(min(pool, count))])
+    for start in range(0, count, chunk):
+        size = min(chunk, count - start)
+        vectors = base[rng.integers(0, len(base), size)] + rng.normal(0, 0.02, (size, base.shape[1])).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        yield np.arange(start + 1, start + size + 1), vectors
@@ -0,0 +1,353 @@
+import json
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Resolved next to this module, not against the working directory
+STORE_PATH = str(Path(__file__).resolve().parent / "data" / "cv_store.sqlite3")
+
+NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+SKILL_SPLIT_RE = re.compile(r"[,;\n•|]")
+# "≥5 years", ">= 5 yrs", "5+ years", "<10 years"
+YEARS_BOUND_RE = re.compile(
+    r"(>=|≥|>|<=|≤|<)?\s*(\d+(?:\.\d+)?)\s*(\+)?\s*(?:years?|yrs?|y)\b(?:\s+of\s+experience)?",
+    re.IGNORECASE,
+)
+AND_RE = re.compile(r"\s+and\s+|\s*[,&]\s*", re.IGNORECASE)
+
+
+def normalize_skill(skill: str) -> str:
+    """
+    The key a skill is indexed under: case-folded, with whitespace collapsed.
+    """
+    return " ".join(str(skill).split()).casefold()
+
+
+def skill_keys(value) -> List[str]:
+    """
+    The distinct normalized skills of an extracted "Skills" value, which may be a list or a delimited string.
+    """
+    parts = value if isinstance(value, (list, tuple)) else SKILL_SPLIT_RE.split(str(value or ""))
+    return list(dict.fromkeys(key for key in map(normalize_skill, parts) if key))
+
+
+def parse_years(value) -> Optional[float]:
+    """
+    Years of experience as a number, from 5, "5.5" or "about 5 years"; None if there is none.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    match = NUMBER_RE.search(str(value or ""))
+    return float(match.group().replace(",", ".")) if match else None
+
+
+@dataclass
+class CVQuery:
+    """
+    Candidates having every skill in `skills`, with years of experience within the inclusive bounds.
+    """
+    skills: Tuple[str, ...] = ()
+    min_years: Optional[float] = None
+    max_years: Optional[float] = None
+
+
+def parse_query(text: str) -> CVQuery:
+    """
+    Parses queries like "Python AND Kubernetes, >=5 years" or "Go & Docker 3+ years". Skills are
+    joined by AND, "&" or commas; a years bound may use >=, ≥, >, <=, ≤, < or a trailing "+".
+    """
+    min_years = max_years = None
+    for operator, number, plus in YEARS_BOUND_RE.findall(text):
+        years = float(number)
+        if operator in ("<=", "≤"):
+            max_years = years
+        elif operator == "<":
+            max_years = float(np.nextafter(years, -np.inf))
+        elif operator == ">":
+            min_years = float(np.nextafter(years, np.inf))
+        else:
+            # ">=", "≥", "5+" and a bare "5 years" all mean at least five
+            min_years = years
+    remainder = YEARS_BOUND_RE.sub(" ", text)
+    skills = tuple(part.strip() for part in AND_RE.split(remainder) if part.strip())
+    return CVQuery(skills, min_years, max_years)
+
+
+def intersect(postings: Sequence[np.ndarray]) -> np.ndarray:
+    """
+    Intersects sorted id arrays, shortest first: each step binary-searches the survivors in the
+    next list, so the cost follows the shortest list rather than the longest.
+    """
+    if not postings:
+        return np.empty(0, dtype=np.int64)
+    ordered = sorted(postings, key=len)
+    result = ordered[0]
+    for other in ordered[1:]:
+        if not len(result) or not len(other):
+            return result[:0]
+        positions = np.minimum(np.searchsorted(other, result), len(other) - 1)
+        result = result[other[positions] == result]
+    return result
+
+
+class CVStore:
+    """
+    Persistent, searchable store of extracted CVs backed by SQLite.
+
+    Skills are normalized into their own table, and candidate_skills is a clustered
+    (skill, candidate) table: the posting list of a skill is one range scan. Queries run
+    on an in-memory copy of the posting lists and the years column, loaded on first use
+    and kept current on writes; other processes' writes are picked up through SQLite's
+    data_version.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS candidates ("
+            " id INTEGER PRIMARY KEY,"
+            " source TEXT UNIQUE,"  # e.g. the upload's content hash; re-adding a source replaces the candidate
+            " name TEXT,"
+            " email TEXT,"
+            " desired_position TEXT,"
+            " years REAL,"
+            " data TEXT NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_years ON candidates (years)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS skills (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS candidate_skills ("
+            " skill_id INTEGER NOT NULL,"
+            " candidate_id INTEGER NOT NULL,"
+            " PRIMARY KEY (skill_id, candidate_id)) WITHOUT ROWID"
+        )
+        self._skill_ids: Dict[str, int] = {}
+        self._reset_index()
+
+    def _reset_index(self) -> None:
+        self._postings: Dict[int, np.ndarray] = {}
+        self._tails: Dict[int, List[int]] = {}
+        self._years: Optional[np.ndarray] = None
+        self._years_tail: List[Tuple[int, float]] = []
+        self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _check_version(self) -> None:
+        # data_version changes when another connection commits, i.e. the cached index may be stale
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._skill_ids.clear()
+            self._reset_index()
+
+    def add(self, cv: dict, source: Optional[str] = None) -> int:
+        """
+        Stores one extracted CV and returns its candidate id.
+        """
+        return self.add_many([cv], [source])[0]
+
+    def add_many(self, cvs: Iterable[dict], sources: Optional[Iterable[Optional[str]]] = None) -> List[int]:
+        """
+        Stores extracted CVs in one transaction and returns their candidate ids. A CV whose
+        source is already stored replaces the earlier one and keeps its id.
+        """
+        cvs = list(cvs)
+        sources = list(sources) if sources is not None else [None] * len(cvs)
+        now = time.time()
+        with self._lock:
+            self._check_version()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                # The write lock is held, so ids past the current maximum are ours to assign
+                next_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM candidates").fetchone()[0]
+                rows, links, ids, replaced = [], [], [], False
+                batch_sources = {}
+                for cv, source in zip(cvs, sources):
+                    candidate_id = batch_sources.get(source) if source is not None else None
+                    if candidate_id is not None:
+                        # The same source twice in one batch: the later CV wins
+                        links = [link for link in links if link[1] != candidate_id]
+                        replaced = True
+                    elif source is not None:
+                        row = self._conn.execute("SELECT id FROM candidates WHERE source = ?", (source,)).fetchone()
+                        if row is not None:
+                            candidate_id = row["id"]
+                            self._conn.execute("DELETE FROM candidate_skills WHERE candidate_id = ?", (candidate_id,))
+                            replaced = True
+                    if candidate_id is None:
+                        candidate_id, next_id = next_id, next_id + 1
+                    if source is not None:
+                        batch_sources[source] = candidate_id
+                    ids.append(candidate_id)
+                    rows.append((
+                        candidate_id, source, cv.get("Name"), cv.get("Email"), cv.get("Desired Position"),
+                        parse_years(cv.get("Years of Experience")),
+                        json.dumps(cv, ensure_ascii=False, separators=(",", ":")), now,
+                    ))
+                    links.extend((self._skill_id(key), candidate_id) for key in skill_keys(cv.get("Skills")))
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO candidates (id, source, name, email, desired_position, years, data, created_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO candidate_skills (skill_id, candidate_id) VALUES (?, ?)", links,
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                self._skill_ids.clear()
+                raise
+
+            if replaced:
+                # Replacing changes existing posting lists; rebuild them on the next query
+                self._reset_index()
+                return ids
+            # New ids are larger than every stored one, so appending keeps the posting lists sorted
+            for skill_id, candidate_id in links:
+                if skill_id in self._postings:
+                    self._tails.setdefault(skill_id, []).append(candidate_id)
+            if self._years is not None:
+                self._years_tail.extend((row[0], row[5]) for row in rows)
+            self._data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        return ids
+
+    def _skill_id(self, key: str) -> int:
+        skill_id = self._skill_ids.get(key)
+        if skill_id is None:
+            self._conn.execute("INSERT OR IGNORE INTO skills (name) VALUES (?)", (key,))
+            skill_id = self._conn.execute("SELECT id FROM skills WHERE name = ?", (key,)).fetchone()[0]
+            self._skill_ids[key] = skill_id
+        return skill_id
+
+    def _posting(self, skill: str) -> np.ndarray:
+        # Sorted candidate ids having the skill; loaded with one range scan of candidate_skills
+        key = normalize_skill(skill)
+        skill_id = self._skill_ids.get(key)
+        if skill_id is None:
+            row = self._conn.execute("SELECT id FROM skills WHERE name = ?", (key,)).fetchone()
+            if row is None:
+                return np.empty(0, dtype=np.int32)
+            skill_id = self._skill_ids[key] = row[0]
+        posting = self._postings.get(skill_id)
+        if posting is None:
+            cursor = self._plain_cursor().execute(
+                "SELECT candidate_id FROM candidate_skills WHERE skill_id = ? ORDER BY candidate_id", (skill_id,),
+            )
+            posting = self._postings[skill_id] = np.fromiter((row[0] for row in cursor), dtype=np.int32)
+        tail = self._tails.pop(skill_id, None)
+        if tail:
+            posting = self._postings[skill_id] = np.concatenate([posting, np.asarray(tail, dtype=np.int32)])
+        return posting
+
+    def _plain_cursor(self) -> sqlite3.Cursor:
+        # Bulk reads return plain tuples; building a Row per posting is most of their cost
+        cursor = self._conn.cursor()
+        cursor.row_factory = None
+        return cursor
+
+    def _years_column(self) -> np.ndarray:
+        # Years of experience by candidate id; NaN where unknown or no candidate
+        if self._years is None:
+            # Read from the years index, which holds both columns, rather than the table and its JSON
+            rows = self._plain_cursor().execute(
+                "SELECT id, years FROM candidates INDEXED BY idx_candidates_years WHERE years IS NOT NULL"
+            ).fetchall()
+            size = self._conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM candidates").fetchone()[0]
+            self._years = np.full(size, np.nan, dtype=np.float64)
+            if rows:
+                pairs = np.array(rows, dtype=np.float64)
+                self._years[pairs[:, 0].astype(np.int64)] = pairs[:, 1]
+        if self._years_tail:
+            size = max(candidate_id for candidate_id, _ in self._years_tail) + 1
+            if size > len(self._years):
+                self._years = np.concatenate([self._years, np.full(size - len(self._years), np.nan, dtype=np.float64)])
+            for candidate_id, years in self._years_tail:
+                self._years[candidate_id] = np.nan if years is None else years
+            self._years_tail = []
+        return self._years
+
+    def search(
+        self,
+        skills: Sequence[str] = (),
+        min_years: Optional[float] = None,
+        max_years: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[int]:
+        """
+        Ids of the candidates having every skill and within the years bounds, newest first.
+        """
+        with self._lock:
+            self._check_version()
+            years_filter = min_years is not None or max_years is not None
+            if skills:
+                ids = intersect([self._posting(skill) for skill in skills])
+            elif years_filter:
+                ids = None
+            else:
+                cursor = self._plain_cursor().execute("SELECT id FROM candidates ORDER BY id")
+                ids = np.fromiter((row[0] for row in cursor), dtype=np.int64)
+
+            if years_filter:
+                years = self._years_column()
+                selected = years if ids is None else years[ids]
+                mask = ~np.isnan(selected)
+                if min_years is not None:
+                    mask &= selected >= min_years
+                if max_years is not None:
+                    mask &= selected <= max_years
+                ids = np.flatnonzero(mask) if ids is None else ids[mask]
+        ids = ids[::-1]
+        return ids[:limit].tolist() if limit is not None else ids.tolist()
+
+    def query(self, text: str, limit: Optional[int] = 50) -> List[dict]:
+        """
+        Runs a text query such as "Python AND Kubernetes, >=5 years" and returns the matching CVs.
+        """
+        parsed = parse_query(text)
+        return self.get_many(self.search(parsed.skills, parsed.min_years, parsed.max_years, limit=limit))
+
+    def count(self, text: str) -> int:
+        parsed = parse_query(text)
+        return len(self.search(parsed.skills, parsed.min_years, parsed.max_years))
+
+    def get(self, candidate_id: int) -> Optional[dict]:
+        found = self.get_many([candidate_id])
+        return found[0] if found else None
+
+    def get_many(self, candidate_ids: Sequence[int]) -> List[dict]:
+        """
+        The stored CVs for these ids, in the given order, each with its "id" and "source".
+        """
+        found = {}
+        with self._lock:
+            for start in range(0, len(candidate_ids), 500):
+                chunk = list(candidate_ids[start:start + 500])
+                placeholders = ",".join("?" * len(chunk))
+                for row in self._conn.execute(
+                    f"SELECT id, source, data FROM candidates WHERE id IN ({placeholders})", chunk,
+                ):
+                    found[row["id"]] = {"id": row["id"], "source": row["source"], **json.loads(row["data"])}
+        return [found[candidate_id] for candidate_id in candidate_ids if candidate_id in found]
+
+    def skill_counts(self, limit: int = 50) -> List[Tuple[str, int]]:
+        """
+        The most common skills and how many candidates have each.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT s.name, COUNT(*) AS candidates FROM candidate_skills cs JOIN skills s ON s.id = cs.skill_id"
+                " GROUP BY cs.skill_id ORDER BY candidates DESC LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [(row[0], row[1]) for row in rows]
@@ -0,0 +1,255 @@
+import json
+import math
+import os
+import re
+import threading
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ann_index import IVFIndex
+from tools.rule_extractor import AMBIGUOUS_SKILL_MATCHER, SKILL_MATCHER
+
+# Resolved next to this module, so the API, the backend and the UI share one index
+MATCHER_DIR = str(Path(__file__).resolve().parent / "data" / "matcher")
+
+# Hashed feature space; 1M jobs x 128 float32 columns is 512 MB and one pass over it is a single matvec
+DEFAULT_DIM = 128
+INITIAL_CAPACITY = 1024
+
+TOKEN_RE = re.compile(r"[a-zа-яё0-9][a-zа-яё0-9+#]*", re.IGNORECASE)
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our that the this to we will with you your"
+    " и в во на с со по для от до из к о об что как мы вы".split()
+)
+# Dictionary skills are strong matching signals, so they count as extra occurrences
+SKILL_WEIGHT = 3
+
+
+def tokenize(text: str) -> Counter:
+    """
+    Lower-cased word counts of a text, plus one "skill:<name>" feature per dictionary skill mention.
+    """
+    counts = Counter(token for token in (t.lower() for t in TOKEN_RE.findall(text)) if token not in STOPWORDS)
+    for matcher in (SKILL_MATCHER, AMBIGUOUS_SKILL_MATCHER):
+        for _, skill in matcher.finditer(text):
+            counts[f"skill:{skill.lower()}"] += SKILL_WEIGHT
+    return counts
+
+
+def profile_text(key_info: dict) -> str:
+    """
+    The text a CV is matched with: desired position, skills and education from the extracted fields.
+    """
+    skills = key_info.get("Skills") or []
+    parts = [
+        key_info.get("Desired Position") or "",
+        ", ".join(skills) if isinstance(skills, list) else str(skills),
+        key_info.get("Education Background") or "",
+    ]
+    return "\n".join(part for part in parts if part)
+
+
+class JobMatcher:
+    """
+    Scores a CV against every job with one matrix-vector product.
+
+    Job texts are turned into sublinear term-frequency vectors with signed feature hashing
+    and kept, unit-normalized, as rows of a float32 matrix stored with `np.memmap`, so
+    adding a job writes one row instead of rebuilding the index. IDF weights come from
+    per-bucket document frequencies and are applied to the query only, which keeps stored
+    rows valid as the collection grows.
+
+    With `approximate=True` queries go through an IVF index kept next to the matrix
+    (see ann_index.py) and only scan the `nprobe` closest clusters of jobs. Every change bumps
+    a generation number stored with both; an IVF index left behind by changes made without
+    `approximate` is rebuilt from the matrix when it is opened.
+    """
+
+    def __init__(self, directory: str = MATCHER_DIR, dim: int = DEFAULT_DIM, approximate: bool = False, nprobe: int = 16):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        meta_path = self.directory / "meta.json"
+        meta = json.loads(meta_path.read_text()) if meta_path.exists() else {"dim": dim, "count": 0, "capacity": 0}
+        self.dim = meta["dim"]
+        self._count = meta["count"]
+        self._generation = meta.get("generation", 0)
+        self._capacity = 0
+        self._df = np.load(self.directory / "df.npy") if self._count else np.zeros(self.dim, dtype=np.int64)
+        self._vectors = self._ids = None
+        if meta["capacity"]:
+            self._vectors = np.load(self.directory / "vectors.npy", mmap_mode="r+")
+            self._ids = np.load(self.directory / "ids.npy", mmap_mode="r+")
+            self._capacity = len(self._ids)
+        self._rows = {int(job_id): row for row, job_id in enumerate(self._ids[:self._count]) if job_id >= 0} if self._count else {}
+        self._deleted = self._count - len(self._rows)
+
+        self._ann = None
+        if approximate:
+            self._ann = IVFIndex(str(self.directory / "ivf"), dim=self.dim, nprobe=nprobe)
+            if self._ann.generation != self._generation:
+                # Build the index from the jobs matched by brute force so far, or rebuild it
+                # if jobs were added or removed while it was not being updated
+                self._ann.generation = self._generation
+                self._ann.clear()
+                if self._rows:
+                    rows = np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows))
+                    self._ann.add(self._ids[rows], self._vectors[rows])
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def vectorize(self, text: str) -> np.ndarray:
+        """
+        Unit-length hashed term-frequency vector of a text.
+        """
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for token, count in tokenize(text).items():
+            digest = zlib.crc32(token.encode("utf-8"))
+            # The top bit picks the sign, so colliding tokens tend to cancel out instead of adding up
+            vector[digest % self.dim] += (1.0 + math.log(count)) * (1 if digest & 0x80000000 else -1)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def add(self, job_id: int, text: str) -> None:
+        """
+        Indexes one job, replacing its previous vector if it was indexed before.
+        """
+        self.add_vectors([job_id], self.vectorize(text)[None, :])
+
+    def add_many(self, jobs: Iterable[Tuple[int, str]]) -> int:
+        """
+        Indexes (job id, text) pairs; returns how many were added.
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return 0
+        self.add_vectors([job_id for job_id, _ in jobs], np.stack([self.vectorize(text) for _, text in jobs]))
+        return len(jobs)
+
+    def add_vectors(self, job_ids: Sequence[int], vectors: np.ndarray) -> None:
+        """
+        Writes already vectorized jobs to the index and persists the new rows.
+        """
+        # A job listed twice keeps its last vector
+        latest = {int(job_id): index for index, job_id in enumerate(job_ids)}
+        job_ids, vectors = list(latest), np.asarray(vectors, dtype=np.float32)[list(latest.values())]
+        with self._lock:
+            new_ids = [job_id for job_id in job_ids if job_id not in self._rows]
+            self._reserve(self._count + len(new_ids))
+            for job_id in new_ids:
+                self._rows[job_id] = self._count
+                self._ids[self._count] = job_id
+                self._count += 1
+
+            rows = np.fromiter((self._rows[job_id] for job_id in job_ids), dtype=np.int64, count=len(job_ids))
+            # Replaced rows stop counting towards the document frequencies of their old buckets
+            self._df -= np.count_nonzero(self._vectors[rows], axis=0)
+            self._vectors[rows] = vectors
+            self._df += np.count_nonzero(vectors, axis=0)
+            self._save()
+            if self._ann is not None:
+                self._ann.generation = self._generation
+                self._ann.add(job_ids, vectors)
+
+    def remove(self, job_ids: Iterable[int]) -> int:
+        """
+        Drops jobs from the index (e.g. expired postings); returns how many were indexed.
+        Their rows are zeroed and skipped, not reused.
+        """
+        job_ids = [int(job_id) for job_id in job_ids]
+        with self._lock:
+            rows = [self._rows.pop(job_id) for job_id in job_ids if job_id in self._rows]
+            if rows:
+                self._df -= np.count_nonzero(self._vectors[rows], axis=0)
+                self._vectors[rows] = 0
+                self._ids[rows] = -1
+                self._deleted += len(rows)
+                self._save()
+                if self._ann is not None:
+                    self._ann.generation = self._generation
+                    self._ann.remove(job_ids)
+        return len(rows)
+
+    def top_k(self, text: str, k: int = 10) -> List[Tuple[int, float]]:
+        """
+        Returns up to `k` (job id, score) pairs, best first, for a CV or query text.
+        """
+        return self.search(self.query_vector(text), k)
+
+    def query_vector(self, text: str) -> np.ndarray:
+        """
+        The IDF-weighted vector a text is scored with; squared IDF stands in for weighting both sides.
+        """
+        with self._lock:
+            return self.vectorize(text) * self._idf() ** 2
+
+    def search(self, query: np.ndarray, k: int = 10, exact: bool = False) -> List[Tuple[int, float]]:
+        """
+        Top `k` jobs for a query vector; `exact` scores every job even when the IVF index is enabled.
+        """
+        if self._ann is not None and not exact:
+            return self._ann.search(query, k)
+
+        with self._lock:
+            if not self._rows:
+                return []
+            count = self._count
+            scores = self._vectors[:count] @ query
+            ids = self._ids[:count]
+            if self._deleted:
+                scores[ids < 0] = -np.inf
+
+        k = min(k, len(self._rows))
+        # argpartition finds the k best in linear time; only those k are sorted
+        best = np.argpartition(scores, -k)[-k:]
+        best = best[np.argsort(-scores[best])]
+        return [(int(ids[row]), float(scores[row])) for row in best]
+
+    def _idf(self) -> np.ndarray:
+        return (np.log((1.0 + len(self._rows)) / (1.0 + self._df)) + 1.0).astype(np.float32)
+
+    def _reserve(self, size: int) -> None:
+        # Grow the memory-mapped arrays by doubling, so appends are amortized O(1)
+        if size <= self._capacity:
+            return
+        capacity = max(INITIAL_CAPACITY, self._capacity * 2, size)
+        vectors = self._open_array("vectors.npy", (capacity, self.dim), np.float32)
+        ids = self._open_array("ids.npy", (capacity,), np.int64)
+        if self._count:
+            vectors[:self._count] = self._vectors[:self._count]
+            ids[:self._count] = self._ids[:self._count]
+        for name, array in (("vectors.npy", vectors), ("ids.npy", ids)):
+            array.flush()
+            os.replace(array.filename, self.directory / name)
+        self._vectors = np.load(self.directory / "vectors.npy", mmap_mode="r+")
+        self._ids = np.load(self.directory / "ids.npy", mmap_mode="r+")
+        self._capacity = capacity
+
+    def _open_array(self, name: str, shape: tuple, dtype) -> np.memmap:
+        return np.lib.format.open_memmap(self.directory / f"{name}.tmp", mode="w+", dtype=dtype, shape=shape)
+
+    def _save(self) -> None:
+        self._generation += 1
+        self._vectors.flush()
+        self._ids.flush()
+        np.save(self.directory / "df.npy.tmp.npy", self._df)
+        os.replace(self.directory / "df.npy.tmp.npy", self.directory / "df.npy")
+        # The count is written last: rows past it are ignored if the process dies mid-write
+        meta_tmp = self.directory / "meta.json.tmp"
+        meta_tmp.write_text(json.dumps({
+            "dim": self.dim, "count": self._count, "capacity": self._capacity, "generation": self._generation,
+        }))
+        os.replace(meta_tmp, self.directory / "meta.json")
+
+
+def match_cv(key_info: dict, matcher: Optional[JobMatcher] = None, k: int = 10) -> List[Tuple[int, float]]:
+    """
+    Top `k` (job id, score) pairs for an extracted CV.
+    """
+    matcher = matcher or JobMatcher()
+    return matcher.top_k(profile_text(key_info), k)
@@ -0,0 +1,255 @@
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from typing import List, Optional
+
+from tools.extraction_cache import file_digest
+
+logger = logging.getLogger(__name__)
+
+# The UI, the backend and the workers run from different directories, so the queue is not
+# resolved against the working directory; set CV_QUEUE_PATH to move it
+QUEUE_PATH = os.getenv("CV_QUEUE_PATH", str(Path(__file__).resolve().parent / "data" / "queue" / "jobs.sqlite3"))
+
+
+class JobQueue:
+    """
+    Durable queue of CV extraction jobs stored in SQLite, shared by the UI and the worker processes.
+
+    Identical files are deduplicated by content hash, failed jobs are retried with
+    exponential backoff, and jobs held by a worker that died are handed out again
+    once their lease expires. Every claim counts as an attempt, so a job that keeps
+    killing its worker fails after `max_attempts` like one that keeps raising, and
+    only the worker holding the current lease can complete or fail a job. A deduplicated job can have several owners, and
+    `get` with an owner only finds jobs that owner enqueued.
+    """
+
+    def __init__(
+        self,
+        path: str = QUEUE_PATH,
+        max_attempts: int = 3,
+        backoff_base: float = 2.0,
+        lease_seconds: float = 300,
+    ):
+        self.path = Path(path).resolve()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.lease_seconds = lease_seconds
+        self._conn = sqlite3.connect(str(self.path), timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " file_hash TEXT NOT NULL,"
+            " file_path TEXT NOT NULL,"
+            " status TEXT NOT NULL DEFAULT 'queued',"  # queued | running | done | failed
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            " run_after REAL NOT NULL,"
+            " leased_until REAL,"
+            " lease_token TEXT,"
+            " result TEXT,"
+            " error TEXT,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)"
+        )
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        if "lease_token" not in columns:
+            # Queues created before leases had tokens
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN lease_token TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs (status, run_after)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_hash ON jobs (file_hash)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS job_owners ("
+            " job_id INTEGER NOT NULL REFERENCES jobs (id),"
+            " owner TEXT NOT NULL,"
+            " PRIMARY KEY (job_id, owner))"
+        )
+
+    def enqueue(self, file_path: str, digest: Optional[str] = None, owner: Optional[str] = None) -> int:
+        """
+        Queues a file for extraction and returns the job id.
+        A file whose contents are already queued, running or done returns the existing job,
+        which `owner` (e.g. a user id) is then added to. The path is stored absolute, since
+        workers may run from another directory.
+        """
+        file_path = os.path.abspath(file_path)
+        if digest is None:
+            digest = file_digest(Path(file_path).read_bytes())
+        now = time.time()
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE file_hash = ? AND status != 'failed' ORDER BY id DESC LIMIT 1",
+                (digest,),
+            ).fetchone()
+            if row is not None:
+                job_id = row["id"]
+            else:
+                job_id = self._conn.execute(
+                    "INSERT INTO jobs (file_hash, file_path, run_after, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (digest, str(file_path), now, now, now),
+                ).lastrowid
+            if owner is not None:
+                self._conn.execute("INSERT OR IGNORE INTO job_owners (job_id, owner) VALUES (?, ?)", (job_id, owner))
+            return job_id
+
+    def claim(self) -> Optional[dict]:
+        """
+        Atomically takes the oldest ready job, or a running job whose lease expired.
+        The returned "lease" token must be passed to `complete` or `fail`.
+        """
+        now = time.time()
+        lease = uuid.uuid4().hex
+        with self._transaction():
+            # An expired lease is a failed attempt too; jobs that used up their attempts stop here
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, leased_until = NULL, lease_token = NULL, updated_at = ?"
+                " WHERE status = 'running' AND leased_until < ? AND attempts >= ?",
+                (f"Lease expired on attempt {self.max_attempts} of {self.max_attempts}", now, now, self.max_attempts),
+            )
+            row = self._conn.execute(
+                "SELECT id, file_path, attempts FROM jobs"
+                " WHERE (status = 'queued' AND run_after <= ?) OR (status = 'running' AND leased_until < ?)"
+                " ORDER BY run_after LIMIT 1",
+                (now, now),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, leased_until = ?, lease_token = ?,"
+                " updated_at = ? WHERE id = ?",
+                (now + self.lease_seconds, lease, now, row["id"]),
+            )
+        return {"id": row["id"], "file_path": row["file_path"], "attempts": row["attempts"] + 1, "lease": lease}
+
+    def complete(self, job_id: int, lease: str, result: dict) -> bool:
+        """
+        Stores the result of a claimed job. Returns False, storing nothing, if the lease was lost.
+        """
+        cursor = self._conn.execute(
+            "UPDATE jobs SET status = 'done', result = ?, error = NULL, leased_until = NULL, lease_token = NULL,"
+            " updated_at = ? WHERE id = ? AND status = 'running' AND lease_token = ?",
+            (json.dumps(result, ensure_ascii=False), time.time(), job_id, lease),
+        )
+        return self._check_lease(cursor, job_id)
+
+    def fail(self, job_id: int, lease: str, error: str) -> bool:
+        """
+        Records a failed attempt; the job is retried with exponential backoff until attempts run out.
+        Returns False, recording nothing, if the lease was lost.
+        """
+        now = time.time()
+        with self._transaction():
+            row = self._conn.execute(
+                "SELECT attempts FROM jobs WHERE id = ? AND status = 'running' AND lease_token = ?", (job_id, lease)
+            ).fetchone()
+            if row is None:
+                return self._check_lease(None, job_id)
+            if row["attempts"] < self.max_attempts:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', run_after = ?, error = ?, leased_until = NULL, lease_token = NULL,"
+                    " updated_at = ? WHERE id = ?",
+                    (now + self.backoff_base ** row["attempts"], error, now, job_id),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, leased_until = NULL, lease_token = NULL, updated_at = ?"
+                    " WHERE id = ?",
+                    (error, now, job_id),
+                )
+        return True
+
+    @staticmethod
+    def _check_lease(cursor, job_id: int) -> bool:
+        # The lease expired and another worker claimed the job (or finished it) in the meantime
+        if cursor is not None and cursor.rowcount:
+            return True
+        logger.warning("Job %s is no longer leased by this worker; its outcome was discarded", job_id)
+        return False
+
+    def get(self, job_id: int, owner: Optional[str] = None) -> Optional[dict]:
+        """
+        Returns the job's status, attempts, error and (when done) result.
+        When `owner` is given, a job they did not enqueue is reported as missing.
+        """
+        sql = "SELECT id, status, attempts, result, error, created_at, updated_at FROM jobs WHERE id = ?"
+        params = (job_id,)
+        if owner is not None:
+            sql += " AND id IN (SELECT job_id FROM job_owners WHERE job_id = ? AND owner = ?)"
+            params = (job_id, job_id, owner)
+        row = self._conn.execute(sql, params).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def _transaction(self):
+        return _ImmediateTransaction(self._conn)
+
+
+class _ImmediateTransaction:
+    # BEGIN IMMEDIATE takes the write lock up front so two workers cannot claim the same job
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def __enter__(self):
+        self._conn.execute("BEGIN IMMEDIATE")
+        return self._conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self._conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
+
+
+def run_worker(queue_path: str = QUEUE_PATH, poll_interval: float = 0.5, stop_event=None) -> None:
+    """
+    Claims and processes jobs until `stop_event` is set.
+    """
+    from main import build_tool
+
+    queue = JobQueue(queue_path)
+    tool = build_tool()
+    while stop_event is None or not stop_event.is_set():
+        job = queue.claim()
+        if job is None:
+            time.sleep(poll_interval)
+            continue
+        try:
+            queue.complete(job["id"], job["lease"], tool.run(job["file_path"]))
+        except Exception as e:
+            logger.warning("Job %s attempt %s failed: %s", job["id"], job["attempts"], e)
+            queue.fail(job["id"], job["lease"], f"{type(e).__name__}: {e}")
+
+
+def start_workers(count: int, queue_path: str = QUEUE_PATH) -> List[multiprocessing.Process]:
+    """
+    Starts `count` daemon worker processes.
+    """
+    workers = []
+    for _ in range(count):
+        process = multiprocessing.Process(target=run_worker, args=(queue_path,), daemon=True)
+        process.start()
+        workers.append(process)
+    return workers
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run CV extraction workers against the job queue.")
+    parser.add_argument("-w", "--workers", type=int, default=2)
+    parser.add_argument("--queue", default=QUEUE_PATH)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    processes = start_workers(args.workers, args.queue)
+    signal.signal(signal.SIGTERM, lambda *_: [p.terminate() for p in processes])
+    for process in processes:
+        process.join()
@@ -1,8 +1,15 @@
+import functools
 import os
 from pathlib import Path
-from tools.file_reader_tool import FileReadTool
+from typing import TYPE_CHECKING
+from tools.extraction_cache import CACHE_PATH, ExtractionCache
+from upload_index import INDEX_PATH, UploadIndex
+from upload_storage import STORAGE_ROOT
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    from tools.file_reader_tool import FileReadTool
+
 # Load environment variables
 load_dotenv()
 
@@ -10,20 +17,64 @@ load_dotenv()
 API_KEY = os.getenv("OPENAI_API_KEY")
 MODEL_NAME = os.getenv("OPENAI_MODEL_NAME")
 
+# Upper bound on CV text sent to the LLM; pages beyond it are not parsed
+MAX_CV_TOKENS = int(os.getenv("CV_MAX_TOKENS", "8000"))
+# Tokenizer-counted budget of the compacted CV text in the prompt
+PROMPT_TOKENS = int(os.getenv("CV_PROMPT_TOKENS", "4000"))
+
 # Directory to store CVs
-CVS_DIR = Path("data/cvs")
+CVS_DIR = Path(STORAGE_ROOT)
 CVS_DIR.mkdir(parents=True, exist_ok=True)
 
-def process_last_cv():
+# Index of uploads, so processing addresses a specific upload instead of scanning CVS_DIR
+UPLOAD_INDEX = UploadIndex(INDEX_PATH)
+
+# Cache of extraction results keyed on file content, model and prompt version
+EXTRACTION_CACHE = ExtractionCache(CACHE_PATH)
+
+@functools.lru_cache(maxsize=None)
+def build_tool(bypass_cache: bool = False, use_llm: bool = True, max_concurrency: int = 16, parse_executor=None) -> "FileReadTool":
     """
-    Reads the last uploaded CV and extracts key information using an LLM.
+    Returns the FileReadTool for these options, configured from the environment.
+    `max_concurrency` and `parse_executor` only affect the async path (see FileReadTool).
+    Tools are created once per set of options and reused by later calls.
     """
-    # Get the most recently uploaded CV
-    cv_files = sorted(CVS_DIR.iterdir(), key=lambda f: f.stat().st_mtime, reverse=True)
-    if not cv_files:
-        raise FileNotFoundError("No CVs found in the uploads directory!")
+    # langchain takes about a second to import, so it is loaded on the first extraction, not with this module
+    from tools.file_reader_tool import FileReadTool
 
-    last_cv = cv_files[0]
-    tool = FileReadTool(api_key=API_KEY, model_name=MODEL_NAME)
-    key_info = tool.run(str(last_cv))
+    return FileReadTool(
+        api_key=API_KEY,
+        model_name=MODEL_NAME,
+        cache=EXTRACTION_CACHE,
+        bypass_cache=bypass_cache,
+        base_url=os.getenv("OPENAI_BASE_URL"),
+        max_concurrency=max_concurrency,
+        parse_executor=parse_executor,
+        max_tokens=MAX_CV_TOKENS,
+        use_llm=use_llm,
+        prompt_tokens=PROMPT_TOKENS,
+    )
+
+def process_cv(upload_id: int, bypass_cache: bool = False, use_llm: bool = True):
+    """
+    Extracts key information from a specific upload.
+    Repeat uploads of the same file are served from the extraction cache unless `bypass_cache` is set.
+    With `use_llm=False` only the rule-based fields (email, phone, links, skills, experience) are returned.
+    """
+    upload = UPLOAD_INDEX.get(upload_id)
+    if upload is None:
+        raise FileNotFoundError(f"Upload {upload_id} not found!")
+
+    tool = build_tool(bypass_cache=bypass_cache, use_llm=use_llm)
+    key_info = tool.run(upload["path"])
     return key_info
+
+def process_last_cv(bypass_cache: bool = False, use_llm: bool = True):
+    """
+    Reads the last uploaded CV and extracts key information using an LLM.
+    Prefer `process_cv` with the upload id: under concurrent uploads "last" may be someone else's CV.
+    """
+    last_upload = UPLOAD_INDEX.latest()
+    if last_upload is None:
+        raise FileNotFoundError("No CVs found in the uploads directory!")
+    return process_cv(last_upload["id"], bypass_cache=bypass_cache, use_llm=use_llm)
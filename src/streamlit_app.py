@@ -1,29 +1,108 @@
+import time
 import streamlit as st
 from pathlib import Path
-from main import process_last_cv
+from cv_store import CVStore
+from job_queue import JobQueue, start_workers
+from upload_index import UploadIndex
+from upload_storage import STORAGE_ROOT, UploadStore, UploadTooLarge
 
-# Directory to store uploaded CVs
-CVS_DIR = Path("data/cvs")
-CVS_DIR.mkdir(parents=True, exist_ok=True)
+# Directory to store uploaded CVs, sharded by content hash
+CVS_DIR = Path(STORAGE_ROOT)
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+# Extraction runs in background worker processes; the page only enqueues and polls
+EXTRACTION_WORKERS = 2
+POLL_INTERVAL = 1.0
+
+
+@st.cache_resource
+def get_queue() -> JobQueue:
+    """
+    Starts the extraction workers once per server process and returns the shared job queue.
+    """
+    start_workers(EXTRACTION_WORKERS)
+    return JobQueue()
+
+
+@st.cache_resource
+def get_upload_index() -> UploadIndex:
+    return UploadIndex()
+
+
+@st.cache_resource
+def get_upload_store() -> UploadStore:
+    return UploadStore(str(CVS_DIR), max_bytes=MAX_UPLOAD_BYTES)
+
+
+@st.cache_resource
+def get_cv_store() -> CVStore:
+    return CVStore()
+
+
+queue = get_queue()
+uploads = get_upload_index()
+store = get_upload_store()
+cv_store = get_cv_store()
 
 st.title("📄 CV Uploader and Key Info Extractor")
 
 # Upload CV
-uploaded_cv = st.file_uploader("Upload your CV (PDF only):", type=["pdf"])
+uploaded_cv = st.file_uploader("Upload your CV (PDF, DOCX or TXT):", type=["pdf", "docx", "txt"])
 
 if uploaded_cv:
-    # Save the uploaded file
-    cv_path = CVS_DIR / uploaded_cv.name
-    with open(cv_path, "wb") as f:
-        f.write(uploaded_cv.getbuffer())
+    # Save and index the uploaded file once, not on every rerun of the script
+    if st.session_state.get("upload_file_id") != uploaded_cv.file_id:
+        uploaded_cv.seek(0)
+        try:
+            stored = store.save(uploaded_cv, uploaded_cv.name)
+        except UploadTooLarge as e:
+            st.error(str(e))
+            st.stop()
+        st.session_state["upload_id"] = uploads.record(str(stored.path), uploaded_cv.name, sha256=stored.sha256)
+        st.session_state["upload_file_id"] = uploaded_cv.file_id
+        st.session_state.pop("job_id", None)
     st.success(f"Uploaded CV saved as: {uploaded_cv.name}")
 
-    # Process the last uploaded CV
+    # Queue this session's upload for extraction
     if st.button("Extract Key Information"):
-        with st.spinner("Processing the CV with LLM..."):
-            try:
-                key_info = process_last_cv()
-                st.write("### Extracted Information:")
-                st.json(key_info)
-            except Exception as e:
-                st.error(f"An error occurred: {e}")
+        upload = uploads.get(st.session_state["upload_id"])
+        st.session_state["job_id"] = queue.enqueue(upload["path"], digest=upload["sha256"])
+
+job_id = st.session_state.get("job_id")
+if job_id is not None:
+    job = queue.get(job_id)
+    if job["status"] == "done":
+        st.write("### Extracted Information:")
+        st.json(job["result"])
+        # Keep the result searchable; a re-upload of the same file replaces its earlier entry
+        if st.session_state.get("stored_job_id") != job_id:
+            upload = uploads.get(st.session_state["upload_id"])
+            cv_store.add(job["result"], source=upload["sha256"] if upload else None)
+            st.session_state["stored_job_id"] = job_id
+    elif job["status"] == "failed":
+        st.error(f"An error occurred: {job['error']}")
+    else:
+        # Poll the queue until the worker has finished
+        message = "Processing the CV with LLM..."
+        if job["error"]:
+            message += f" (retrying after: {job['error']})"
+        st.info(message)
+        time.sleep(POLL_INTERVAL)
+        st.rerun()
+
+# Search the extracted CVs of every candidate
+st.write("### Search Candidates")
+search = st.text_input("Skills and experience, e.g. Python AND Kubernetes, >=5 years")
+if search:
+    matches = cv_store.query(search, limit=50)
+    st.caption(f"{cv_store.count(search)} matching candidates, showing the {len(matches)} newest")
+    st.dataframe([
+        {
+            "Name": cv.get("Name"),
+            "Email": cv.get("Email"),
+            "Desired Position": cv.get("Desired Position"),
+            "Years of Experience": cv.get("Years of Experience"),
+            "Skills": ", ".join(cv.get("Skills") or []) if isinstance(cv.get("Skills"), list) else cv.get("Skills"),
+        }
+        for cv in matches
+    ])
@@ -0,0 +1,22 @@
+from tools.llm_output import load_json_object, parse_cv_output
+
+
+def test_truncated_string_keeps_the_complete_fields():
+    output = parse_cv_output('{"Name": "Jane", "Desired Position": "Dev", "Education Background": "BSc')
+    assert output.fields == {"Name": "Jane", "Desired Position": "Dev"}
+    assert "Education Background" in output.missing
+    assert output.repaired
+
+
+def test_number_at_the_cut_is_dropped():
+    assert load_json_object('{"Name": "Jane", "Years of Experience": 12')[0] == {"Name": "Jane"}
+
+
+def test_open_list_at_the_cut_is_dropped():
+    assert load_json_object('{"Name": "Jane", "Skills": ["Python", "SQL"')[0] == {"Name": "Jane"}
+
+
+def test_value_followed_by_a_comma_is_kept():
+    parsed, repaired = load_json_object('{"Name": "Jane", "Years of Experience": 12, "Ski')
+    assert parsed == {"Name": "Jane", "Years of Experience": 12}
+    assert repaired
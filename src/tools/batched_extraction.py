@@ -0,0 +1,119 @@
+import threading
+from typing import Dict, List, Sequence, Tuple
+
+
+class BatchSizer:
+    """
+    Adapts how many CVs go into one LLM request.
+
+    The size grows by one after each fast, successful batch and is halved after a
+    failed one (additive increase, multiplicative decrease). A batch slower than
+    `target_latency` seconds shrinks it by one, and it never grows while the recent
+    error rate is above `max_error_rate`. Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 8,
+        token_budget: int = 12000,
+        target_latency: float = 30.0,
+        initial_size: int = 2,
+        max_error_rate: float = 0.2,
+    ):
+        self.max_size = max(max_size, 1)
+        self.token_budget = token_budget
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self._size = min(max(initial_size, 1), self.max_size)
+        self._error_rate = 0.0
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.documents = 0
+        self.fallbacks = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def error_rate(self) -> float:
+        return self._error_rate
+
+    def record(self, documents: int, latency: float, ok: bool) -> None:
+        """
+        Records the outcome of one batched request.
+        """
+        with self._lock:
+            self.requests += 1
+            self.documents += documents
+            # Exponentially weighted, so old failures stop counting after ~10 batches
+            self._error_rate = 0.9 * self._error_rate + 0.1 * (0.0 if ok else 1.0)
+            if not ok:
+                self._size = max(self._size // 2, 1)
+            elif latency > self.target_latency:
+                self._size = max(self._size - 1, 1)
+            elif self._error_rate <= self.max_error_rate:
+                self._size = min(self._size + 1, self.max_size)
+
+    def record_fallback(self, documents: int) -> None:
+        with self._lock:
+            self.fallbacks += documents
+
+    @property
+    def requests_saved(self) -> int:
+        # Requests a one-CV-per-request run would have made, minus what was actually sent
+        return self.documents - self.requests - self.fallbacks
+
+    def summary(self) -> str:
+        return (
+            f"{self.documents} CVs in {self.requests} batched requests, {self.fallbacks} retried singly, "
+            f"{self.requests_saved} requests saved (batch size now {self.size})"
+        )
+
+
+def pack_batches(token_counts: Sequence[int], max_size: int, token_budget: int) -> List[List[int]]:
+    """
+    Groups documents, in order, into batches of at most `max_size` documents and
+    `token_budget` tokens. A document larger than the budget gets a batch of its own.
+    """
+    batches, current, used = [], [], 0
+    for index, tokens in enumerate(token_counts):
+        if current and (len(current) >= max_size or used + tokens > token_budget):
+            batches.append(current)
+            current, used = [], 0
+        current.append(index)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+def build_batch_prompt(documents: Sequence[Tuple[str, str, List[str]]]) -> str:
+    """
+    Builds one prompt for several CVs from (document id, CV text, fields to extract) triples.
+    """
+    parts = [
+        f"The following texts are extracted from {len(documents)} different CVs. "
+        "Each CV starts with a line `=== CV <id> ===` and must be treated independently.\n"
+    ]
+    for doc_id, text, fields in documents:
+        parts.append(
+            f"=== CV {doc_id} ===\n{text}\n"
+            f"Fields to extract for {doc_id}: {', '.join(fields)}\n"
+        )
+    ids = ", ".join(f'"{doc_id}"' for doc_id, _, _ in documents)
+    parts.append(
+        "Respond with a single JSON object and nothing else. Its keys must be exactly the CV ids "
+        f"({ids}); each value is a JSON object holding only the fields listed for that CV."
+    )
+    return "\n".join(parts)
+
+
+def split_batch_response(parsed, doc_ids: Sequence[str]) -> Dict[str, dict]:
+    """
+    Splits a parsed batched response into per-document results.
+    Documents missing from the response or with a malformed entry are left out.
+    """
+    if not isinstance(parsed, dict):
+        return {}
+    return {doc_id: parsed[doc_id] for doc_id in doc_ids if isinstance(parsed.get(doc_id), dict)}
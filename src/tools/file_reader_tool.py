@@ -1,22 +1,86 @@
-from langchain.tools import BaseTool
+from langchain_core.tools import BaseTool
 from pathlib import Path
-from PyPDF2 import PdfReader
-from langchain_openai import ChatOpenAI
 from pydantic import PrivateAttr
-from typing import Any
-import json
+from typing import TYPE_CHECKING, List, Optional, Union
+from concurrent.futures import Executor
+from tools.extraction_cache import ExtractionCache, file_digest, make_cache_key
+from tools.pdf_text import ExtractedText
+from tools.text_extractors import FileData, extract_text, supported_suffixes
+from tools.mapped_file import map_file
+from tools.rule_extractor import extract_rule_fields, merge_fields, missing_fields
+from tools.prompt_compaction import compact_text
+from tools.section_extraction import candidate_scope, changed_text, field_inputs
+from tools.batched_extraction import BatchSizer, build_batch_prompt, pack_batches, split_batch_response
+from tools.llm_clients import get_chat_client
+from tools.llm_output import PARSE_STATS, ParsedOutput, load_json_object, parse_cv_output, record_response, validate_fields
+from tools.metrics import increment, span
+import asyncio
+import logging
+import time
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+# Bump whenever the prompt or response handling changes so cached results are not reused
+PROMPT_VERSION = "5"
+
+logger = logging.getLogger(__name__)
+
 
 class FileReadTool(BaseTool):
     name: str = "FileReadTool"  # Annotated with type
-    description: str = "Reads a CV file and uses an LLM to extract structured information."  # Annotated with type
-    _llm: ChatOpenAI = PrivateAttr()  # Declared as a private attribute
+    description: str = "Reads a CV file (PDF, DOCX or plain text) and uses an LLM to extract structured information."  # Annotated with type
+    _llm: Optional["ChatOpenAI"] = PrivateAttr(default=None)  # Declared as a private attribute
+    _model_name: str = PrivateAttr()
+    _cache: Optional[ExtractionCache] = PrivateAttr(default=None)
+    _bypass_cache: bool = PrivateAttr(default=False)
+    _max_concurrency: int = PrivateAttr(default=16)
+    _timeout: Optional[float] = PrivateAttr(default=None)
+    _parse_executor: Optional[Executor] = PrivateAttr(default=None)
+    _semaphore: Optional[tuple] = PrivateAttr(default=None)  # (event loop, asyncio.Semaphore)
+    _max_chars: Optional[int] = PrivateAttr(default=None)
+    _max_tokens: Optional[int] = PrivateAttr(default=None)
+    _use_llm: bool = PrivateAttr(default=True)
+    _prompt_tokens: Optional[int] = PrivateAttr(default=None)
 
-    def __init__(self, api_key: str, model_name: str = "gpt-4"):
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = "gpt-4",
+        cache: Optional[ExtractionCache] = None,
+        bypass_cache: bool = False,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 16,
+        timeout: Optional[float] = 120,
+        parse_executor: Optional[Executor] = None,
+        max_chars: Optional[int] = None,
+        max_tokens: Optional[int] = None,
+        use_llm: bool = True,
+        prompt_tokens: Optional[int] = None,
+    ):
         """
         Initialize with the API key and model name.
+        An optional cache short-circuits repeat uploads of the same file; `bypass_cache` forces a fresh extraction.
+        `max_concurrency` and `timeout` bound the async path; PDF parsing there runs on `parse_executor`
+        (the event loop's default executor when not given).
+        `max_chars` / `max_tokens` cap how much CV text is read; pages past the budget are never parsed.
+        With `use_llm=False` only the deterministic rule-based fields are returned and no LLM client is created.
+        `prompt_tokens` is the tokenizer-counted budget the compacted CV text is fitted to before prompting.
         """
         super().__init__()
-        self._llm = ChatOpenAI(openai_api_key=api_key, model=model_name, temperature=0)
+        if use_llm:
+            # Tools with the same model, key and endpoint share one client and its connections
+            self._llm = get_chat_client(api_key, model_name, base_url=base_url, timeout=timeout)
+        self._use_llm = use_llm
+        self._model_name = model_name
+        self._cache = cache
+        self._bypass_cache = bypass_cache
+        self._max_concurrency = max_concurrency
+        self._timeout = timeout
+        self._parse_executor = parse_executor
+        self._max_chars = max_chars
+        self._max_tokens = max_tokens
+        self._prompt_tokens = prompt_tokens
 
     def _run(self, file_path: str) -> dict:
         """
@@ -25,45 +89,345 @@ class FileReadTool(BaseTool):
         file = Path(file_path)
         if not file.exists():
             raise FileNotFoundError(f"{file_path} not found!")
-
-        # Extract raw text from the file (PDF)
-        if file.suffix.lower() == ".pdf":
-            reader = PdfReader(file_path)
-            raw_text = "\n".join(page.extract_text() for page in reader.pages if page.extract_text())
-        else:
+        if file.suffix.lower() not in supported_suffixes():
             raise ValueError(f"Unsupported file format: {file.suffix}")
 
-        # Prompt the LLM to extract structured information
-        prompt = (
+        digest, cached, extracted = self._read_file(file)
+        if cached is not None:
+            return cached
+        return self.extract_from_text(extracted.text, digest=digest)
+
+    def _read_file(self, file: Path) -> tuple:
+        """
+        Returns (digest, cached result, extracted text); the text is only extracted on a cache miss.
+        """
+        # Map the file once: its contents are both the cache key and the parser input
+        with map_file(file) as file_bytes:
+            with span("read"):
+                digest = file_digest(file_bytes)
+                cached = self.lookup_cached(digest)
+            if cached is not None:
+                return digest, cached, None
+
+            # Extract raw text from the file with the best available backend
+            return digest, None, self.read_text(file_bytes, file.suffix)
+
+    @property
+    def text_budget(self) -> tuple:
+        """
+        The (max_chars, max_tokens) budget applied when reading CV text.
+        """
+        return self._max_chars, self._max_tokens
+
+    def read_text(self, file_bytes: FileData, suffix: str = ".pdf") -> ExtractedText:
+        """
+        Extracts the CV text within the configured budget.
+        """
+        with span("parse"):
+            extracted = extract_text(file_bytes, suffix, max_chars=self._max_chars, max_tokens=self._max_tokens)
+        increment("pages", extracted.pages_read)
+        increment("characters", len(extracted.text))
+        if extracted.truncated:
+            logger.info(
+                "CV text truncated to budget after %d of %d pages (%d skipped)",
+                extracted.pages_read, extracted.pages_total, extracted.pages_skipped,
+            )
+        return extracted
+
+    def lookup_cached(self, digest: str) -> Optional[dict]:
+        """
+        Returns the cached extraction for a file digest, if caching is enabled and not bypassed.
+        """
+        if self._cache is None or self._bypass_cache:
+            return None
+        cached = self._cache.get(self._cache_key(digest))
+        increment("cache_misses" if cached is None else "cache_hits")
+        return cached
+
+    def extract_from_text(self, raw_text: str, digest: Optional[str] = None, stats: Optional[dict] = None) -> dict:
+        """
+        Extracts the structured fields of an already extracted CV text.
+        Fields found by the rule-based pass are not requested from the LLM, nor are fields whose
+        CV sections are unchanged since an earlier extraction (see `_plan_sections`).
+        When the file digest is given, the result is stored in the cache.
+        If a `stats` dict is passed, the prompt token counts before and after compaction are written
+        to it, and for a partial re-extraction the fields reused and prompt tokens saved.
+        """
+        rule_fields, fields = self._rule_pass(raw_text)
+        if not self._use_llm or not fields:
+            return self._store(digest, merge_fields(rule_fields, {}))
+
+        stats = {} if stats is None else stats
+        inputs, reused, fields = self._plan_sections(raw_text, fields, rule_fields)
+        answered = {}
+        if fields:
+            compacted = self._compact(changed_text(raw_text, inputs, fields) if reused else raw_text, stats)
+            answered = self._ask(compacted, fields)
+            self._store_sections(inputs, answered)
+        self._report_reuse(raw_text, reused, fields, stats)
+        return self._store(digest, merge_fields(rule_fields, {**reused, **answered}))
+
+    async def aextract_from_text(self, raw_text: str, digest: Optional[str] = None, stats: Optional[dict] = None) -> dict:
+        """
+        Async counterpart of `extract_from_text`, bounded by the concurrency limit and timeout.
+        """
+        rule_fields, fields = self._rule_pass(raw_text)
+        if not self._use_llm or not fields:
+            return self._store(digest, merge_fields(rule_fields, {}))
+
+        stats = {} if stats is None else stats
+        inputs, reused, fields = self._plan_sections(raw_text, fields, rule_fields)
+        answered = {}
+        if fields:
+            compacted = self._compact(changed_text(raw_text, inputs, fields) if reused else raw_text, stats)
+            output = await self._ainvoke_parsed(compacted, fields)
+            if output.fields_to_reask:
+                # Ask again only for what the malformed response lost
+                PARSE_STATS.record("partial_reasks")
+                increment("retries")
+                response = await self._ainvoke(self._build_prompt(compacted, output.fields_to_reask))
+                self._merge_reask(output, response.content)
+            answered = output.fields
+            self._store_sections(inputs, answered)
+        self._report_reuse(raw_text, reused, fields, stats)
+        return self._store(digest, merge_fields(rule_fields, {**reused, **answered}))
+
+    async def _ainvoke_parsed(self, compacted: str, fields: list) -> ParsedOutput:
+        response = await self._ainvoke(self._build_prompt(compacted, fields))
+        with span("json"):
+            return parse_cv_output(response.content, fields)
+
+    def _invoke(self, prompt: str):
+        with span("llm"):
+            response = self._llm.invoke(prompt)  # Use invoke to get AIMessage response
+        self._count_usage(response)
+        return response
+
+    async def _ainvoke(self, prompt: str):
+        # Only the call itself is timed, not the wait for a concurrency slot
+        async with self._get_semaphore():
+            with span("llm"):
+                response = await asyncio.wait_for(self._llm.ainvoke(prompt), self._timeout)
+        self._count_usage(response)
+        return response
+
+    @staticmethod
+    def _count_usage(response) -> None:
+        usage = getattr(response, "usage_metadata", None) or {}
+        increment("prompt_tokens", usage.get("input_tokens", 0))
+        increment("completion_tokens", usage.get("output_tokens", 0))
+
+    @staticmethod
+    def _merge_reask(output: ParsedOutput, content: str) -> None:
+        # The fields already recovered are kept even if the follow-up answer is unusable too
+        fields = output.fields_to_reask
+        try:
+            with span("json"):
+                retry = parse_cv_output(content, fields)
+        except ValueError as e:
+            logger.warning("Re-asking for %s failed: %s", ", ".join(fields), e)
+            return
+        output.fields.update((field, value) for field, value in retry.fields.items() if field in fields)
+
+    def _ask(self, compacted: str, fields: list, output: Optional[ParsedOutput] = None) -> dict:
+        """
+        Returns the LLM's fields for a compacted CV text. Pass the parsed output of an earlier
+        (e.g. batched) response to only re-ask for the fields it lost.
+        """
+        if output is None:
+            response = self._invoke(self._build_prompt(compacted, fields))
+            with span("json"):
+                output = parse_cv_output(response.content, fields)
+        if output.fields_to_reask:
+            # Ask again only for what the malformed response lost
+            PARSE_STATS.record("partial_reasks")
+            increment("retries")
+            response = self._invoke(self._build_prompt(compacted, output.fields_to_reask))
+            self._merge_reask(output, response.content)
+        return output.fields
+
+    def extract_batch(
+        self,
+        texts: List[str],
+        digests: Optional[List[Optional[str]]] = None,
+        stats: Optional[List[dict]] = None,
+        sizer: Optional[BatchSizer] = None,
+    ) -> List[Union[dict, Exception]]:
+        """
+        Extracts several CV texts, packing them into shared LLM requests.
+
+        CVs are grouped under the sizer's batch size and token budget and answered with one
+        JSON object keyed by document id. A CV whose entry is missing or malformed, or every
+        CV of a request that failed, is retried with a request of its own. Fields with unchanged
+        sections are reused as in `extract_from_text`, and only the changed sections are packed.
+        Returns one result per text, in order; a CV that still fails gets the exception instead.
+        """
+        sizer = sizer or BatchSizer()
+        digests = digests or [None] * len(texts)
+        stats = stats or [{} for _ in texts]
+        results: List[Union[dict, Exception, None]] = [None] * len(texts)
+
+        # CVs fully covered by the rule-based pass or by unchanged sections never reach the LLM
+        pending = []  # (index, rule fields, fields to request, compacted text, tokens, field inputs, reused fields)
+        for index, raw_text in enumerate(texts):
+            rule_fields, fields = self._rule_pass(raw_text)
+            if not self._use_llm or not fields:
+                results[index] = self._store(digests[index], merge_fields(rule_fields, {}))
+                continue
+            inputs, reused, fields = self._plan_sections(raw_text, fields, rule_fields)
+            if not fields:
+                self._report_reuse(raw_text, reused, fields, stats[index])
+                results[index] = self._store(digests[index], merge_fields(rule_fields, reused))
+                continue
+            compacted = self._compact(changed_text(raw_text, inputs, fields) if reused else raw_text, stats[index])
+            pending.append((index, rule_fields, fields, compacted, stats[index]["tokens_after"], inputs, reused))
+
+        for batch in pack_batches([item[4] for item in pending], sizer.size, sizer.token_budget):
+            items = [pending[i] for i in batch]
+            answered = {}
+            if len(items) > 1:
+                answered = self._invoke_batch(items, sizer)
+            for position, (index, rule_fields, fields, compacted, _, inputs, reused) in enumerate(items, start=1):
+                started = time.perf_counter()
+                try:
+                    llm_fields = self._ask(compacted, fields, answered.get(position))
+                    self._store_sections(inputs, llm_fields)
+                    self._report_reuse(texts[index], reused, fields, stats[index])
+                    results[index] = self._store(digests[index], merge_fields(rule_fields, {**reused, **llm_fields}))
+                except Exception as e:
+                    results[index] = e
+                if len(items) == 1:
+                    # Single-CV requests still feed the sizer, so it can grow back after shrinking to one
+                    sizer.record(1, time.perf_counter() - started, ok=not isinstance(results[index], Exception))
+        return results
+
+    def _invoke_batch(self, items: list, sizer: BatchSizer) -> dict:
+        # Returns {position in batch: parsed output} for the CVs the batched response answered
+        ids = [f"cv{position}" for position in range(1, len(items) + 1)]
+        prompt = build_batch_prompt([(doc_id, item[3], item[2]) for doc_id, item in zip(ids, items)])
+        started = time.perf_counter()
+        try:
+            content = self._invoke(prompt).content
+            with span("json"):
+                raw, repaired = load_json_object(content)
+                record_response(content, repaired)
+                answered = {}
+                entries = split_batch_response(raw, ids)
+                for doc_id, item in zip(ids, items):
+                    output = validate_fields(entries[doc_id], item[2]) if doc_id in entries else None
+                    if output is not None and output.fields:
+                        output.repaired = repaired
+                        answered[doc_id] = output
+        except Exception as e:
+            logger.warning("Batched request for %d CVs failed, retrying them one by one: %s", len(items), e)
+            answered = {}
+        sizer.record(len(items), time.perf_counter() - started, ok=len(answered) == len(items))
+        if len(answered) < len(items):
+            sizer.record_fallback(len(items) - len(answered))
+            increment("retries", len(items) - len(answered))
+        return {position: answered[doc_id] for position, doc_id in enumerate(ids, start=1) if doc_id in answered}
+
+    def _rule_pass(self, raw_text: str) -> tuple:
+        # Returns the rule-based fields and the fields still left for the LLM
+        with span("rules"):
+            rule_fields = extract_rule_fields(raw_text)
+        return rule_fields, missing_fields(rule_fields)
+
+    def _compact(self, raw_text: str, stats: Optional[dict]) -> str:
+        # Strip headers, footers and boilerplate and fit the CV text to the prompt budget
+        with span("prompt"):
+            compacted, report = compact_text(raw_text, max_tokens=self._prompt_tokens, model_name=self._model_name)
+        logger.info(
+            "Prompt compacted from %d to %d tokens (%d lines dropped%s)",
+            report.tokens_before, report.tokens_after, report.lines_dropped,
+            ", truncated to budget" if report.truncated else "",
+        )
+        if stats is not None:
+            stats.update(tokens_before=report.tokens_before, tokens_after=report.tokens_after)
+        return compacted
+
+    def _plan_sections(self, raw_text: str, fields: list, rule_fields: dict) -> tuple:
+        """
+        Returns (field inputs, reused fields, fields to ask for). A field is reused when an earlier
+        extraction of the same candidate's CV answered it from the same section text, e.g. when a CV
+        is re-uploaded with only its experience edited. See `candidate_scope` for who counts as the same.
+        """
+        inputs = field_inputs(raw_text, fields, scope=candidate_scope(raw_text, rule_fields.get("Email")))
+        reused = {}
+        if self._cache is not None and not self._bypass_cache:
+            for field, (section_digest, _) in inputs.items():
+                cached = self._cache.get(self._section_key(section_digest))
+                if cached is not None and field in cached:
+                    reused[field] = cached[field]
+        return inputs, reused, [field for field in fields if field not in reused]
+
+    def _store_sections(self, inputs: dict, answered: dict) -> None:
+        # Fields the LLM left out are not stored, so the next upload asks for them again
+        if self._cache is None:
+            return
+        for field, value in answered.items():
+            if field in inputs:
+                self._cache.set(self._section_key(inputs[field][0]), {field: value})
+
+    def _report_reuse(self, raw_text: str, reused: dict, asked: list, stats: dict) -> None:
+        # Prompt tokens saved: the full compacted CV against the sections actually sent
+        if not reused:
+            return
+        with span("prompt"):
+            _, full = compact_text(raw_text, max_tokens=self._prompt_tokens, model_name=self._model_name)
+        saved = full.tokens_after - (stats.get("tokens_after", 0) if asked else 0)
+        stats.update(fields_reused=len(reused), tokens_saved=saved)
+        increment("section_fields_reused", len(reused))
+        increment("section_tokens_saved", saved)
+        logger.info(
+            "Reused %d of %d LLM fields from unchanged sections; %d of %d prompt tokens saved",
+            len(reused), len(reused) + len(asked), saved, full.tokens_after,
+        )
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives belong to one event loop, so recreate the limiter when the loop changes
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore[0] is not loop:
+            self._semaphore = (loop, asyncio.Semaphore(self._max_concurrency))
+        return self._semaphore[1]
+
+    @staticmethod
+    def _build_prompt(raw_text: str, fields: list) -> str:
+        # Prompt the LLM to extract only the fields the rule-based pass could not fill
+        return (
             f"The following text is extracted from a CV:\n\n{raw_text}\n\n"
             "Please extract the following details in JSON format:\n"
-            "- Name\n"
-            "- Email\n"
-            "- Desired Position\n"
-            "- Skills\n"
-            "- Years of Experience\n"
-            "- Education Background"
+            + "\n".join(f"- {field}" for field in fields)
         )
-        response = self._llm.invoke(prompt)  # Use invoke to get AIMessage response
 
+    def _cache_key(self, digest: str) -> str:
+        # The text budgets and LLM mode change the result, so they are part of the key
+        mode = "llm" if self._use_llm else "rules"
+        variant = f"{PROMPT_VERSION}:{self._max_chars}:{self._max_tokens}:{self._prompt_tokens}:{mode}"
+        return make_cache_key(digest, self._model_name, variant)
+
+    def _section_key(self, section_digest: str) -> str:
+        return make_cache_key(section_digest, self._model_name, f"{PROMPT_VERSION}:section")
+
+    def _store(self, digest: Optional[str], key_info: dict) -> dict:
+        if self._cache is not None and digest is not None:
+            self._cache.set(self._cache_key(digest), key_info)
+        return key_info
+
+    async def _arun(self, file_path: str) -> dict:
+        """
+        Extracts key information from a CV file without blocking the event loop.
+        File reading and text extraction run on an executor; the LLM call uses `ainvoke`.
+        """
+        file = Path(file_path)
+        if file.suffix.lower() not in supported_suffixes():
+            raise ValueError(f"Unsupported file format: {file.suffix}")
+
+        loop = asyncio.get_running_loop()
         try:
-            # Extract the raw content from the `invoke` response
-            raw_response = response.content.strip()  # Access the content and remove leading/trailing whitespace
-
-            # Clean up triple backticks if present
-            if raw_response.startswith("```") and raw_response.endswith("```"):
-                raw_response = raw_response[3:-3].strip()
-
-            # Remove the "json" prefix if present
-            if raw_response.lower().startswith("json"):
-                raw_response = raw_response[4:].strip()
-
-            # Safely parse the JSON output
-            parsed_response = json.loads(raw_response)  # Convert the JSON string into a Python dictionary
-            return parsed_response
-        except json.JSONDecodeError as e:
-            # If parsing fails, include the raw response in the error for debugging
-            raise ValueError(f"Failed to parse LLM response: {raw_response}") from e
-
-    async def _arun(self, file_path: str) -> Any:
-        raise NotImplementedError("FileReadTool does not support async.")
+            digest, cached, extracted = await loop.run_in_executor(self._parse_executor, self._read_file, file)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"{file_path} not found!") from None
+        if cached is not None:
+            return cached
+        return await self.aextract_from_text(extracted.text, digest=digest)
@@ -0,0 +1,80 @@
+import hashlib
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+# Keep-alive connections shared by every synchronous LLM client of the process
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 20
+
+_lock = threading.Lock()
+_clients: Dict[Tuple, Any] = {}
+_http_client = None
+
+
+def _key_fingerprint(api_key: Optional[str]) -> str:
+    # The registry key holds a digest of the API key, not the key itself
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def shared_http_client():
+    """
+    The process-wide httpx client used by synchronous LLM calls, so they reuse open connections.
+    """
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            import httpx
+
+            _http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS),
+            )
+        return _http_client
+
+
+def get_chat_client(
+    api_key: Optional[str],
+    model_name: str,
+    base_url: Optional[str] = None,
+    timeout: Optional[float] = None,
+    temperature: float = 0,
+):
+    """
+    Returns the ChatOpenAI client for a model, key and endpoint, creating it on first use.
+
+    Clients are kept for the life of the process, so every FileReadTool with the same
+    settings shares one client and its connection pools. langchain_openai is imported
+    here rather than at module level, as it takes most of a second to load.
+    """
+    key = (model_name, _key_fingerprint(api_key), base_url, timeout, temperature)
+    with _lock:
+        client = _clients.get(key)
+    if client is not None:
+        return client
+
+    from langchain_openai import ChatOpenAI
+
+    http_client = shared_http_client()
+    with _lock:
+        # Another thread may have created it meanwhile; keep the first one
+        if key not in _clients:
+            _clients[key] = ChatOpenAI(
+                openai_api_key=api_key,
+                model=model_name,
+                temperature=temperature,
+                base_url=base_url,
+                timeout=timeout,
+                http_client=http_client,
+            )
+        return _clients[key]
+
+
+def clear_clients() -> None:
+    """
+    Drops the registered clients and closes the shared connection pool.
+    """
+    global _http_client
+    with _lock:
+        _clients.clear()
+        if _http_client is not None:
+            _http_client.close()
+            _http_client = None
@@ -0,0 +1,262 @@
+import json
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence, Tuple
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+from pydantic_core import from_json
+
+from tools.rule_extractor import CV_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Candidate object starts tried when the response is not clean JSON
+MAX_OBJECT_STARTS = 20
+
+CODE_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)?")
+SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "„": '"'})
+
+
+class CVInfo(BaseModel):
+    """
+    The extracted CV fields. Keys use the prompt's field names ("Desired Position", ...);
+    values are coerced from the shapes LLMs commonly return.
+    """
+    model_config = ConfigDict(populate_by_name=True, extra="ignore")
+
+    name: Optional[str] = Field(None, alias="Name")
+    email: Optional[str] = Field(None, alias="Email")
+    desired_position: Optional[str] = Field(None, alias="Desired Position")
+    skills: Optional[List[str]] = Field(None, alias="Skills")
+    years_of_experience: Optional[float] = Field(None, alias="Years of Experience")
+    education_background: Optional[str] = Field(None, alias="Education Background")
+
+    @field_validator("skills", mode="before")
+    @classmethod
+    def _split_skills(cls, value):
+        if isinstance(value, str):
+            return [skill.strip() for skill in re.split(r"[,;\n]", value) if skill.strip()]
+        return value
+
+    @field_validator("years_of_experience", mode="before")
+    @classmethod
+    def _parse_years(cls, value):
+        # "5+ years", "about 3,5" -> the first number; "N/A" -> None
+        if isinstance(value, str):
+            match = NUMBER_RE.search(value)
+            return float(match.group().replace(",", ".")) if match else None
+        return value
+
+    @field_validator("name", "email", "desired_position", "education_background", mode="before")
+    @classmethod
+    def _join_lists(cls, value):
+        if isinstance(value, list):
+            return "; ".join(str(item) for item in value)
+        if isinstance(value, dict):
+            return "; ".join(f"{key}: {item}" for key, item in value.items())
+        return value
+
+
+# Lenient key lookup: "desired_position", "years of experience:" etc. map to the prompt field names
+_FIELD_KEYS = {re.sub(r"[^a-z]", "", name.lower()): name for name in CV_FIELDS}
+
+
+@dataclass
+class ParsedOutput:
+    """
+    The fields recovered from one LLM response.
+    `missing` lists requested fields the response did not contain (or held an invalid value for);
+    `invalid` the subset that was present but failed validation.
+    """
+    fields: dict
+    missing: List[str] = field(default_factory=list)
+    invalid: List[str] = field(default_factory=list)
+    repaired: bool = False
+
+    @property
+    def fields_to_reask(self) -> List[str]:
+        # A clean response that omits a field most likely means "not in the CV"; a repaired
+        # (truncated or malformed) one lost it, as did one whose value failed validation
+        return self.missing if self.repaired else self.invalid
+
+
+class ParseStats:
+    """
+    Counts how LLM responses were parsed, and the full LLM calls that recovery saved.
+
+    Before recovery existed, a response that json.loads rejected (after stripping a code
+    fence) raised and the whole extraction was retried; each such response that is now
+    repaired is one full call saved.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.responses = 0
+        self.clean = 0
+        self.repaired = 0
+        self.partial_reasks = 0
+        self.failures = 0
+        self.calls_saved = 0
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            self.responses += outcome not in ("partial_reasks", "calls_saved")
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def summary(self) -> str:
+        return (
+            f"{self.responses} responses: {self.clean} clean, {self.repaired} repaired, "
+            f"{self.failures} unrecoverable; {self.partial_reasks} re-asked for missing fields only; "
+            f"{self.calls_saved} full calls saved"
+        )
+
+
+PARSE_STATS = ParseStats()
+
+
+def load_json_object(content: str) -> Tuple[dict, bool]:
+    """
+    Parses the JSON object in an LLM response and returns (object, repaired).
+
+    Clean JSON takes the fast path. Otherwise code fences, surrounding prose, trailing
+    commas and truncation are tolerated and the largest object found is returned; the last
+    field of a truncated object is left out, since its value may be incomplete.
+    Raises ValueError if the response holds no JSON object at all.
+    """
+    try:
+        parsed = json.loads(content)
+        if isinstance(parsed, dict):
+            return parsed, False
+    except json.JSONDecodeError:
+        pass
+
+    text = TRAILING_COMMA_RE.sub(r"\1", CODE_FENCE_RE.sub("", content.strip()).translate(SMART_QUOTES))
+    decoder = json.JSONDecoder()
+    best = None
+    start = text.find("{")
+    for _ in range(MAX_OBJECT_STARTS):
+        if start < 0:
+            break
+        try:
+            # A complete object, possibly followed by prose
+            candidate = decoder.raw_decode(text, start)[0]
+        except json.JSONDecodeError:
+            candidate = _truncated_object(text[start:])
+        if isinstance(candidate, dict) and (best is None or len(candidate) > len(best)):
+            best = candidate
+        start = text.find("{", start + 1)
+
+    if not best:
+        raise ValueError(f"Failed to parse LLM response: {content}")
+    return best, True
+
+
+def _truncated_object(text: str) -> Optional[dict]:
+    # Partial parsing keeps the complete values of a truncated object and already leaves out a
+    # cut-off string. A number or list that merely looks complete may still be cut short, so the
+    # last value is dropped and re-asked for only when the text ends inside it.
+    try:
+        candidate = from_json(text, allow_partial=True)
+    except ValueError:
+        return None
+    if isinstance(candidate, dict) and candidate:
+        last = next(reversed(candidate))
+        if not _value_complete(text, last):
+            candidate.pop(last)
+    return candidate
+
+
+def _value_complete(text: str, key: str) -> bool:
+    # Whether the value of the last occurrence of `key` ends before the text does
+    keys = list(re.finditer(r'(?<!\\)%s\s*:\s*' % re.escape(json.dumps(key, ensure_ascii=False)), text))
+    if not keys:
+        return False
+    try:
+        value, end = json.JSONDecoder().raw_decode(text, keys[-1].end())
+    except json.JSONDecodeError:
+        return False
+    # A number at the very end may have lost digits; anything else that decodes is closed
+    return end < len(text.rstrip()) or not isinstance(value, (int, float)) or isinstance(value, bool)
+
+
+def validate_fields(raw: dict, fields: Sequence[str] = CV_FIELDS) -> ParsedOutput:
+    """
+    Validates a response object against CVInfo, keeping every valid field.
+    Invalid values are dropped and reported as missing instead of failing the whole response.
+    """
+    data = {_FIELD_KEYS.get(re.sub(r"[^a-z]", "", str(key).lower()), key): value for key, value in raw.items()}
+    invalid = []
+    while True:
+        try:
+            info = CVInfo.model_validate(data)
+            break
+        except ValidationError as e:
+            bad = {error["loc"][0] for error in e.errors() if error["loc"]}
+            if not bad & data.keys():
+                raise
+            for key in bad:
+                data.pop(key, None)
+                invalid.append(key)
+
+    parsed = info.model_dump(by_alias=True, exclude_unset=True)
+    return ParsedOutput(
+        parsed,
+        missing=[name for name in fields if name not in parsed],
+        invalid=[name for name in fields if name in invalid],
+    )
+
+
+def parse_cv_output(content: str, fields: Sequence[str] = CV_FIELDS) -> ParsedOutput:
+    """
+    Parses and validates one CV extraction response, recovering what it can.
+    """
+    try:
+        # Fast path: a clean, schema-valid response is parsed and validated in one step
+        info = CVInfo.model_validate_json(content)
+        parsed = info.model_dump(by_alias=True, exclude_unset=True)
+        if parsed:
+            PARSE_STATS.record("clean")
+            return ParsedOutput(parsed, missing=[name for name in fields if name not in parsed])
+    except ValidationError:
+        pass
+
+    try:
+        raw, repaired = load_json_object(content)
+    except ValueError:
+        PARSE_STATS.record("failures")
+        raise
+    output = validate_fields(raw, fields)
+    if not output.fields:
+        PARSE_STATS.record("failures")
+        raise ValueError(f"LLM response has none of the requested fields: {content}")
+    output.repaired = repaired
+    record_response(content, repaired)
+    return output
+
+
+def record_response(content: str, repaired: bool) -> None:
+    """
+    Counts a parsed response in PARSE_STATS.
+    """
+    PARSE_STATS.record("repaired" if repaired else "clean")
+    if repaired and not _legacy_parses(content):
+        PARSE_STATS.record("calls_saved")
+        logger.info("Recovered a malformed LLM response that would have been retried in full")
+
+
+def _legacy_parses(content: str) -> bool:
+    # The parsing this module replaced: strip a code fence and a "json" prefix, then json.loads
+    text = content.strip()
+    if text.startswith("```") and text.endswith("```"):
+        text = text[3:-3].strip()
+    if text.lower().startswith("json"):
+        text = text[4:].strip()
+    try:
+        json.loads(text)
+        return True
+    except json.JSONDecodeError:
+        return False
@@ -0,0 +1,25 @@
+import mmap
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+
+@contextmanager
+def map_file(path: Union[str, Path]) -> Iterator[Union[mmap.mmap, bytes]]:
+    """
+    Maps a file read-only into memory so parsers and hashers can use it without copying it into a bytes object.
+    Empty files (which cannot be mapped) yield b"".
+    """
+    with open(path, "rb") as f:
+        if Path(path).stat().st_size == 0:
+            yield b""
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            try:
+                mapped.close()
+            except BufferError:
+                # A parser still holds a view into the mapping; it is unmapped once that is garbage collected
+                pass
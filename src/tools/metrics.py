@@ -0,0 +1,255 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Stages timed by FileReadTool, in pipeline order
+STAGES = ("read", "parse", "rules", "prompt", "llm", "json")
+# Histogram bucket bounds in seconds, from a cache lookup up to a slow LLM call
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PREFIX = "cv_extractor"
+# Set to a file path to append every span and counter event to it as JSON lines
+LOG_ENV = "CV_METRICS_LOG"
+
+Hook = Callable[[dict], None]
+
+
+class Metrics:
+    """
+    In-process registry of stage timings (histograms) and counters.
+
+    Every observation is also passed to the registered hooks as an event dict, e.g.
+    {"event": "span", "stage": "llm", "seconds": 0.84} or
+    {"event": "count", "name": "prompt_tokens", "value": 912}.
+    """
+
+    def __init__(self, buckets: Iterable[float] = BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._hooks: List[Hook] = []
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters: Dict[str, float] = defaultdict(float)
+            self._bucket_counts: Dict[str, List[int]] = {}
+            self._sums: Dict[str, float] = defaultdict(float)
+            self._errors: Dict[str, int] = defaultdict(int)
+
+    def add_hook(self, hook: Hook) -> Hook:
+        self._hooks.append(hook)
+        return hook
+
+    def remove_hook(self, hook: Hook) -> None:
+        self._hooks.remove(hook)
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        if not value:
+            return
+        with self._lock:
+            self.counters[name] += value
+        self._emit({"event": "count", "name": name, "value": value, **labels})
+
+    def observe(self, stage: str, seconds: float, error: bool = False, **labels) -> None:
+        with self._lock:
+            counts = self._bucket_counts.setdefault(stage, [0] * (len(self.buckets) + 1))
+            counts[next((i for i, bound in enumerate(self.buckets) if seconds <= bound), len(self.buckets))] += 1
+            self._sums[stage] += seconds
+            self._errors[stage] += error
+        self._emit({"event": "span", "stage": stage, "seconds": round(seconds, 6), "error": error, **labels})
+
+    @contextmanager
+    def span(self, stage: str, **labels):
+        """
+        Times the enclosed block as one observation of `stage`; a raised exception marks it as an error.
+        """
+        start = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, error=error, **labels)
+
+    def _emit(self, event: dict) -> None:
+        if not self._hooks:
+            return
+        event["ts"] = round(time.time(), 3)
+        for hook in list(self._hooks):
+            try:
+                hook(event)
+            except Exception:
+                # A broken hook must not fail the extraction it is observing
+                pass
+
+    def prometheus_text(self) -> str:
+        """
+        The metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            lines = [
+                f"# HELP {PREFIX}_stage_seconds Time spent in each extraction stage.",
+                f"# TYPE {PREFIX}_stage_seconds histogram",
+            ]
+            for stage, counts in sorted(self._bucket_counts.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {self._sums[stage]:.6f}')
+                lines.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {cumulative}')
+            lines.append(f"# HELP {PREFIX}_stage_errors_total Stage runs that raised.")
+            lines.append(f"# TYPE {PREFIX}_stage_errors_total counter")
+            for stage, errors in sorted(self._errors.items()):
+                lines.append(f'{PREFIX}_stage_errors_total{{stage="{stage}"}} {errors}')
+            for name, value in sorted(self.counters.items()):
+                lines.append(f"# TYPE {PREFIX}_{name}_total counter")
+                lines.append(f"{PREFIX}_{name}_total {value:g}")
+        return "\n".join(lines) + "\n"
+
+
+class JsonLogHook:
+    """
+    Appends each event as one JSON line. Lines are written with a single append each,
+    so several worker processes can share one log file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def __call__(self, event: dict) -> None:
+        os.write(self._fd, (json.dumps(event, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+METRICS = Metrics()
+if os.getenv(LOG_ENV):
+    METRICS.add_hook(JsonLogHook(os.environ[LOG_ENV]))
+
+
+def span(stage: str, **labels):
+    return METRICS.span(stage, **labels)
+
+
+def increment(name: str, value: float = 1, **labels) -> None:
+    METRICS.increment(name, value, **labels)
+
+
+def serve(port: int = 9464, host: str = "127.0.0.1", metrics: Metrics = METRICS) -> ThreadingHTTPServer:
+    """
+    Serves the metrics as Prometheus text on http://host:port/metrics from a background thread.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    # Nearest-rank percentile of an already sorted list
+    return sorted_values[max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))]
+
+
+def summarize(lines: Iterable[str]) -> Dict[str, dict]:
+    """
+    Per-stage count, errors and p50/p95/p99/max seconds from JSON log lines; other lines are skipped.
+    """
+    durations, errors, counters = defaultdict(list), defaultdict(int), defaultdict(float)
+    for line in lines:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(event, dict):
+            continue
+        if event.get("event") == "span":
+            durations[event["stage"]].append(float(event["seconds"]))
+            errors[event["stage"]] += bool(event.get("error"))
+        elif event.get("event") == "count":
+            counters[event["name"]] += event["value"]
+
+    order = {stage: index for index, stage in enumerate(STAGES)}
+    summary = {}
+    for stage in sorted(durations, key=lambda stage: (order.get(stage, len(order)), stage)):
+        values = sorted(durations[stage])
+        summary[stage] = {
+            "count": len(values),
+            "errors": errors[stage],
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "p99": percentile(values, 0.99),
+            "max": values[-1],
+            "total": sum(values),
+        }
+    return {"stages": summary, "counters": dict(counters)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Summarize per-stage extraction timings from metrics JSON logs.")
+    parser.add_argument("logs", nargs="*", help=f"JSON log files written via {LOG_ENV} (default: stdin)")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    def lines():
+        if not args.logs:
+            yield from sys.stdin
+        for path in args.logs:
+            with open(path, encoding="utf-8") as log:
+                yield from log
+
+    summary = summarize(lines())
+    if args.json:
+        print(json.dumps(summary, indent=2))
+        return 0
+    if not summary["stages"]:
+        print("No span events found")
+        return 1
+
+    grand_total = sum(stats["total"] for stats in summary["stages"].values())
+    print(f"{'stage':<10}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'share':>8}")
+    for stage, stats in summary["stages"].items():
+        print(
+            f"{stage:<10}{stats['count']:>8}{stats['errors']:>8}"
+            + "".join(f"{stats[key] * 1000:>10.1f}" for key in ("p50", "p95", "p99", "max"))
+            + f"{stats['total'] / grand_total:>8.0%}"
+        )
+    if summary["counters"]:
+        print()
+        for name, value in sorted(summary["counters"].items()):
+            print(f"{name:<20}{value:>12g}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+# Rough characters-per-token ratio used to turn a token budget into a character budget
+CHARS_PER_TOKEN = 4
+# Separates real pages in extracted text; str.splitlines() treats it as a line break
+PAGE_BREAK = "\f"
+
+
+@dataclass
+class ExtractedText:
+    """
+    Text pulled from a document together with how much of it was read.
+    """
+    text: str
+    pages_read: int
+    pages_total: int
+    truncated: bool = False
+    backend: Optional[str] = None
+
+    @property
+    def pages_skipped(self) -> int:
+        return self.pages_total - self.pages_read
+
+
+def read_within_budget(
+    pages: Iterable[str],
+    pages_total: int,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    separator: str = "\n",
+) -> ExtractedText:
+    """
+    Consumes page texts lazily, stopping once the character or token budget is spent.
+    Pages after the stopping point are never pulled from the iterator, so they are not parsed.
+    Pages are joined with `separator` (PAGE_BREAK keeps page boundaries visible).
+    """
+    budget = max_chars
+    if max_tokens is not None:
+        token_chars = max_tokens * CHARS_PER_TOKEN
+        budget = token_chars if budget is None else min(budget, token_chars)
+
+    parts = []
+    used = 0
+    pages_read = 0
+    truncated = False
+    for page_text in pages:
+        pages_read += 1
+        if not page_text:
+            continue
+        if budget is not None and used + len(page_text) > budget:
+            parts.append(page_text[:max(budget - used, 0)])
+            truncated = True
+            break
+        parts.append(page_text)
+        used += len(page_text) + len(separator)  # Account for the separator
+
+    return ExtractedText(separator.join(parts), pages_read, pages_total, truncated)
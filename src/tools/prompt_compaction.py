@@ -0,0 +1,208 @@
+import functools
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from tools.pdf_text import CHARS_PER_TOKEN, PAGE_BREAK
+
+logger = logging.getLogger(__name__)
+
+# A line at the top or bottom of this many pages (or of every page, for shorter documents)
+# is a running header/footer rather than content
+REPEATED_LINE_THRESHOLD = 3
+# Non-blank lines at each end of a page where running headers and footers are looked for
+PAGE_EDGE_LINES = 3
+# Longer lines are kept even if repeated; real headers and footers are short
+MAX_REPEATED_LINE_LENGTH = 100
+
+SECTION_HEADINGS = {
+    "contact": ("contact", "contacts", "contact information", "personal information", "personal details"),
+    "summary": ("summary", "profile", "about me", "objective", "professional summary", "career objective"),
+    "experience": ("experience", "work experience", "professional experience", "employment", "employment history", "work history"),
+    "education": ("education", "academic background", "qualifications", "certifications", "courses"),
+    "skills": ("skills", "technical skills", "key skills", "core competencies", "technologies", "languages"),
+    "projects": ("projects", "key projects", "achievements", "key achievements"),
+    "publications": ("publications", "papers", "conferences"),
+    "references": ("references", "referees"),
+    "declaration": ("declaration", "consent", "personal data consent"),
+    "interests": ("hobbies", "interests", "hobbies and interests"),
+}
+_HEADING_TO_SECTION = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+
+# Sections that never contribute to the extracted fields
+BOILERPLATE_SECTIONS = {"references", "declaration", "interests"}
+
+PAGE_NUMBER_RE = re.compile(r"^(?:page\s*)?\d{1,3}(?:\s*(?:/|of)\s*\d{1,3})?$", re.IGNORECASE)
+PAGE_FOOTER_RE = re.compile(r"\bpage\s*\d{1,3}(?:\s*(?:/|of)\s*\d{1,3})?\b", re.IGNORECASE)
+BOILERPLATE_LINE_RE = re.compile(
+    r"references (?:are )?available (?:up)?on request|curriculum vitae|^resume$|^cv$"
+    r"|i hereby (?:declare|confirm)|processing of (?:my )?personal data",
+    re.IGNORECASE,
+)
+WHITESPACE_RE = re.compile(r"[ \t ]+")
+
+
+@dataclass
+class CompactionReport:
+    """
+    Token counts before and after compaction for one CV.
+    """
+    tokens_before: int
+    tokens_after: int
+    lines_dropped: int
+    truncated: bool
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+@functools.lru_cache(maxsize=None)
+def _encoding(model_name: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            # Unknown model names are counted with the GPT-4 tokenizer
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # The encoding files are downloaded on first use and may be unavailable offline
+        logger.warning("Tokenizer unavailable (%s); estimating tokens from characters", e)
+        return None
+
+
+def count_tokens(text: str, model_name: str = "gpt-4") -> int:
+    """
+    Counts tokens with the model's tokenizer, or estimates them from characters if it is unavailable.
+    """
+    encoding = _encoding(model_name)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model_name: str = "gpt-4") -> str:
+    """
+    Cuts text down to at most `max_tokens` tokens.
+    """
+    encoding = _encoding(model_name)
+    if encoding is None:
+        return text[:max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+
+
+def section_of(line: str) -> Optional[str]:
+    """
+    Returns the section name if the line is a section heading.
+    """
+    key = line.strip().strip(":").strip().lower()
+    return _HEADING_TO_SECTION.get(key) if len(key) <= 40 else None
+
+
+def split_sections(text: str) -> List[Tuple[str, str]]:
+    """
+    Splits CV text into (section name, text) pairs; text before the first heading is "contact".
+    """
+    sections = []
+    current, lines = "contact", []
+    for line in text.splitlines():
+        section = section_of(line)
+        if section is not None:
+            if lines:
+                sections.append((current, "\n".join(lines)))
+            current, lines = section, []
+        lines.append(line)
+    if lines:
+        sections.append((current, "\n".join(lines)))
+    return sections
+
+
+def _normalize(line: str) -> str:
+    return WHITESPACE_RE.sub(" ", line).strip()
+
+
+def _edge_lines(page: List[str]) -> set:
+    # Positions of the first and last PAGE_EDGE_LINES non-blank lines of a page
+    content = [index for index, line in enumerate(page) if line]
+    return set(content[:PAGE_EDGE_LINES] + content[-PAGE_EDGE_LINES:])
+
+
+def _running_lines(pages: List[List[str]]) -> set:
+    # Lower-cased lines found at the top or bottom of enough distinct pages
+    if len(pages) < 2:
+        return set()
+    min_pages = min(REPEATED_LINE_THRESHOLD, len(pages))
+    counts = Counter()
+    for page in pages:
+        counts.update({page[index].lower() for index in _edge_lines(page) if len(page[index]) <= MAX_REPEATED_LINE_LENGTH})
+    return {line for line, pages_seen in counts.items() if pages_seen >= min_pages}
+
+
+def compact_text(
+    text: str,
+    max_tokens: Optional[int] = None,
+    model_name: str = "gpt-4",
+) -> Tuple[str, CompactionReport]:
+    """
+    Normalizes CV text and fits it to a token budget.
+
+    Collapses whitespace, drops page numbers, running headers/footers and boilerplate
+    sections (references, declarations, hobbies), then truncates to `max_tokens` tokens.
+    Running headers and footers are only recognized across PAGE_BREAK-separated pages: a short
+    line at the top or bottom of several pages is kept once, and repeats elsewhere are content.
+    """
+    pages = [[_normalize(line) for line in page.splitlines()] for page in text.split(PAGE_BREAK)]
+    running = _running_lines(pages)
+    lines = [
+        (line, index in edges)
+        for page, edges in ((page, _edge_lines(page)) for page in pages)
+        for index, line in enumerate(page)
+    ]
+
+    kept = []
+    seen_repeated = set()
+    dropped = 0
+    skipping_section = False
+    for line, at_edge in lines:
+        if not line:
+            # Keep at most one blank line in a row
+            if kept and kept[-1]:
+                kept.append("")
+            continue
+
+        section = section_of(line)
+        if section is not None:
+            skipping_section = section in BOILERPLATE_SECTIONS
+        is_footer = PAGE_NUMBER_RE.match(line) or (len(line) <= 60 and PAGE_FOOTER_RE.search(line))
+        if skipping_section or is_footer or BOILERPLATE_LINE_RE.search(line):
+            dropped += 1
+            continue
+
+        key = line.lower()
+        if at_edge and key in running:
+            if key in seen_repeated:
+                dropped += 1
+                continue
+            seen_repeated.add(key)
+        kept.append(line)
+
+    compacted = "\n".join(kept).strip()
+    truncated = False
+    if max_tokens is not None and count_tokens(compacted, model_name) > max_tokens:
+        compacted = truncate_to_tokens(compacted, max_tokens, model_name)
+        truncated = True
+
+    report = CompactionReport(
+        tokens_before=count_tokens(text, model_name),
+        tokens_after=count_tokens(compacted, model_name),
+        lines_dropped=dropped,
+        truncated=truncated,
+    )
+    return compacted, report
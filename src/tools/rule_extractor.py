@@ -0,0 +1,230 @@
+import re
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from tools.prompt_compaction import split_sections
+
+# Fields the extraction prompt asks for, in output order
+CV_FIELDS = ("Name", "Email", "Desired Position", "Skills", "Years of Experience", "Education Background")
+# Fields the rules only give hints for: the LLM is still asked and its answer is merged with them
+HINT_FIELDS = ("Skills", "Years of Experience")
+
+SKILLS = (
+    "Python", "Java", "JavaScript", "TypeScript", "C++", "C#", "Go", "Golang", "Rust", "Kotlin", "Swift", "PHP", "Ruby",
+    "Scala", "SQL", "NoSQL", "PostgreSQL", "MySQL", "SQLite", "MongoDB", "Redis", "Elasticsearch", "ClickHouse",
+    "Cassandra", "Kafka", "RabbitMQ", "Spark", "Hadoop", "Airflow", "dbt", "Pandas", "NumPy", "SciPy",
+    "scikit-learn", "PyTorch", "TensorFlow", "Keras", "XGBoost", "LightGBM", "OpenCV", "NLP", "LangChain",
+    "Machine Learning", "Deep Learning", "Computer Vision", "Data Analysis", "Statistics", "Tableau", "Power BI",
+    "Excel", "Django", "Flask", "FastAPI", "Spring", "Node.js", "React", "Angular", "Vue.js", "Next.js",
+    "HTML", "CSS", "GraphQL", "REST", "gRPC", "Docker", "Kubernetes", "Terraform", "Ansible", "Jenkins",
+    "GitLab CI", "GitHub Actions", "CI/CD", "Linux", "Bash", "Git", "AWS", "GCP", "Azure", "Nginx",
+    "Prometheus", "Grafana", "Microservices", "Agile", "Scrum", "Jira", "Figma", "Selenium", "Pytest",
+)
+# Skills that are also everyday words ("go", "spring", "excel") only count with their exact
+# casing, and in CVs only inside a skills section
+AMBIGUOUS_SKILLS = frozenset((
+    "Go", "Rust", "Swift", "Ruby", "Spark", "Airflow", "Pandas", "Excel", "Spring", "Flask", "React",
+    "REST", "Bash", "Azure", "Agile", "Scrum", "Statistics",
+))
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"(?<![\w+])\+?\d[\d\s().-]{8,}\d(?!\w)")
+URL_RE = re.compile(r"\b(?:https?://|www\.)[^\s<>()\"']+|\b(?:linkedin\.com|github\.com)/[^\s<>()\"']+", re.IGNORECASE)
+
+_MONTHS = {m: i + 1 for i, m in enumerate(("jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"))}
+_DATE = r"(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+|\d{1,2}[./])?(?:19|20)\d{2}"
+OPEN_RANGE_ENDS = ("present", "current", "now", "today")
+DATE_RANGE_RE = re.compile(
+    rf"({_DATE})\s*(?:-|–|—|to|until)\s*({_DATE}|present|current|now|today)",
+    re.IGNORECASE,
+)
+EDUCATION_RE = re.compile(
+    r"universit|college|school|institute|academy|bachelor|master|bsc|msc|phd|degree"
+    r"|certif|course|training|bootcamp",
+    re.IGNORECASE,
+)
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton that finds every dictionary keyword in a single pass over the text.
+    Matching is case-insensitive unless `case_sensitive` is set, and only whole words count.
+    """
+
+    def __init__(self, keywords: Iterable[str], case_sensitive: bool = False):
+        self._case_sensitive = case_sensitive
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        self._canonical: Dict[str, str] = {}
+        for keyword in keywords:
+            self._add(keyword)
+        self._build()
+
+    def _add(self, keyword: str) -> None:
+        key = keyword if self._case_sensitive else keyword.lower()
+        self._canonical[key] = keyword
+        state = 0
+        for ch in key:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(key)
+
+    def _build(self) -> None:
+        # Breadth-first pass setting failure links and merging outputs along them
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, str]]:
+        """
+        Yields (start offset, canonical keyword) for each whole-word match.
+        """
+        lowered = text if self._case_sensitive else text.lower()
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for end, ch in enumerate(lowered, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for key in out[state]:
+                start = end - len(key)
+                if (start == 0 or not lowered[start - 1].isalnum()) and (end == len(lowered) or not lowered[end].isalnum()):
+                    yield start, self._canonical[key]
+
+
+SKILL_MATCHER = KeywordAutomaton(skill for skill in SKILLS if skill not in AMBIGUOUS_SKILLS)
+AMBIGUOUS_SKILL_MATCHER = KeywordAutomaton(sorted(AMBIGUOUS_SKILLS), case_sensitive=True)
+
+
+def _parse_date(value: str, default_month: int) -> Tuple[int, int]:
+    value = value.strip().lower()
+    year = int(re.search(r"(?:19|20)\d{2}", value).group())
+    numeric = re.match(r"(\d{1,2})[./]", value)
+    if numeric and 1 <= int(numeric.group(1)) <= 12:
+        return year, int(numeric.group(1))
+    return year, _MONTHS.get(value[:3], default_month)
+
+
+def find_date_ranges(text: str, current: Tuple[int, int]) -> List[Tuple[Tuple[int, int], Tuple[int, int], str]]:
+    """
+    Returns (start, end, line) for each date range; open-ended ranges end at `current` (year, month).
+    """
+    ranges = []
+    for line in text.splitlines():
+        for match in DATE_RANGE_RE.finditer(line):
+            start = _parse_date(match.group(1), 1)
+            end_text = match.group(2)
+            if end_text.lower() in OPEN_RANGE_ENDS:
+                end = current
+            else:
+                # A bare end year ("2016 - 2018") runs up to that year, or through it when it is the start year
+                end = _parse_date(end_text, 0)
+                if end[1] == 0:
+                    end = (end[0] - 1, 12) if end[0] > start[0] else (end[0], 12)
+            if start <= end:
+                ranges.append((start, end, line))
+    return ranges
+
+
+def years_of_experience(ranges) -> float:
+    """
+    Total years covered by the date ranges, counting overlapping jobs once.
+    """
+    months = sorted((s[0] * 12 + s[1] - 1, e[0] * 12 + e[1]) for s, e, _ in ranges)
+    total, covered_until = 0, None
+    for start, end in months:
+        if covered_until is not None and start < covered_until:
+            start = covered_until
+        if end > start:
+            total += end - start
+        covered_until = end if covered_until is None else max(covered_until, end)
+    return round(total / 12, 1)
+
+
+def find_skills(text: str) -> List[str]:
+    """
+    Dictionary skills mentioned in CV text, each once. Ambiguous skills are only taken from skills sections.
+    """
+    skills = [skill for _, skill in SKILL_MATCHER.finditer(text)]
+    for section, section_text in split_sections(text):
+        if section == "skills":
+            skills.extend(skill for _, skill in AMBIGUOUS_SKILL_MATCHER.finditer(section_text))
+    return list(dict.fromkeys(skills))
+
+
+def extract_rule_fields(text: str, current: Tuple[int, int] = None) -> dict:
+    """
+    Pulls contact details, links, date ranges and dictionary skills out of CV text with precompiled patterns.
+
+    Only fields that were actually found are returned, so the result can be merged with LLM output
+    and the missing CV_FIELDS requested from the LLM. Skills and years are HINT_FIELDS and requested anyway.
+    """
+    if current is None:
+        import datetime
+        today = datetime.date.today()
+        current = (today.year, today.month)
+
+    fields = {}
+    email = EMAIL_RE.search(text)
+    if email:
+        fields["Email"] = email.group()
+
+    skills = find_skills(text)
+    if skills:
+        fields["Skills"] = skills
+
+    # Ranges in the education section or on education and course lines are not work experience
+    work_text = "\n".join(section_text for section, section_text in split_sections(text) if section != "education")
+    work_ranges = [r for r in find_date_ranges(work_text, current) if not EDUCATION_RE.search(r[2])]
+    if work_ranges:
+        fields["Years of Experience"] = years_of_experience(work_ranges)
+        fields["Date Ranges"] = [f"{s[0]}-{s[1]:02d} to {e[0]}-{e[1]:02d}" for s, e, _ in work_ranges]
+
+    phones = [p.strip() for p in PHONE_RE.findall(text) if 10 <= sum(ch.isdigit() for ch in p) <= 15]
+    if phones:
+        fields["Phone"] = phones[0]
+
+    links = list(dict.fromkeys(URL_RE.findall(text)))
+    if links:
+        fields["Links"] = links
+    return fields
+
+
+def missing_fields(rule_fields: dict) -> List[str]:
+    """
+    The CV_FIELDS the rule-based pass could not fill; HINT_FIELDS are always included.
+    """
+    return [field for field in CV_FIELDS if field not in rule_fields or field in HINT_FIELDS]
+
+
+def merge_fields(rule_fields: dict, llm_fields: dict) -> dict:
+    """
+    Combines LLM output with the deterministic fields, which win on overlap, in CV_FIELDS order.
+    For HINT_FIELDS the LLM answer wins; skills the rules found that the LLM left out are appended.
+    """
+    merged = {**llm_fields, **rule_fields}
+    for field in HINT_FIELDS:
+        if llm_fields.get(field) not in (None, "", []):
+            merged[field] = llm_fields[field]
+    llm_skills = llm_fields.get("Skills")
+    if isinstance(llm_skills, list) and rule_fields.get("Skills"):
+        known = {str(skill).lower() for skill in llm_skills}
+        merged["Skills"] = llm_skills + [skill for skill in rule_fields["Skills"] if skill.lower() not in known]
+    ordered = {field: merged[field] for field in CV_FIELDS if field in merged}
+    ordered.update((key, value) for key, value in merged.items() if key not in ordered)
+    return ordered
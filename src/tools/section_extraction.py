@@ -0,0 +1,82 @@
+import datetime
+import hashlib
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from tools.prompt_compaction import WHITESPACE_RE, split_sections
+from tools.rule_extractor import DATE_RANGE_RE, OPEN_RANGE_ENDS
+
+# The sections each CV field is read from. Text before the first heading counts as "contact",
+# which is where the name and usually the desired position are.
+FIELD_SECTIONS = {
+    "Name": ("contact",),
+    "Email": ("contact",),
+    "Desired Position": ("contact", "summary"),
+    "Skills": ("skills",),
+    "Years of Experience": ("experience",),
+    "Education Background": ("education",),
+}
+
+
+def _normalize(text: str) -> str:
+    lines = (WHITESPACE_RE.sub(" ", line).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def section_digest(field: str, text: str, scope: str = "") -> str:
+    """
+    SHA-256 of a field's input text within `scope`; whitespace and blank lines do not change it.
+    """
+    return hashlib.sha256(f"{field}\n{scope}\n{_normalize(text)}".encode("utf-8")).hexdigest()
+
+
+def candidate_scope(raw_text: str, email: Optional[str] = None) -> str:
+    """
+    Identifies whose CV a text is: the email address when there is one, else the contact section.
+    Section answers are only reused within a scope, because the LLM may have read a field from
+    other parts of the CV than its sections, which another candidate's CV does not share.
+    """
+    if email:
+        return f"email:{email.strip().lower()}"
+    contact = next((text for section, text in split_sections(raw_text) if section == "contact"), "")
+    return f"contact:{hashlib.sha256(_normalize(contact).encode('utf-8')).hexdigest()}"
+
+
+def field_inputs(
+    raw_text: str, fields: List[str], scope: str = "", today: Optional[datetime.date] = None
+) -> Dict[str, Tuple[str, Tuple[str, ...]]]:
+    """
+    Returns (digest, section texts) per field: the sections the field is read from. A field whose
+    sections the CV does not have is read from the whole text, so any edit changes its digest.
+    Years of Experience counted up to "present" changes every month, so the month is part of its digest.
+    """
+    today = today or datetime.date.today()
+    by_section = defaultdict(list)
+    for section, text in split_sections(raw_text):
+        by_section[section].append(text)
+
+    inputs = {}
+    for field in fields:
+        parts = tuple(text for section in FIELD_SECTIONS.get(field, ()) for text in by_section.get(section, ()))
+        parts = parts or (raw_text,)
+        text = "\n".join(parts)
+        field_scope = scope
+        if field == "Years of Experience" and _is_open_ended(text):
+            field_scope = f"{scope}\n{today:%Y-%m}"
+        inputs[field] = (section_digest(field, text, field_scope), parts)
+    return inputs
+
+
+def _is_open_ended(text: str) -> bool:
+    # A date range ending in "present", "current", "now" or "today"
+    return any(match.group(2).lower() in OPEN_RANGE_ENDS for match in DATE_RANGE_RE.finditer(text))
+
+
+def changed_text(raw_text: str, inputs: Dict[str, Tuple[str, Tuple[str, ...]]], fields: List[str]) -> str:
+    """
+    The text to send to the LLM for `fields`: the sections they are read from, each once, in CV order.
+    """
+    needed = {text for field in fields for text in inputs[field][1]}
+    if raw_text in needed:
+        return raw_text
+    return "\n\n".join(text for _, text in split_sections(raw_text) if text in needed)
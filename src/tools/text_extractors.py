@@ -0,0 +1,268 @@
+import importlib.util
+import io
+import mmap
+import threading
+import time
+import zipfile
+from typing import BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple, Union
+from xml.etree import ElementTree
+
+from tools.pdf_text import PAGE_BREAK, ExtractedText, read_within_budget
+
+# A backend turns file bytes into (page count, lazy iterator over page texts)
+PageSource = Tuple[int, Iterator[str]]
+
+# File contents: bytes, or a read-only mmap of the file (see tools.mapped_file)
+FileData = Union[bytes, mmap.mmap]
+
+# Below this share of letters, digits and whitespace the text is treated as garbled
+MIN_TEXT_QUALITY = 0.6
+
+# Paragraphs grouped into one pseudo-page for formats without real pages
+PARAGRAPHS_PER_PAGE = 40
+
+
+class TextBackend:
+    """
+    A registered text extraction backend for one or more file types.
+    `paged` backends yield real pages, which are joined with PAGE_BREAK; others yield pseudo-pages.
+    """
+
+    def __init__(
+        self, name: str, suffixes: Tuple[str, ...], module: Optional[str], iter_pages: Callable, priority: int,
+        paged: bool = False,
+    ):
+        self.name = name
+        self.suffixes = suffixes
+        self.module = module
+        self.iter_pages = iter_pages
+        self.priority = priority
+        self.paged = paged
+        self.attempts = 0
+        self.rejected = 0
+        self.pages = 0
+        self.seconds = 0.0
+
+    def available(self) -> bool:
+        return self.module is None or importlib.util.find_spec(self.module) is not None
+
+    @property
+    def pages_per_sec(self) -> Optional[float]:
+        return self.pages / self.seconds if self.seconds else None
+
+    @property
+    def rejection_rate(self) -> float:
+        return self.rejected / self.attempts if self.attempts else 0.0
+
+
+BACKENDS: Dict[str, TextBackend] = {}
+_stats_lock = threading.Lock()
+
+
+def register_backend(
+    name: str, suffixes: Tuple[str, ...], module: Optional[str] = None, priority: int = 100, paged: bool = False
+):
+    """
+    Registers a page iterator as a text backend. `module` is the optional dependency it needs;
+    lower `priority` wins until speed has been measured. Set `paged` when it yields real pages.
+    """
+    def decorator(iter_pages: Callable) -> Callable:
+        BACKENDS[name] = TextBackend(name, suffixes, module, iter_pages, priority, paged)
+        return iter_pages
+    return decorator
+
+
+def supported_suffixes() -> List[str]:
+    """
+    Returns the file suffixes that at least one installed backend can read.
+    """
+    return sorted({suffix for backend in BACKENDS.values() if backend.available() for suffix in backend.suffixes})
+
+
+def select_backends(suffix: str) -> List[TextBackend]:
+    """
+    Returns the installed backends for a file type, best candidate first.
+
+    Backends that keep producing empty or garbled text sink to the bottom; among the
+    rest the fastest measured one comes first, falling back to registration priority.
+    """
+    suffix = suffix.lower()
+    candidates = [b for b in BACKENDS.values() if suffix in b.suffixes and b.available()]
+    return sorted(candidates, key=lambda b: (b.rejection_rate > 0.5, -(b.pages_per_sec or 0), b.priority))
+
+
+def text_quality(text: str) -> float:
+    """
+    Share of letters, digits and whitespace in the text, a cheap signal for broken font encodings.
+    """
+    if not text:
+        return 0.0
+    good = sum(ch.isalnum() or ch.isspace() for ch in text)
+    return good / len(text)
+
+
+def extract_text(
+    file_bytes: FileData,
+    suffix: str,
+    max_chars: Optional[int] = None,
+    max_tokens: Optional[int] = None,
+    backend: Optional[str] = None,
+) -> ExtractedText:
+    """
+    Extracts text with the best backend for the file type, falling back to the next
+    one when a backend fails or yields empty or garbled text.
+    """
+    candidates = [BACKENDS[backend]] if backend else select_backends(suffix)
+    if not candidates:
+        raise ValueError(f"Unsupported file format: {suffix}")
+
+    errors = []
+    best, best_quality = None, -1.0
+    for candidate in candidates:
+        start = time.perf_counter()
+        try:
+            pages_total, pages = candidate.iter_pages(file_bytes)
+            result = read_within_budget(
+                pages, pages_total, max_chars=max_chars, max_tokens=max_tokens,
+                separator=PAGE_BREAK if candidate.paged else "\n",
+            )
+        except Exception as e:
+            errors.append(f"{candidate.name}: {e}")
+            with _stats_lock:
+                candidate.attempts += 1
+                candidate.rejected += 1
+            continue
+        result.backend = candidate.name
+
+        quality = text_quality(result.text)
+        with _stats_lock:
+            candidate.attempts += 1
+            candidate.rejected += quality < MIN_TEXT_QUALITY
+            candidate.seconds += time.perf_counter() - start
+            candidate.pages += result.pages_read
+        if quality >= MIN_TEXT_QUALITY:
+            return result
+        if quality > best_quality:
+            best, best_quality = result, quality
+
+    if best is not None:
+        # No backend produced clean text (e.g. a scanned PDF); return the best attempt
+        return best
+    raise ValueError(f"Could not extract text ({'; '.join(errors)})")
+
+
+class _MappedStream(io.RawIOBase):
+    """
+    Read-only file object over an mmap with its own position, so several parsers can share one mapping.
+    """
+
+    def __init__(self, mapped: mmap.mmap):
+        super().__init__()
+        self._mapped = mapped
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._mapped)}[whence]
+        self._pos = max(base + offset, 0)
+        return self._pos
+
+    def read(self, size: int = -1) -> bytes:
+        end = len(self._mapped) if size is None or size < 0 else min(self._pos + size, len(self._mapped))
+        data = self._mapped[self._pos:end]
+        self._pos = max(end, self._pos)
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+
+def _as_stream(file_bytes: FileData) -> BinaryIO:
+    # Parsers read an mmap in place; BytesIO shares the bytes buffer instead of copying it
+    if isinstance(file_bytes, mmap.mmap):
+        return _MappedStream(file_bytes)
+    return io.BytesIO(file_bytes)
+
+
+def _paragraph_pages(paragraphs: List[str]) -> PageSource:
+    chunks = [paragraphs[i:i + PARAGRAPHS_PER_PAGE] for i in range(0, len(paragraphs), PARAGRAPHS_PER_PAGE)]
+    return len(chunks), ("\n".join(chunk) for chunk in chunks)
+
+
+@register_backend("pypdf2", (".pdf",), module="PyPDF2", priority=10, paged=True)
+def _pypdf2_pages(file_bytes: FileData) -> PageSource:
+    from PyPDF2 import PdfReader
+    reader = PdfReader(_as_stream(file_bytes))
+    return len(reader.pages), (page.extract_text() or "" for page in reader.pages)
+
+
+@register_backend("pypdf", (".pdf",), module="pypdf", priority=20, paged=True)
+def _pypdf_pages(file_bytes: FileData) -> PageSource:
+    from pypdf import PdfReader
+    reader = PdfReader(_as_stream(file_bytes))
+    return len(reader.pages), (page.extract_text() or "" for page in reader.pages)
+
+
+@register_backend("pdfplumber", (".pdf",), module="pdfplumber", priority=30, paged=True)
+def _pdfplumber_pages(file_bytes: FileData) -> PageSource:
+    import pdfplumber
+
+    pdf = pdfplumber.open(_as_stream(file_bytes))
+
+    def pages():
+        with pdf:
+            for page in pdf.pages:
+                yield page.extract_text() or ""
+                page.close()
+
+    return len(pdf.pages), pages()
+
+
+@register_backend("pdfminer", (".pdf",), module="pdfminer", priority=40, paged=True)
+def _pdfminer_pages(file_bytes: FileData) -> PageSource:
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+    from pdfminer.pdfpage import PDFPage
+
+    pages_total = sum(1 for _ in PDFPage.get_pages(_as_stream(file_bytes)))
+    pages = (
+        "".join(element.get_text() for element in page if isinstance(element, LTTextContainer))
+        for page in extract_pages(_as_stream(file_bytes))
+    )
+    return pages_total, pages
+
+
+@register_backend("python-docx", (".docx",), module="docx", priority=10)
+def _python_docx_pages(file_bytes: FileData) -> PageSource:
+    import docx
+    document = docx.Document(_as_stream(file_bytes))
+    return _paragraph_pages([p.text for p in document.paragraphs if p.text])
+
+
+@register_backend("docx-xml", (".docx",), priority=20)
+def _docx_xml_pages(file_bytes: FileData) -> PageSource:
+    # Dependency-free reader: pull the text runs straight out of word/document.xml
+    namespace = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+    with zipfile.ZipFile(_as_stream(file_bytes)) as archive:
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+    paragraphs = []
+    for paragraph in root.iter(f"{namespace}p"):
+        text = "".join(node.text or "" for node in paragraph.iter(f"{namespace}t"))
+        if text:
+            paragraphs.append(text)
+    return _paragraph_pages(paragraphs)
+
+
+@register_backend("text", (".txt", ".md"), priority=10)
+def _plain_text_pages(file_bytes: FileData) -> PageSource:
+    return _paragraph_pages(str(memoryview(file_bytes), "utf-8", errors="replace").splitlines())
@@ -0,0 +1,110 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from tools.extraction_cache import file_digest
+
+# Resolved next to this module, not against the working directory
+INDEX_PATH = str(Path(__file__).resolve().parent / "data" / "uploads.sqlite3")
+
+
+class UploadIndex:
+    """
+    Persistent record of uploaded CVs, so a specific upload can be addressed by id
+    without listing or stat-ing the uploads directory.
+    """
+
+    def __init__(self, path: str = INDEX_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS uploads ("
+            " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " sha256 TEXT NOT NULL,"
+            " path TEXT NOT NULL,"
+            " original_name TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_sha256 ON uploads (sha256)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_uploads_created ON uploads (created_at)")
+        self._conn.commit()
+
+    def record(self, path: str, original_name: Optional[str] = None, sha256: Optional[str] = None) -> int:
+        """
+        Registers a stored upload and returns its id. The hash is computed if not given.
+        """
+        file = Path(path)
+        if sha256 is None:
+            sha256 = file_digest(file.read_bytes())
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO uploads (sha256, path, original_name, size, created_at) VALUES (?, ?, ?, ?, ?)",
+                (sha256, str(file), original_name or file.name, file.stat().st_size, time.time()),
+            )
+            self._conn.commit()
+        return cursor.lastrowid
+
+    def get(self, upload_id: int) -> Optional[dict]:
+        """
+        Looks up one upload by id.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM uploads WHERE id = ?", (upload_id,)).fetchone()
+        return dict(row) if row else None
+
+    def latest(self) -> Optional[dict]:
+        """
+        Returns the most recent upload.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM uploads ORDER BY id DESC LIMIT 1").fetchone()
+        return dict(row) if row else None
+
+    def list(self, limit: int = 50, before_id: Optional[int] = None) -> List[dict]:
+        """
+        Returns uploads newest first. Pass the last id of a page as `before_id` to get the next page.
+        """
+        with self._lock:
+            if before_id is None:
+                rows = self._conn.execute("SELECT * FROM uploads ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+            else:
+                rows = self._conn.execute(
+                    "SELECT * FROM uploads WHERE id < ? ORDER BY id DESC LIMIT ?", (before_id, limit)
+                ).fetchall()
+        return [dict(row) for row in rows]
+
+    def find_by_hash(self, sha256: str) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM uploads WHERE sha256 = ? ORDER BY id", (sha256,)).fetchall()
+        return [dict(row) for row in rows]
+
+    def cleanup(self, older_than_seconds: float, delete_files: bool = True) -> int:
+        """
+        Forgets uploads older than the cutoff and optionally deletes their files.
+        A file still referenced by a newer upload is kept. Returns the number of uploads removed.
+        """
+        cutoff = time.time() - older_than_seconds
+        with self._lock:
+            rows = self._conn.execute("SELECT id, path FROM uploads WHERE created_at < ?", (cutoff,)).fetchall()
+            still_used = {
+                row["path"] for row in self._conn.execute(
+                    "SELECT DISTINCT path FROM uploads WHERE created_at >= ?"
+                    " AND path IN (SELECT path FROM uploads WHERE created_at < ?)",
+                    (cutoff, cutoff),
+                )
+            }
+            self._conn.execute("DELETE FROM uploads WHERE created_at < ?", (cutoff,))
+            self._conn.commit()
+
+        if delete_files:
+            for row in rows:
+                if row["path"] not in still_used:
+                    Path(row["path"]).unlink(missing_ok=True)
+        return len(rows)
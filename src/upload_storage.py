@@ -0,0 +1,92 @@
+import hashlib
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from tools.mapped_file import map_file
+
+# Resolved next to this module, not against the working directory
+STORAGE_ROOT = str(Path(__file__).resolve().parent / "data" / "cvs")
+
+
+class UploadTooLarge(ValueError):
+    """
+    Raised when an upload exceeds the store's size limit.
+    """
+
+
+@dataclass
+class StoredUpload:
+    sha256: str
+    path: Path
+    size: int
+    deduplicated: bool
+
+
+class UploadStore:
+    """
+    Content-addressed storage for uploaded CVs.
+
+    Files are streamed to disk in chunks while being hashed, rejected once they pass
+    `max_bytes`, and stored as `<root>/ab/cd/<sha256><suffix>`, so identical uploads
+    share one file and no directory grows past a few hundred entries.
+    """
+
+    def __init__(self, root: str = STORAGE_ROOT, max_bytes: int = 10 * 1024 * 1024, chunk_size: int = 256 * 1024):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self._tmp_dir = self.root / "tmp"
+        self._tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, sha256: str, suffix: str = "") -> Path:
+        return self.root / sha256[:2] / sha256[2:4] / f"{sha256}{suffix.lower()}"
+
+    def save(self, stream: BinaryIO, original_name: str) -> StoredUpload:
+        """
+        Streams an upload into the store and returns where it lives.
+        Raises UploadTooLarge (leaving nothing behind) if the stream exceeds `max_bytes`.
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, tmp_name = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                while True:
+                    chunk = stream.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise UploadTooLarge(f"Upload exceeds the {self.max_bytes} byte limit")
+                    digest.update(chunk)
+                    tmp.write(chunk)
+
+            sha256 = digest.hexdigest()
+            path = self.path_for(sha256, Path(original_name).suffix)
+            if path.exists():
+                os.unlink(tmp_name)
+                return StoredUpload(sha256, path, size, deduplicated=True)
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_name, path)
+            return StoredUpload(sha256, path, size, deduplicated=False)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    def open(self, sha256: str, suffix: str = ""):
+        """
+        Returns a context manager yielding a read-only memory map of a stored upload.
+        """
+        return map_file(self.path_for(sha256, suffix))
+
+    def find(self, sha256: str) -> Optional[Path]:
+        """
+        Finds a stored upload by hash regardless of its suffix.
+        """
+        shard = self.path_for(sha256).parent
+        return next(iter(sorted(shard.glob(f"{sha256}*"))), None) if shard.exists() else None
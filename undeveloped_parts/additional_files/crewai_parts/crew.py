@@ -1,16 +1,35 @@
 from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.tools import BaseTool
+from tools.dag import TaskGraph
 from tools.job_scraper import scrape_jobs_from_web
-from crewai_tools import FileReadTool, CSVSearchTool
+from concurrent.futures import Future
 from dotenv import load_dotenv
 from pathlib import Path
+import functools
+import logging
+import threading
 import yaml
 import os
-csv_reader = CSVSearchTool()
 
 load_dotenv()
+logger = logging.getLogger(__name__)
 BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = Path("src/match_to_proposal/data")
+
+
+def memoized(method):
+    """
+    Builds the result of a method once per crew; later calls return the same object.
+    """
+    @functools.wraps(method)
+    def wrapper(self):
+        built = self.__dict__.setdefault("_built", {})
+        if method.__name__ not in built:
+            built[method.__name__] = method(self)
+        return built[method.__name__]
+    return wrapper
+
 
 @CrewBase
 class MatchToProposalCrew:
@@ -19,47 +38,72 @@ class MatchToProposalCrew:
     agents_config = BASE_DIR / "config" / "agents.yaml"
     tasks_config = BASE_DIR / "config" / "tasks.yaml"
 
+    # Define tools, shared by the agents of this crew
+    @memoized
+    def file_reader(self):
+        from crewai_tools import FileReadTool
+
+        return FileReadTool()
+
+    @memoized
+    def csv_search(self):
+        # Loads an embedding model, so it is only created once a matcher needs it
+        from crewai_tools import CSVSearchTool
+
+        return CSVSearchTool()
+
     # Define agents
     @agent
+    @memoized
     def cv_reader(self) -> Agent:
         return Agent(
             config=self.agents_config['cv_reader'],
-            tools=[FileReadTool()],  # Tools passed as a list
+            tools=[self.file_reader()],  # Tools passed as a list
             verbose=True,
             allow_delegation=False
         )
 
     @agent
+    @memoized
     def matcher(self) -> Agent:
         return Agent(
             config=self.agents_config['matcher'],
-            tools=[FileReadTool(), CSVSearchTool()],  # Tools for the matcher
+            tools=[self.file_reader(), self.csv_search()],  # Tools for the matcher
             verbose=True,
             allow_delegation=False
         )
 
+    # Steps behind the tasks
+    def read_cv(self, cv_file):
+        cv_data = self.cv_reader().execute(cv_file)
+        return {
+            "professional_summary": cv_data.get("professional_summary", ""),
+            "technical_skills": cv_data.get("technical_skills", []),
+            "work_history": cv_data.get("work_history", []),
+            "education": cv_data.get("education", []),
+            "key_achievements": cv_data.get("key_achievements", []),
+            "desired_position": cv_data.get("desired_position", "general job"),
+            "preferred_location": cv_data.get("preferred_location", "remote"),
+        }
+
+    def scrape_jobs(self, query, location, **options):
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        output_csv = DATA_DIR / f"jobs_{query.replace(' ', '_')}_{location.replace(' ', '_')}.csv"
+        return scrape_jobs_from_web(query, location, output_file=str(output_csv), **options)
+
+    def match_cv(self, cv_file, jobs_csv):
+        return self.matcher().execute(cv_file=cv_file, jobs_csv=jobs_csv)
+
     # Define tasks
     @task
     def read_cv_task(self) -> Task:
         """
         Task to read and process a CV file.
         """
-        def execute_reader(cv_file):
-            cv_data = self.cv_reader().execute(cv_file)
-            return {
-                "professional_summary": cv_data.get("professional_summary", ""),
-                "technical_skills": cv_data.get("technical_skills", []),
-                "work_history": cv_data.get("work_history", []),
-                "education": cv_data.get("education", []),
-                "key_achievements": cv_data.get("key_achievements", []),
-                "desired_position": cv_data.get("desired_position", "general job"),
-                "preferred_location": cv_data.get("preferred_location", "remote"),
-            }
-
         return Task(
             config=self.tasks_config['read_cv_task'],
             agent=self.cv_reader(),
-            execute=execute_reader
+            execute=self.read_cv
         )
 
     @task
@@ -72,8 +116,7 @@ class MatchToProposalCrew:
                 raise ValueError("cv_data must be a dictionary.")
             query = cv_data.get("desired_position", "general job")
             location = cv_data.get("preferred_location", "remote")
-            output_csv = f"src/match_to_proposal/data/jobs_{query.replace(' ', '_')}.csv"
-            return scrape_jobs_from_web(query, location, output_file=output_csv)
+            return self.scrape_jobs(query, location)
 
         return Task(
             config=self.tasks_config.get('scrape_jobs_task'),
@@ -86,13 +129,10 @@ class MatchToProposalCrew:
         """
         Task to match CV data with scraped job opportunities.
         """
-        def execute_matcher(cv_file, jobs_csv):
-            return self.matcher().execute(cv_file=cv_file, jobs_csv=jobs_csv)
-
         return Task(
             config=self.tasks_config['match_cv_task'],
             agent=self.matcher(),
-            execute=execute_matcher
+            execute=self.match_cv
         )
 
     # Define the crew
@@ -111,3 +151,60 @@ class MatchToProposalCrew:
             process=Process.sequential,  # Tasks are executed sequentially
             verbose=True
         )
+
+    def run(self, cv_file, desired_position=None, preferred_location=None):
+        """
+        Reads the CV, scrapes jobs and matches them, overlapping the steps that do not
+        depend on each other.
+
+        With a `preferred_location` (and optionally a `desired_position`) known up front,
+        e.g. from the user's profile, jobs for it are prefetched while the CV is read. They
+        are used when the CV asks for the same search; otherwise the prefetch is stopped and
+        the CV's search is scraped right away, without waiting for it. If reading the CV
+        fails, the prefetch is stopped too. Per-step timings of the run are kept in
+        `self.timings` and logged.
+        """
+        graph = TaskGraph()
+        prefetch, prefetched, cancel = None, Future(), threading.Event()
+
+        def read_cv():
+            try:
+                return self.read_cv(cv_file)
+            except Exception:
+                # The graph waits for running steps before raising, so stop the prefetch now
+                cancel.set()
+                raise
+
+        graph.add("read_cv", read_cv)
+        if preferred_location:
+            prefetch = (desired_position or "general job", preferred_location)
+
+            def prefetch_jobs():
+                # The result is handed over through `prefetched`, so scraping never has to wait for this step
+                if not prefetched.set_running_or_notify_cancel():
+                    return
+                try:
+                    prefetched.set_result(self.scrape_jobs(*prefetch, stop_event=cancel))
+                except Exception as e:
+                    prefetched.set_exception(e)
+
+            graph.add("prefetch_jobs", prefetch_jobs)
+
+        def scrape(read_cv):
+            search = (read_cv["desired_position"], read_cv["preferred_location"])
+            if search == prefetch:
+                return prefetched.result()
+            cancel.set()
+            return self.scrape_jobs(*search)
+
+        graph.add("scrape_jobs", scrape, after=["read_cv"])
+        graph.add("match_cv", lambda scrape_jobs: self.match_cv(cv_file, scrape_jobs), after=["scrape_jobs"])
+        try:
+            results = graph.run()
+        finally:
+            # However the run ends, nothing is left scraping in the background
+            cancel.set()
+            prefetched.cancel()
+            self.timings = graph.timings
+        logger.info("Crew run timings:\n%s", graph.report())
+        return results["match_cv"]
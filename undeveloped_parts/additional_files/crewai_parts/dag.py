@@ -0,0 +1,91 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class TaskGraph:
+    """
+    Runs named steps as soon as the steps they depend on have finished, so independent
+    steps overlap. Each step is called with the results of its dependencies as keyword
+    arguments, and every run records when each step started and finished.
+    """
+
+    def __init__(self, max_workers=4):
+        self.max_workers = max_workers
+        self.steps = {}
+        self.timings = []
+
+    def add(self, name, func, after=()):
+        """
+        Adds a step. Dependencies must be added first, which also keeps the graph acyclic.
+        """
+        if name in self.steps:
+            raise ValueError(f"Step {name!r} is already defined")
+        missing = [dependency for dependency in after if dependency not in self.steps]
+        if missing:
+            raise ValueError(f"Step {name!r} depends on unknown steps: {', '.join(missing)}")
+        self.steps[name] = (func, tuple(after))
+        return name
+
+    def run(self):
+        """
+        Runs every step and returns their results by name. If a step raises, steps that
+        have not started yet are skipped and the error is raised once running steps finish.
+        """
+        results = {}
+        pending = dict(self.steps)
+        running = {}
+        self.timings = []
+        error = None
+        started = time.perf_counter()
+
+        def timed(name, func, kwargs):
+            start = time.perf_counter()
+            try:
+                return func(**kwargs)
+            finally:
+                end = time.perf_counter()
+                self.timings.append({
+                    "step": name,
+                    "start": start - started,
+                    "end": end - started,
+                    "seconds": end - start,
+                })
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                if error is None:
+                    for name, (func, after) in list(pending.items()):
+                        if all(dependency in results for dependency in after):
+                            kwargs = {dependency: results[dependency] for dependency in after}
+                            running[pool.submit(timed, name, func, kwargs)] = name
+                            del pending[name]
+                else:
+                    pending.clear()
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        error = error or e
+
+        self.timings.sort(key=lambda timing: timing["start"])
+        if error is not None:
+            raise error
+        return results
+
+    def report(self):
+        """
+        A table of the last run: when each step started and how long it took, plus the
+        wall time against the time the steps would take back to back.
+        """
+        lines = [f"{'step':<16}{'start':>9}{'seconds':>9}"]
+        for timing in self.timings:
+            lines.append(f"{timing['step']:<16}{timing['start']:>9.2f}{timing['seconds']:>9.2f}")
+        if self.timings:
+            wall = max(timing["end"] for timing in self.timings)
+            serial = sum(timing["seconds"] for timing in self.timings)
+            lines.append(f"wall {wall:.2f}s, sequential {serial:.2f}s")
+        return "\n".join(lines)
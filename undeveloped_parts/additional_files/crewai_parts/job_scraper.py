@@ -1,69 +1,244 @@
-import requests
-from bs4 import BeautifulSoup
 import csv
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from itertools import product
+from urllib.parse import urlsplit
+
+import requests
+from lxml import html as lxml_html
+from lxml.cssselect import CSSSelector
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+SEARCH_URL = "https://www.indeed.com/jobs"
+HEADERS = {"User-Agent": "JobScraper/1.0"}
+RESULTS_PER_PAGE = 10
+FIELDS = ["title", "company", "location", "date_posted", "job_id"]
+
+# Selectors are compiled to XPath once, not on every page
+JOB_CARD = CSSSelector("div.job_seen_beacon")
+TITLE = CSSSelector("h2.jobTitle")
+COMPANY = CSSSelector("span.companyName")
+LOCATION = CSSSelector("div.companyLocation")
+DATE_POSTED = CSSSelector("span.date")
+JOB_KEY = CSSSelector("[data-jk]")
+DAYS_AGO_RE = re.compile(r"(\d+)\+?\s*day")
+
+
+def make_session(pool_size=8, retries=3):
+    """
+    A keep-alive session whose connection pool fits `pool_size` concurrent requests.
+    Rate-limit and server errors are retried with exponential backoff.
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class HostLimiter:
+    """
+    Keeps scraping polite: at most `per_host` requests in flight to one host, started
+    at least `interval` seconds apart.
+    """
+
+    def __init__(self, per_host=2, interval=1.0):
+        self.per_host = per_host
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._slots = {}
+        self._next_start = {}
+
+    @contextmanager
+    def slot(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            slots = self._slots.setdefault(host, threading.BoundedSemaphore(self.per_host))
+        with slots:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start.get(host, now))
+                self._next_start[host] = start + self.interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+def parse_date(text, today=None):
+    """
+    Converts a relative posting date ("3 days ago", "30+ days ago", "Just posted") to YYYY-MM-DD.
+    """
+    today = today or datetime.now()
+    match = DAYS_AGO_RE.search(text)
+    if match:
+        return (today - timedelta(days=int(match.group(1)))).strftime("%Y-%m-%d")
+    return today.strftime("%Y-%m-%d")  # Default to today if not clear
+
+
+def _text(selector, element):
+    found = selector(element)
+    return found[0].text_content().strip() if found else "N/A"
+
+
+def parse_job_cards(page_html, today=None):
+    """
+    Yields one job dict per job card of an Indeed results page.
+    """
+    if not page_html.strip():
+        return
+    document = lxml_html.fromstring(page_html)
+    for card in JOB_CARD(document):
+        date_tags = DATE_POSTED(card)
+        keyed = JOB_KEY(card)
+        yield {
+            "title": _text(TITLE, card),
+            "company": _text(COMPANY, card),
+            "location": _text(LOCATION, card),
+            "date_posted": parse_date(date_tags[0].text_content().strip(), today) if date_tags else "N/A",
+            "job_id": keyed[0].get("data-jk") if keyed else "",
+        }
+
+
+def job_key(job):
+    """
+    Identifies a posting across result pages: Indeed's job key, or its title, company and location.
+    """
+    return job["job_id"] or (job["title"].lower(), job["company"].lower(), job["location"].lower())
+
+
+class RowWriter:
+    """
+    Writes jobs to a CSV or, for a .jsonl path, a JSON lines file as they arrive.
+    """
+
+    def __init__(self, path, fields=FIELDS):
+        self.path = path
+        self.jsonl = str(path).endswith((".jsonl", ".ndjson"))
+        self._file = open(path, "w", newline="", encoding="utf-8")
+        self._csv = None
+        if not self.jsonl:
+            self._csv = csv.DictWriter(self._file, fieldnames=fields)
+            self._csv.writeheader()
+
+    def write(self, jobs):
+        for job in jobs:
+            if self.jsonl:
+                self._file.write(json.dumps(job, ensure_ascii=False) + "\n")
+            else:
+                self._csv.writerow(job)
+        # Rows are on disk as soon as their page is parsed
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
 
 
-def scrape_jobs_from_web(query, location, output_file="jobs.csv"):
+def scrape_jobs(
+    queries,
+    locations,
+    output_file="jobs.csv",
+    pages=1,
+    concurrency=8,
+    per_host=2,
+    interval=1.0,
+    session=None,
+    base_url=SEARCH_URL,
+    stop_event=None,
+):
+    """
+    Scrapes every query x location x page combination and streams unique jobs to `output_file`.
+
+    Pages are fetched by `concurrency` threads over one pooled session, with at most
+    `per_host` requests in flight per host, `interval` seconds apart. Each page is parsed
+    in the thread that fetched it and its new jobs are written as soon as it completes;
+    postings seen on an earlier page are skipped. A failing page is counted, not fatal.
+    Once `stop_event` (a threading.Event) is set, pages not yet requested are skipped.
+    Returns counts of pages, jobs written, duplicates, failed and cancelled pages, and the
+    error of the last failed page (None if no page failed).
+    """
+    session = session or make_session(pool_size=concurrency)
+    limiter = HostLimiter(per_host=per_host, interval=interval)
+    today = datetime.now()
+
+    def fetch(query, location, page):
+        params = {"q": query, "l": location, "fromage": 7, "start": page * RESULTS_PER_PAGE}  # Filter by last 7 days
+        with limiter.slot(base_url):
+            if stop_event is not None and stop_event.is_set():
+                return None
+            response = session.get(base_url, params=params, timeout=30)
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch jobs. HTTP Status: {response.status_code} ({response.url})")
+        return list(parse_job_cards(response.text, today))
+
+    stats = {"pages": 0, "jobs": 0, "duplicates": 0, "failed_pages": 0, "cancelled_pages": 0, "last_error": None}
+    seen = set()
+    with RowWriter(output_file) as writer, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {pool.submit(fetch, *combination): combination for combination in product(queries, locations, range(pages))}
+        for future in as_completed(futures):
+            try:
+                jobs = future.result()
+            except Exception as e:
+                print(f"Skipping {futures[future]}: {e}")
+                stats["failed_pages"] += 1
+                stats["last_error"] = str(e)
+                continue
+            if jobs is None:
+                stats["cancelled_pages"] += 1
+                continue
+            stats["pages"] += 1
+            fresh = []
+            for job in jobs:
+                key = job_key(job)
+                if key in seen:
+                    stats["duplicates"] += 1
+                    continue
+                seen.add(key)
+                fresh.append(job)
+            writer.write(fresh)
+            stats["jobs"] += len(fresh)
+    return stats
+
+
+def scrape_jobs_from_web(query, location, output_file="jobs.csv", pages=1, **options):
     """
     Scrape job postings from Indeed based on query and location.
-    Save results as a CSV file.
+    Save results as a CSV file (or JSON lines, for a .jsonl output path).
 
     Args:
         query (str): Job title or keywords to search for.
         location (str): Desired job location.
         output_file (str): Path to save the job postings CSV.
+        pages (int): Number of result pages to fetch.
+        **options: Concurrency and politeness settings passed to `scrape_jobs`: `concurrency`
+            (default 8 threads), `per_host` (default 2 requests in flight per host) and
+            `interval` (default 1.0 s between request starts to one host, so about one
+            request per second), plus `session`, `base_url` and `stop_event`.
 
     Returns:
         str: Path to the output CSV file.
     """
-    url = f"https://www.indeed.com/jobs?q={query}&l={location}&fromage=7"  # Filter by last 7 days
-    response = requests.get(url)
+    stats = scrape_jobs([query], [location], output_file=output_file, pages=pages, **options)
+    if stats["failed_pages"] and not stats["pages"]:
+        raise Exception(f"Failed to fetch jobs for {query!r} in {location!r}: {stats['last_error']}")
 
-    if response.status_code != 200:
-        raise Exception(f"Failed to fetch jobs. HTTP Status: {response.status_code}")
-
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    jobs = []
-    for job_card in soup.find_all('div', class_='job_seen_beacon'):
-        # Extract job title
-        title_tag = job_card.find('h2', {'class': 'jobTitle'})
-        title = title_tag.text.strip() if title_tag else "N/A"
-
-        # Extract company name
-        company_tag = job_card.find('span', {'class': 'companyName'})
-        company = company_tag.text.strip() if company_tag else "N/A"
-
-        # Extract location
-        location_tag = job_card.find('div', {'class': 'companyLocation'})
-        job_location = location_tag.text.strip() if location_tag else "N/A"
-
-        # Extract posting date (handle relative dates like "2 days ago")
-        date_posted_tag = job_card.find('span', {'class': 'date'})
-        if date_posted_tag:
-            date_text = date_posted_tag.text.strip()
-            if "day" in date_text:
-                days_ago = int(date_text.split()[0])
-                date_posted = (datetime.now() - timedelta(days=days_ago)).strftime("%Y-%m-%d")
-            else:
-                date_posted = datetime.now().strftime("%Y-%m-%d")  # Default to today if not clear
-        else:
-            date_posted = "N/A"
-
-        jobs.append({
-            'title': title,
-            'company': company,
-            'location': job_location,
-            'date_posted': date_posted
-        })
-
-    # Save jobs to CSV
-    with open(output_file, 'w', newline='', encoding='utf-8') as file:
-        fieldnames = ['title', 'company', 'location', 'date_posted']
-        writer = csv.DictWriter(file, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(jobs)
-
-    print(f"Saved {len(jobs)} jobs to {output_file}")
+    print(f"Saved {stats['jobs']} jobs to {output_file}")
     return output_file
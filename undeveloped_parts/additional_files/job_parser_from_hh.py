@@ -1,65 +1,474 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # HeadHunter API Constants
 BASE_URL = "https://api.hh.ru/vacancies"
 HEADERS = {"User-Agent": "JobParser/1.0"}
 
+logger = logging.getLogger(__name__)
+
+# hh.ru serves at most 100 vacancies per page and 2000 per search
+MAX_PER_PAGE = 100
+MAX_SEARCH_DEPTH = 2000
+# Searches are split into publication-time windows that stay under MAX_SEARCH_DEPTH;
+# bounds carry their UTC offset, as published_at does ("2024-06-01T12:00:00+0300")
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S%z"
+MIN_WINDOW = timedelta(minutes=1)
+# How far back the first run searches; hh.ru lists vacancies for about a month
+HISTORY_DAYS = 30
+
+# Resolved next to this script, not against the working directory
+DATA_DIR = Path(__file__).resolve().parent / "data"
+STORE_PATH = str(DATA_DIR / "vacancies.sqlite3")
+CHECKPOINT_PATH = str(DATA_DIR / "vacancies.checkpoint.json")
+# The job matching backend; ingested vacancies are upserted into its jobs table and matcher
+JOBS_API_URL = os.getenv("JOBS_API_URL", "http://localhost:5000")
+
+
+def make_session(pool_size=8, retries=3):
+    """
+    A keep-alive session whose connection pool fits `pool_size` concurrent requests.
+    Rate-limit and server errors are retried with exponential backoff.
+    """
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# Shared by fetch_vacancies calls so repeated requests reuse the connection
+_session = None
+
 
 # Function to fetch vacancies
-def fetch_vacancies(area, per_page=10):
+def fetch_vacancies(area, per_page=10, page=0, session=None, base_url=BASE_URL):
     """
-    Fetch 10 vacancies from the specified area.
+    Fetch one page of vacancies from the specified area.
     """
+    global _session
+    if session is None:
+        _session = _session or make_session()
+        session = _session
     params = {
         "area": area,
         "per_page": per_page,
-        "page": 0
+        "page": page
     }
-    response = requests.get(BASE_URL, headers=HEADERS, params=params)
+    response = session.get(base_url, params=params)
     if response.status_code == 200:
         return response.json()["items"]
     else:
         raise Exception(f"Error {response.status_code}: {response.text}")
 
 
+def parse_vacancy(vacancy):
+    """
+    Extract the essential fields of one vacancy.
+    """
+    return {
+        "id": vacancy["id"],
+        "title": vacancy["name"],
+        "company": vacancy["employer"]["name"] if "employer" in vacancy else "Unknown",
+        "location": vacancy["area"]["name"] if "area" in vacancy else "Unknown",
+        "published_at": vacancy.get("published_at", "Unknown"),
+        "description": (vacancy.get("snippet") or {}).get("responsibility") or "No description provided",
+        # Job description
+        "experience": vacancy.get("experience", {}).get("name", "Not specified"),
+        "skills": ", ".join(skill["name"] for skill in vacancy.get("key_skills", []))
+    }
+
+
 # Parse vacancies
 def parse_vacancies(vacancies):
     """
     Parse the fetched vacancies to extract essential fields.
     """
-    parsed = []
-    for vacancy in vacancies:
-        parsed.append({
-            "id": vacancy["id"],
-            "title": vacancy["name"],
-            "company": vacancy["employer"]["name"] if "employer" in vacancy else "Unknown",
-            "location": vacancy["area"]["name"] if "area" in vacancy else "Unknown",
-            "published_at": vacancy.get("published_at", "Unknown"),
-            "description": vacancy.get("snippet", {}).get("responsibility", "No description provided"),
-            # Job description
-            "experience": vacancy.get("experience", {}).get("name", "Not specified"),
-            "skills": ", ".join(skill["name"] for skill in vacancy.get("key_skills", []))
-        })
-    return parsed
+    return [parse_vacancy(vacancy) for vacancy in vacancies]
+
+
+class RateLimiter:
+    """
+    Token bucket shared by the fetch threads: at most `rate` requests per second, with bursts of `burst`.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class VacancyStore:
+    """
+    SQLite table of parsed vacancies, written in bulk upserts.
+    """
+
+    COLUMNS = ("id", "title", "company", "location", "published_at", "description", "experience", "skills")
+
+    def __init__(self, path=STORE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS vacancies ("
+            " id TEXT PRIMARY KEY, title TEXT, company TEXT, location TEXT, published_at TEXT,"
+            " description TEXT, experience TEXT, skills TEXT, fetched_at REAL)"
+        )
+        self._conn.commit()
+
+    def known(self, ids):
+        """
+        Maps the given ids that are already stored to their published_at.
+        """
+        ids = list(ids)
+        known = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(ids), 900):
+            chunk = ids[start:start + 900]
+            rows = self._conn.execute(
+                f"SELECT id, published_at FROM vacancies WHERE id IN ({','.join('?' * len(chunk))})", chunk
+            )
+            known.update(rows)
+        return known
+
+    def upsert_many(self, vacancies):
+        """
+        Inserts or replaces vacancies in one transaction; returns how many were written.
+        """
+        now = time.time()
+        rows = [tuple(vacancy[column] for column in self.COLUMNS) + (now,) for vacancy in vacancies]
+        updates = ", ".join(f"{column} = excluded.{column}" for column in self.COLUMNS[1:])
+        with self._conn:
+            self._conn.executemany(
+                f"INSERT INTO vacancies ({', '.join(self.COLUMNS)}, fetched_at) VALUES ({', '.join('?' * (len(self.COLUMNS) + 1))})"
+                f" ON CONFLICT(id) DO UPDATE SET {updates}, fetched_at = excluded.fetched_at",
+                rows,
+            )
+        return len(rows)
+
+    def count(self):
+        return self._conn.execute("SELECT COUNT(*) FROM vacancies").fetchone()[0]
+
+
+def job_payload(vacancy):
+    """
+    The /add_jobs row of a parsed vacancy, keyed by its hh.ru id so a republished vacancy updates its job.
+    """
+    description = vacancy["description"]
+    if vacancy["skills"]:
+        description = f"{description}\nSkills: {vacancy['skills']}"
+    return {
+        "external_id": f"hh:{vacancy['id']}",
+        "title": vacancy["title"],
+        "description": description,
+        "company": vacancy["company"],
+        "location": vacancy["location"],
+    }
+
+
+class JobsApi:
+    """
+    Sends vacancies to the backend's POST /add_jobs as NDJSON. The backend upserts them into
+    its jobs table and indexes them for matching. `token` is a JWT from the backend's /login.
+    """
+
+    def __init__(self, token, base_url=JOBS_API_URL, session=None):
+        self.url = f"{base_url.rstrip('/')}/add_jobs"
+        self._session = session or requests.Session()
+        self._session.headers.update({"Authorization": f"Bearer {token}"})
+
+    def upsert_many(self, vacancies):
+        """
+        Upserts vacancies as jobs; returns the backend's inserted and updated counts.
+        """
+        if not vacancies:
+            return {"inserted": 0, "updated": 0}
+        body = "\n".join(json.dumps(job_payload(vacancy), ensure_ascii=False) for vacancy in vacancies)
+        response = self._session.post(
+            self.url, data=body.encode("utf-8"), headers={"Content-Type": "application/x-ndjson"}, timeout=120
+        )
+        response.raise_for_status()
+        return response.json()
+
+
+class Checkpoint:
+    """
+    Progress of an ingestion run saved as JSON, so an interrupted run resumes where it stopped.
+
+    `until` is the end of the current run's search and `next_from` the start of the first
+    window not yet ingested; `window` and `pages_done` are the window in progress and its
+    finished pages. `date_from` is the newest published_at of the last completed run, from
+    which the next run starts.
+    """
+
+    def __init__(self, path=CHECKPOINT_PATH):
+        self.path = Path(path)
+        self.state = json.loads(self.path.read_text()) if self.path.exists() else {}
+
+    def run_state(self, params):
+        """
+        The saved progress for a search, reset if the search parameters changed.
+        """
+        if self.state.get("params") != params:
+            self.state = {"params": params, "date_from": None}
+        return self.state
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(self.state))
+        os.replace(tmp, self.path)
+
+
+def parse_time(value):
+    """
+    The timezone-aware time of a published_at ("2024-06-01T12:00:00+0300") or window bound.
+    A value without a UTC offset is taken as local time.
+    """
+    try:
+        return datetime.strptime(value, DATE_FORMAT)
+    except ValueError:
+        return datetime.strptime(value[:19], DATE_FORMAT[:-2]).astimezone()
+
+
+def _aware(moment):
+    # Naive datetimes passed as `since`/`until` are local time
+    return moment if moment.tzinfo else moment.astimezone()
+
+
+def ingest_vacancies(
+    area,
+    text=None,
+    store=None,
+    jobs=None,
+    checkpoint=None,
+    session=None,
+    base_url=BASE_URL,
+    per_page=MAX_PER_PAGE,
+    concurrency=8,
+    rate=10.0,
+    batch_size=500,
+    since=None,
+    until=None,
+):
+    """
+    Pages through every vacancy of a search and upserts new or changed ones into the store and,
+    if `jobs` (a JobsApi) is given, into the backend's jobs table and matcher.
+
+    hh.ru returns at most MAX_SEARCH_DEPTH results per search, so the search is split into
+    publication-time windows (date_from/date_to) that each fit under that cap, oldest first.
+    A window still over the cap at MIN_WINDOW is logged, and only its first results are read.
+    Pages are fetched over one keep-alive session by `concurrency` threads, throttled to
+    `rate` requests per second. Vacancies whose id and published_at are already stored are
+    skipped. Window bounds and published_at are compared as timezone-aware times. Finished windows and pages are checkpointed with the newest published_at seen,
+    so a rerun after a crash resumes; a completed run records the newest published_at and
+    the next run only asks for newer vacancies. The first run covers `since` to `until`
+    (datetimes, local time if naive; by default the last HISTORY_DAYS days up to now).
+    Returns counts of fetched pages, windows, windows over the cap, new, updated and skipped
+    vacancies, and the jobs inserted and updated in the backend.
+    """
+    store = store or VacancyStore()
+    checkpoint = checkpoint or Checkpoint()
+    session = session or make_session(pool_size=concurrency)
+    limiter = RateLimiter(rate, burst=concurrency)
+    params = {"area": area, "text": text, "per_page": per_page}
+    state = checkpoint.run_state(params)
+
+    if not state.get("until"):
+        # A new run; an interrupted one keeps its bounds and progress
+        run_until = _aware(until) if until else datetime.now().astimezone()
+        if state.get("date_from"):
+            run_from = parse_time(state["date_from"])
+        else:
+            run_from = _aware(since) if since else run_until - timedelta(days=HISTORY_DAYS)
+        state.update(
+            until=run_until.strftime(DATE_FORMAT), next_from=run_from.strftime(DATE_FORMAT),
+            window=None, pages_done=[], newest=state.get("date_from"),
+        )
+        checkpoint.save()
+    run_until = parse_time(state["until"])
+
+    def fetch(window, page):
+        limiter.acquire()
+        query = {
+            "area": area, "per_page": per_page, "page": page, "order_by": "publication_time",
+            "date_from": window[0], "date_to": window[1],
+        }
+        if text:
+            query["text"] = text
+        response = session.get(base_url, params=query, timeout=30)
+        response.raise_for_status()
+        return page, response.json()
+
+    stats = {
+        "pages": 0, "windows": 0, "capped_windows": 0, "new": 0, "updated": 0, "skipped": 0,
+        "jobs_inserted": 0, "jobs_updated": 0,
+    }
+    pending, pending_pages = [], []
+    newest = state.get("newest")
+
+    def flush():
+        nonlocal pending, pending_pages
+        known = store.known(vacancy["id"] for vacancy in pending)
+        # Keep the last copy of a vacancy seen on two pages, and only what is new or republished
+        latest = {vacancy["id"]: vacancy for vacancy in pending}
+        changed = [v for v in latest.values() if known.get(v["id"]) != v["published_at"]]
+        stats["skipped"] += len(pending) - len(changed)
+        stats["updated"] += sum(v["id"] in known for v in changed)
+        stats["new"] += sum(v["id"] not in known for v in changed)
+        if jobs is not None:
+            # The backend first: a vacancy only counts as known once it has reached the jobs table
+            result = jobs.upsert_many(changed)
+            stats["jobs_inserted"] += result["inserted"]
+            stats["jobs_updated"] += result["updated"]
+        store.upsert_many(changed)
+        # Pages count as done only once their vacancies are stored
+        state["pages_done"].extend(pending_pages)
+        state["newest"] = newest
+        checkpoint.save()
+        pending, pending_pages = [], []
+
+    def handle(page, payload):
+        nonlocal newest
+        vacancies = parse_vacancies(payload["items"])
+        for vacancy in vacancies:
+            if vacancy["published_at"] == "Unknown":
+                continue
+            if newest is None or parse_time(vacancy["published_at"]) > parse_time(newest):
+                newest = vacancy["published_at"]
+        pending.extend(vacancies)
+        pending_pages.append(page)
+        stats["pages"] += 1
+        if len(pending) >= batch_size:
+            flush()
+
+    def next_window(start, width):
+        # The widest window from `start` that fits under the cap, trying twice the last width first
+        end = run_until if width is None else min(run_until, start + 2 * width)
+        while True:
+            window = (start.strftime(DATE_FORMAT), end.strftime(DATE_FORMAT))
+            _, first = fetch(window, 0)
+            if first["found"] <= MAX_SEARCH_DEPTH or end - start <= MIN_WINDOW:
+                break
+            end = start + timedelta(seconds=(end - start).total_seconds() // 2)
+        if first["found"] > MAX_SEARCH_DEPTH:
+            stats["capped_windows"] += 1
+            logger.warning(
+                "%d vacancies published from %s to %s; only the first %d can be fetched",
+                first["found"], window[0], window[1], MAX_SEARCH_DEPTH,
+            )
+        return window, first
+
+    width = None
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while parse_time(state["next_from"]) <= run_until:
+            if state["window"]:
+                # Resume the window that was in progress
+                window = tuple(state["window"])
+                _, first = fetch(window, 0)
+            else:
+                window, first = next_window(parse_time(state["next_from"]), width)
+                state.update(window=list(window), pages_done=[])
+            done = set(state["pages_done"])
+            if 0 not in done:
+                handle(0, first)
+            # The API never returns results past MAX_SEARCH_DEPTH, whatever "pages" says
+            pages = min(first["pages"], MAX_SEARCH_DEPTH // per_page)
+            remaining = [page for page in range(1, pages) if page not in done]
+            for page, payload in pool.map(lambda page: fetch(window, page), remaining):
+                handle(page, payload)
+            flush()
+
+            # Both bounds are inclusive, so the next window starts a second later
+            start, end = parse_time(window[0]), parse_time(window[1])
+            width = max(end - start, MIN_WINDOW)
+            state.update(next_from=(end + timedelta(seconds=1)).strftime(DATE_FORMAT), window=None, pages_done=[])
+            checkpoint.save()
+            stats["windows"] += 1
+
+    # The run is complete: the next one starts from the newest vacancy seen
+    checkpoint.state = {"params": params, "date_from": newest}
+    checkpoint.save()
+    return stats
 
 
 # Main
 if __name__ == "__main__":
-    # CIS region area code (e.g., Russia: 113)
-    AREA_CODE = 113
-
-    print("Fetching 10 vacancies...")
-    vacancies = fetch_vacancies(area=AREA_CODE, per_page=10)
-    parsed_vacancies = parse_vacancies(vacancies)
-
-    # Print parsed vacancies
-    for vacancy in parsed_vacancies:
-        print(f"ID: {vacancy['id']}")
-        print(f"Title: {vacancy['title']}")
-        print(f"Company: {vacancy['company']}")
-        print(f"Location: {vacancy['location']}")
-        print(f"Published At: {vacancy['published_at']}")
-        print(f"Description: {vacancy['description']}")
-        print(f"Experience: {vacancy['experience']}")
-        print(f"Skills: {vacancy['skills']}")
-        print("-" * 50)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Fetch hh.ru vacancies.")
+    parser.add_argument("--area", type=int, default=113, help="hh.ru area code (Russia: 113)")
+    parser.add_argument("--text", help="search query")
+    parser.add_argument("--all", action="store_true", help="ingest every page into the vacancy store")
+    parser.add_argument("--store", default=STORE_PATH)
+    parser.add_argument("--jobs-api", default=JOBS_API_URL, help="job matching backend to upsert vacancies into")
+    parser.add_argument("--token", default=os.getenv("JOBS_API_TOKEN"), help="backend JWT (default: $JOBS_API_TOKEN)")
+    parser.add_argument("--store-only", action="store_true", help="only fill the vacancy store, not the backend")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=10.0, help="max requests per second")
+    args = parser.parse_args()
+
+    if args.all:
+        logging.basicConfig(level=logging.INFO)
+        if not args.store_only and not args.token:
+            parser.error("--token (or JOBS_API_TOKEN) is required to upsert into the backend; use --store-only to skip it")
+        stats = ingest_vacancies(
+            args.area,
+            text=args.text,
+            store=VacancyStore(args.store),
+            jobs=None if args.store_only else JobsApi(args.token, args.jobs_api),
+            checkpoint=Checkpoint(args.checkpoint),
+            base_url=args.base_url,
+            concurrency=args.concurrency,
+            rate=args.rate,
+        )
+        print(f"Pages: {stats['pages']} in {stats['windows']} windows ({stats['capped_windows']} over the cap), new: {stats['new']}, updated: {stats['updated']}, skipped: {stats['skipped']}, jobs inserted: {stats['jobs_inserted']}, jobs updated: {stats['jobs_updated']}")
+    else:
+        print("Fetching 10 vacancies...")
+        vacancies = fetch_vacancies(area=args.area, per_page=10, base_url=args.base_url)
+        parsed_vacancies = parse_vacancies(vacancies)
+
+        # Print parsed vacancies
+        for vacancy in parsed_vacancies:
+            print(f"ID: {vacancy['id']}")
+            print(f"Title: {vacancy['title']}")
+            print(f"Company: {vacancy['company']}")
+            print(f"Location: {vacancy['location']}")
+            print(f"Published At: {vacancy['published_at']}")
+            print(f"Description: {vacancy['description']}")
+            print(f"Experience: {vacancy['experience']}")
+            print(f"Skills: {vacancy['skills']}")
+            print("-" * 50)
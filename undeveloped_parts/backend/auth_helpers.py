@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+
+
+class HasherBusy(Exception):
+    """
+    Raised when every hashing slot stays taken for longer than the hasher's timeout.
+    """
+
+
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+
+def _check_password(password, password_hash):
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+
+class PasswordHasher:
+    """
+    Hashes and verifies bcrypt passwords in a pool of worker processes, so a burst of
+    logins does not tie up the web workers with CPU-bound work.
+
+    At most `max_pending` calls are queued or running; past that a call waits up to
+    `timeout` seconds for a slot and then raises HasherBusy. `workers=0` hashes on the
+    calling thread. Hashes are compatible with Flask-Bcrypt's.
+    """
+
+    def __init__(self, rounds=12, workers=None, max_pending=None, timeout=10.0):
+        self.rounds = rounds
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_pending or max(self.workers, 1) * 4)
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def hash(self, password):
+        return self._run(_hash_password, password, self.rounds)
+
+    def check(self, password, password_hash):
+        return self._run(_check_password, password, password_hash)
+
+    def _run(self, func, *args):
+        if not self.workers:
+            return func(*args)
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HasherBusy('Password hashing is overloaded')
+        try:
+            return self._executor().submit(func, *args).result()
+        finally:
+            self._slots.release()
+
+    def start(self):
+        """
+        Starts the worker processes. Call it at startup, before the server starts its threads:
+        forked workers inherit the app without importing it again, and forking is only safe
+        while the process is single-threaded.
+        """
+        if self.workers:
+            self._executor().submit(int).result()
+        return self
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                fork = 'fork' in multiprocessing.get_all_start_methods()
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('fork' if fork else None))
+            return self._pool
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+class TTLCache:
+    """
+    Thread-safe mapping whose entries expire `ttl` seconds after they were set;
+    the least recently used entry is dropped past `maxsize`. `ttl=0` disables caching.
+    """
+
+    def __init__(self, ttl=60.0, maxsize=10000):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._items[key]
+                return None
+            self._items.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._items.pop(key, None)
@@ -1,24 +1,67 @@
 from flask import Flask, request, jsonify
 from flask_sqlalchemy import SQLAlchemy
-from flask_bcrypt import Bcrypt
+from sqlalchemy import inspect, insert, select, text, update
+from sqlalchemy.exc import IntegrityError
 from flask_jwt_extended import JWTManager, create_access_token, jwt_required, get_jwt_identity
 from werkzeug.utils import secure_filename
+from collections import namedtuple
+from datetime import datetime
+import json
 import os
+import sys
+
+from auth_helpers import HasherBusy, PasswordHasher, TTLCache
+
+# The extraction job queue lives in the Streamlit app's src/ tree
+sys.path.append(os.path.abspath(os.getenv(
+    'CV_EXTRACTOR_SRC', os.path.join(os.path.dirname(__file__), '..', '..', 'src')
+)))
+try:
+    from job_queue import JobQueue
+    from upload_storage import UploadStore, UploadTooLarge
+except ImportError:
+    JobQueue = UploadStore = None
+try:
+    from job_matcher import MATCHER_DIR, JobMatcher, profile_text
+except ImportError:
+    JobMatcher = None
 
 # Initialize Flask app
 app = Flask(__name__)
 
 # Configure the app
-app.config['SQLALCHEMY_DATABASE_URI'] = 'postgresql://postgres:postgres@db:5432/job_matching_db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'postgresql://postgres:postgres@db:5432/job_matching_db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['JWT_SECRET_KEY'] = 'your_secret_key'
-app.config['UPLOAD_FOLDER'] = './uploaded_cvs'
+# bcrypt cost factor: each step doubles the time to hash or check a password
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', '12'))
+# Absolute, because the extraction workers read uploads from their own working directory
+app.config['UPLOAD_FOLDER'] = os.path.abspath(os.getenv('CV_UPLOAD_DIR', './uploaded_cvs'))
+app.config['MAX_UPLOAD_BYTES'] = 10 * 1024 * 1024
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
 # Initialize extensions
 db = SQLAlchemy(app)
-bcrypt = Bcrypt(app)
 jwt = JWTManager(app)
+# Password hashing runs in worker processes, off the request threads
+password_hasher = PasswordHasher(
+    rounds=app.config['BCRYPT_LOG_ROUNDS'],
+    workers=int(os.getenv('AUTH_HASH_WORKERS', os.cpu_count() or 1)),
+)
+# Login lookups by email, so repeated logins skip the users query
+CachedUser = namedtuple('CachedUser', 'id email name password_hash')
+user_cache = TTLCache(ttl=float(os.getenv('USER_CACHE_TTL', '60')))
+# The queue shared with the Streamlit app and the workers (CV_QUEUE_PATH, default src/data/queue)
+extraction_queue = JobQueue() if JobQueue else None
+# Uploads are streamed into hash-sharded directories and deduplicated by content
+upload_store = UploadStore(app.config['UPLOAD_FOLDER'], max_bytes=app.config['MAX_UPLOAD_BYTES']) if UploadStore else None
+# Vector index of job descriptions, updated on every /add_job; set JOB_MATCHER_APPROXIMATE=1
+# to search an IVF index instead of scoring every job. It defaults to src/data/matcher, the index the API serves
+job_matcher = JobMatcher(
+    os.getenv('JOB_MATCHER_DIR', MATCHER_DIR),
+    approximate=os.getenv('JOB_MATCHER_APPROXIMATE') == '1',
+    nprobe=int(os.getenv('JOB_MATCHER_NPROBE', '16')),
+) if JobMatcher else None
 
 # User model
 class User(db.Model):
@@ -31,10 +74,29 @@ class User(db.Model):
 
     @staticmethod
     def hash_password(password):
-        return bcrypt.generate_password_hash(password).decode('utf-8')
+        return password_hasher.hash(password)
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.check(password, self.password_hash)
+
+
+def find_user(email):
+    """
+    Looks a user up by email, through the user cache.
+    """
+    user = user_cache.get(email)
+    if user is None:
+        row = User.query.filter_by(email=email).first()
+        if row is None:
+            return None
+        user = CachedUser(row.id, row.email, row.name, row.password_hash)
+        user_cache.set(email, user)
+    return user
+
+
+@app.errorhandler(HasherBusy)
+def hasher_busy(e):
+    return jsonify({'error': 'Server busy, try again later'}), 503, {'Retry-After': '1'}
 
 # Create database tables
 with app.app_context():
@@ -76,16 +138,24 @@ def register():
         if not email or not password or not name:
             return jsonify({'error': 'Missing required fields'}), 400
 
-        if User.query.filter_by(email=email).first():
-            return jsonify({'error': 'Email already registered'}), 400
+        try:
+            password_hash = User.hash_password(password)
+        except ValueError:
+            # bcrypt only accepts passwords of up to 72 bytes
+            return jsonify({'error': 'Password is too long'}), 400
 
         new_user = User(
             email=email,
-            password_hash=User.hash_password(password),
+            password_hash=password_hash,
             name=name
         )
         db.session.add(new_user)
-        db.session.commit()
+        # The unique index on email rejects duplicates, without a SELECT beforehand
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({'error': 'Email already registered'}), 400
 
         return jsonify({'message': 'User registered successfully'}), 201
 
@@ -117,8 +187,12 @@ def login():
         if not email or not password:
             return jsonify({'error': 'Missing email or password'}), 400
 
-        user = User.query.filter_by(email=email).first()
-        if not user or not user.check_password(password):
+        user = find_user(email)
+        try:
+            valid = user is not None and password_hasher.check(password, user.password_hash)
+        except ValueError:
+            valid = False
+        if not valid:
             return jsonify({'error': 'Invalid email or password'}), 401
 
         token = create_access_token(identity={'id': user.id, 'email': user.email})
@@ -133,6 +207,12 @@ def profile():
     return jsonify({'user': current_user}), 200
 
 
+def current_owner():
+    # Queue jobs are owned by the user id of the JWT identity
+    identity = get_jwt_identity()
+    return str(identity['id'] if isinstance(identity, dict) else identity)
+
+
 @app.route('/upload_cv', methods=['POST'])
 @jwt_required()
 def upload_cv():
@@ -147,12 +227,25 @@ def upload_cv():
             return jsonify({'error': 'No file selected'}), 400
 
         # Save the file
-        filename = secure_filename(file.filename)
-        file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(file_path)
+        digest = None
+        if upload_store is not None:
+            try:
+                stored = upload_store.save(file.stream, secure_filename(file.filename))
+            except UploadTooLarge as e:
+                return jsonify({'error': str(e)}), 413
+            file_path, digest = str(stored.path), stored.sha256
+        else:
+            filename = secure_filename(file.filename)
+            file_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+            file.save(file_path)
         app.logger.info(f"File saved successfully at {file_path}")
 
-        return jsonify({'message': 'File uploaded successfully!', 'file_path': file_path}), 200
+        # Queue the extraction; the workers started by `python job_queue.py` pick it up
+        response = {'message': 'File uploaded successfully!', 'file_path': file_path}
+        if extraction_queue is not None:
+            response['job_id'] = extraction_queue.enqueue(file_path, digest=digest, owner=current_owner())
+
+        return jsonify(response), 200
 
     except Exception as e:
         app.logger.error(f"Error during file upload: {str(e)}")
@@ -160,15 +253,113 @@ def upload_cv():
 
 
 
+@app.route('/cv_jobs/<int:job_id>', methods=['GET'])
+@jwt_required()
+def cv_job_status(job_id):
+    if extraction_queue is None:
+        return jsonify({'error': 'Extraction queue is not available'}), 503
+
+    # Other users' jobs are reported as missing, not forbidden, so job ids cannot be probed
+    job = extraction_queue.get(job_id, owner=current_owner())
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({key: job[key] for key in ('id', 'status', 'attempts', 'error')}), 200
+
+
+@app.route('/cv_jobs/<int:job_id>/result', methods=['GET'])
+@jwt_required()
+def cv_job_result(job_id):
+    if extraction_queue is None:
+        return jsonify({'error': 'Extraction queue is not available'}), 503
+
+    job = extraction_queue.get(job_id, owner=current_owner())
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] == 'failed':
+        return jsonify({'status': 'failed', 'error': job['error']}), 500
+    if job['status'] != 'done':
+        # Not ready yet: the client should poll again
+        return jsonify({'status': job['status']}), 202
+    return jsonify({'status': 'done', 'result': job['result']}), 200
+
+
 class Job(db.Model):
     __tablename__ = 'jobs'
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(150), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    company_name = db.Column(db.String(100), nullable=False)
-    location = db.Column(db.String(100), nullable=False)
-    created_at = db.Column(db.DateTime, default=db.func.now())
+    company_name = db.Column(db.String(100), nullable=False, index=True)
+    location = db.Column(db.String(100), nullable=False, index=True)
+    created_at = db.Column(db.DateTime, default=db.func.now(), index=True)
+    # Id of the posting on the board it was imported from (e.g. "hh:123"), so imports upsert
+    external_id = db.Column(db.String(64), unique=True, index=True)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'company': self.company_name,
+            'location': self.location,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'external_id': self.external_id,
+        }
+
+
+# Rows per executemany batch (and per transaction) in /add_jobs
+BULK_BATCH_SIZE = 1000
+# At most this many per-row errors are reported back
+MAX_REPORTED_ERRORS = 100
+
+
+def job_row(data):
+    """
+    Validates one job payload and returns the row to insert, or None if fields are missing.
+    """
+    if not isinstance(data, dict):
+        return None
+    title = data.get('title')
+    description = data.get('description')
+    company = data.get('company')
+    location = data.get('location')
+    if not all([title, description, company, location]):
+        return None
+    external_id = data.get('external_id')
+    if external_id is not None and not isinstance(external_id, str):
+        return None
+    return {
+        'title': title, 'description': description, 'company_name': company, 'location': location,
+        'external_id': external_id or None,
+    }
+
+
+def insert_jobs(rows):
+    """
+    Inserts rows with one executemany in one transaction and indexes them for matching.
+    Rows whose external_id is already stored update that job instead; returns the
+    (inserted, updated) job ids.
+    """
+    # A posting listed twice in one batch keeps its last copy
+    latest = {}
+    for position, row in enumerate(rows):
+        latest[row['external_id'] or position] = row
+    rows = list(latest.values())
+    external_ids = [row['external_id'] for row in rows if row['external_id']]
+    existing = dict(db.session.execute(
+        select(Job.external_id, Job.id).where(Job.external_id.in_(external_ids))
+    ).all()) if external_ids else {}
+
+    new_rows = [row for row in rows if row['external_id'] not in existing]
+    changed_rows = [{**row, 'id': existing[row['external_id']]} for row in rows if row['external_id'] in existing]
+    ids = db.session.scalars(insert(Job).returning(Job.id, sort_by_parameter_order=True), new_rows).all() if new_rows else []
+    if changed_rows:
+        db.session.execute(update(Job), changed_rows)
+    db.session.commit()
+    if job_matcher is not None:
+        indexed = list(zip(ids, new_rows)) + [(row['id'], row) for row in changed_rows]
+        job_matcher.add_many((job_id, f"{row['title']}\n{row['description']}") for job_id, row in indexed)
+    return ids, [row['id'] for row in changed_rows]
 
 
 @app.route('/add_job', methods=['POST'])
@@ -177,27 +368,175 @@ def add_job():
     data = request.json
 
     # Validate and parse input data
-    title = data.get('title')
-    description = data.get('description')
-    company = data.get('company')
-    location = data.get('location')
-
-    if not all([title, description, company, location]):
+    row = job_row(data)
+    if row is None:
         return jsonify({'error': 'Missing required fields'}), 400
 
     # Save to database
-    new_job = Job(
-        title=title,
-        description=description,
-        company_name=company,
-        location=location
-    )
-    db.session.add(new_job)
-    db.session.commit()
+    insert_jobs([row])
 
     return jsonify({'message': 'Job added successfully'}), 201
 
 
+def _stream_lines(stream, chunk_size=64 * 1024):
+    # Iterating the request stream directly reads it a byte at a time
+    tail = b''
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        lines = (tail + chunk).split(b'\n')
+        tail = lines.pop()
+        yield from lines
+    if tail:
+        yield tail
+
+
+def _bulk_payloads():
+    # Yields (position, parsed job or None) from a JSON array body or an NDJSON stream
+    if request.mimetype in ('application/x-ndjson', 'application/jsonl'):
+        # Read in chunks and split into lines, so a large upload is never held in memory as a whole
+        for position, line in enumerate(line for line in _stream_lines(request.stream) if line.strip()):
+            try:
+                yield position, json.loads(line)
+            except ValueError:
+                yield position, None
+    else:
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, list):
+            raise ValueError('Expected a JSON array of jobs or an NDJSON body')
+        yield from enumerate(payload)
+
+
+@app.route('/add_jobs', methods=['POST'])
+@jwt_required()
+def add_jobs():
+    inserted, updated, errors, batch = 0, 0, [], []
+
+    def flush():
+        nonlocal inserted, updated, batch
+        new_ids, changed_ids = insert_jobs(batch)
+        inserted += len(new_ids)
+        updated += len(changed_ids)
+        batch = []
+
+    try:
+        for position, data in _bulk_payloads():
+            row = job_row(data)
+            if row is None:
+                errors.append(position)
+                continue
+            batch.append(row)
+            if len(batch) == BULK_BATCH_SIZE:
+                flush()
+        if batch:
+            flush()
+    except ValueError as e:
+        return jsonify({'error': str(e), 'inserted': inserted, 'updated': updated}), 400
+
+    response = {'inserted': inserted, 'updated': updated, 'rejected': len(errors)}
+    if errors:
+        response['rejected_positions'] = errors[:MAX_REPORTED_ERRORS]
+    return jsonify(response), 201 if inserted or updated else 400
+
+
+@app.route('/jobs', methods=['GET'])
+@jwt_required()
+def list_jobs():
+    """
+    Lists jobs newest first, filtered by location, company and creation time.
+    Pages are keyed on the job id: pass the returned `next_before_id` as `before_id`
+    to get the next page, which stays fast however deep the listing goes.
+    """
+    query = Job.query
+    if request.args.get('location'):
+        query = query.filter(Job.location == request.args['location'])
+    if request.args.get('company'):
+        query = query.filter(Job.company_name == request.args['company'])
+    try:
+        if request.args.get('created_after'):
+            query = query.filter(Job.created_at >= datetime.fromisoformat(request.args['created_after']))
+        if request.args.get('created_before'):
+            query = query.filter(Job.created_at < datetime.fromisoformat(request.args['created_before']))
+        before_id = request.args.get('before_id', type=int)
+        limit = min(max(int(request.args.get('limit', 50)), 1), 200)
+    except ValueError:
+        return jsonify({'error': 'Invalid filter value'}), 400
+    if before_id is not None:
+        query = query.filter(Job.id < before_id)
+
+    jobs = query.order_by(Job.id.desc()).limit(limit).all()
+    return jsonify({
+        'jobs': [job.to_dict() for job in jobs],
+        'next_before_id': jobs[-1].id if len(jobs) == limit else None,
+    }), 200
+
+
+@app.route('/jobs/<int:job_id>', methods=['DELETE'])
+@jwt_required()
+def delete_job(job_id):
+    job = Job.query.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    db.session.delete(job)
+    db.session.commit()
+
+    # Expired postings must stop showing up in matches
+    if job_matcher is not None:
+        job_matcher.remove([job_id])
+    return jsonify({'message': 'Job deleted'}), 200
+
+
+@app.route('/match_jobs', methods=['POST'])
+@jwt_required()
+def match_jobs():
+    if job_matcher is None:
+        return jsonify({'error': 'Job matching is not available'}), 503
+
+    data = request.json or {}
+    # Either the fields extracted from a CV or free text
+    text = profile_text(data['cv']) if isinstance(data.get('cv'), dict) else data.get('text')
+    if not text:
+        return jsonify({'error': 'Provide "cv" (extracted CV fields) or "text"'}), 400
+
+    matches = job_matcher.top_k(text, k=min(int(data.get('k', 10)), 100))
+    jobs = {job.id: job for job in Job.query.filter(Job.id.in_([job_id for job_id, _ in matches]))}
+    return jsonify([
+        {
+            'id': job_id,
+            'score': round(score, 4),
+            'title': jobs[job_id].title,
+            'company': jobs[job_id].company_name,
+            'location': jobs[job_id].location,
+        }
+        for job_id, score in matches if job_id in jobs
+    ]), 200
+
+
+def index_existing_jobs(batch_size=1000):
+    """
+    Adds jobs stored before the matcher existed to its index.
+    """
+    if job_matcher is None or len(job_matcher):
+        return
+    batch = []
+    for job in Job.query.order_by(Job.id).yield_per(batch_size):
+        batch.append((job.id, f"{job.title}\n{job.description}"))
+        if len(batch) == batch_size:
+            job_matcher.add_many(batch)
+            batch = []
+    job_matcher.add_many(batch)
+
+
+
+# Job is declared after the first create_all above, so its table is created here
+with app.app_context():
+    db.create_all()
+    # create_all skips tables that already exist, so add columns and indexes introduced since separately
+    if 'external_id' not in {column['name'] for column in inspect(db.engine).get_columns('jobs')}:
+        with db.engine.begin() as connection:
+            connection.execute(text('ALTER TABLE jobs ADD COLUMN external_id VARCHAR(64)'))
+    for index in Job.__table__.indexes:
+        index.create(db.engine, checkfirst=True)
+    index_existing_jobs()
+password_hasher.start()
 
 # Run the app
 if __name__ == '__main__':
@@ -1,7 +1,10 @@
 import streamlit as st
 import requests
+import time
 
 BASE_URL = "http://backend:5000"  # Flask backend URL
+POLL_INTERVAL = 1.0  # Seconds between extraction status checks
+POLL_TIMEOUT = 120
 
 # Ensure a logged-in state using Streamlit's session state
 if "token" not in st.session_state:
@@ -61,6 +64,9 @@ def upload_cv():
             # Handle the response
             if response.status_code == 200:
                 st.success("CV uploaded successfully!")
+                job_id = response.json().get("job_id")
+                if job_id is not None:
+                    show_extraction_result(job_id, headers)
             else:
                 error_message = response.json().get('error', 'Unknown error')
                 error_details = response.json().get('details', '')
@@ -72,6 +78,25 @@ def upload_cv():
 
 
 
+def show_extraction_result(job_id, headers):
+    """
+    Polls the backend until the queued extraction job finishes.
+    """
+    deadline = time.time() + POLL_TIMEOUT
+    with st.spinner("Extracting key information..."):
+        while time.time() < deadline:
+            response = requests.get(f"{BASE_URL}/cv_jobs/{job_id}/result", headers=headers)
+            if response.status_code == 200:
+                st.write("### Extracted Information:")
+                st.json(response.json().get("result"))
+                return
+            if response.status_code != 202:
+                st.error(f"Extraction failed: {response.json().get('error', 'Unknown error')}")
+                return
+            time.sleep(POLL_INTERVAL)
+    st.info(f"Extraction is still running (job {job_id}). Check back later.")
+
+
 # Navigation options
 PAGES = {
     "Login": login,